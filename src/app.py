@@ -6,16 +6,36 @@ Servidor Flask para descargar videos de YouTube como MP3 desde el navegador
 
 import os
 import re
+import sys
+import copy
 import hashlib
 import requests
 from pathlib import Path
 from datetime import datetime
-from flask import Flask, render_template, request, send_file, jsonify, session, redirect, url_for
+from flask import Flask, Response, stream_with_context, render_template, request, send_file, jsonify, session, redirect, url_for
 from werkzeug.utils import secure_filename
 import yt_dlp
 from colorama import init, Fore, Style
 import tempfile
+import io
+import json
 import time
+import math
+import queue
+import zipfile
+import uuid
+import shutil
+import threading
+import subprocess
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+# Permitir importar módulos compartidos del backend (solo biblioteca estándar)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.backend.api.core.utils import extract_video_id, is_youtube_collection_url
+from src.backend.api.infrastructure.info_cache import InfoCache
+from src.backend.api.infrastructure.output_cache import OutputCache
+from src.backend.api.infrastructure.output_profiles import DEFAULT_PROFILE, PROFILES, SOURCE_PROFILE, get_profile
 
 # Inicializar colorama para logs en consola
 init(autoreset=True)
@@ -28,6 +48,38 @@ app = Flask(__name__,
 # Configuración de sesión
 app.secret_key = os.getenv('SECRET_KEY', os.urandom(24))
 
+# Delegar el envío de archivos al proxy (X-Sendfile) si está detrás de nginx/Apache
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', '') == '1'
+
+# Perfil de salida por defecto (códec-bitrate); cada petición puede pedir otro con "profile"
+DEFAULT_OUTPUT_PROFILE = os.getenv('DEFAULT_PROFILE', '').lower()
+if DEFAULT_OUTPUT_PROFILE not in PROFILES:
+    DEFAULT_OUTPUT_PROFILE = DEFAULT_PROFILE
+
+# Ejecutable de ffmpeg para el modo streaming (el mismo que usa yt-dlp si está en el PATH)
+FFMPEG_PATH = os.getenv('FFMPEG_PATH') or shutil.which('ffmpeg') or 'ffmpeg'
+
+# Tamaño de cada petición Range al stream de origen (YouTube limita las lecturas largas sin rango)
+SOURCE_CHUNK_BYTES = 10 * 1024 * 1024
+# Tamaño máximo de cada bloque enviado al cliente en modo streaming
+STREAM_CHUNK_BYTES = 64 * 1024
+# Formato de ffmpeg por extensión para escribir a un pipe (m4a necesita un archivo con seek: sin streaming)
+STREAM_FORMATS = {'mp3': 'mp3', 'opus': 'ogg'}
+
+# Progreso por Server-Sent Events: intervalo mínimo entre eventos y latido para proxies con timeout
+SSE_MIN_INTERVAL_SECONDS = float(os.getenv('SSE_MIN_INTERVAL', 0.5))
+SSE_HEARTBEAT_SECONDS = 15
+
+# Máximo de pistas por petición de lote (/batch)
+BATCH_MAX_TRACKS = int(os.getenv('BATCH_MAX_TRACKS', 200))
+
+# Control de admisión: conversiones simultáneas (cada una es un proceso ffmpeg) y cola de espera acotada
+MAX_CONCURRENT_TRANSCODES = int(os.getenv('MAX_CONCURRENT_TRANSCODES', os.getenv('WEB_MAX_WORKERS', os.cpu_count() or 2)))
+MAX_QUEUED_JOBS = int(os.getenv('MAX_QUEUED_JOBS', 16))
+
+# Intervalo del conserje que limpia temporales y aplica la cuota de la caché
+JANITOR_INTERVAL_SECONDS = int(os.getenv('JANITOR_INTERVAL', 300))
+
 # Configuración de admin
 ADMIN_PASSWORD_HASH = os.getenv('ADMIN_PASSWORD_HASH', '')
 
@@ -100,11 +152,56 @@ def get_cookie_file():
         print(f"{Fore.RED}⚠️  Error al crear archivo temporal de cookies: {e}")
         return None
 
+
+class ClosingIterable:
+    """
+    Cuerpo de respuesta cuyo close() ejecuta `on_close` una sola vez, se haya iterado o no.
+    Werkzeug llama a close() aunque el cliente se desconecte antes del primer chunk, pero un
+    generador sin iniciar no ejecuta su bloque finally al cerrarse.
+    """
+    
+    def __init__(self, iterable, on_close):
+        self._iterable = iterable
+        self._on_close = on_close
+        self._closed = False
+        self._lock = threading.Lock()
+    
+    def __iter__(self):
+        return iter(self._iterable)
+    
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            close = getattr(self._iterable, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._on_close()
+
+
 class YouTubeMP3Downloader:
     def __init__(self):
         """Inicializa el descargador de YouTube a MP3"""
         self.temp_dir = Path(tempfile.gettempdir()) / 'yt_mp3_downloads'
         self.temp_dir.mkdir(exist_ok=True)
+        # Caché de extracción por ID de video (TTL configurable en segundos)
+        self.info_cache = InfoCache(
+            self.temp_dir / 'info_cache',
+            ttl_seconds=int(os.getenv('INFO_CACHE_TTL', 6 * 3600))
+        )
+        # Caché de MP3 ya convertidos por ID de video y perfil, con cuota en MB (LRU)
+        self.output_cache = OutputCache(
+            Path(os.getenv('OUTPUT_CACHE_DIR', self.temp_dir / 'output_cache')),
+            max_bytes=int(os.getenv('OUTPUT_CACHE_MAX_MB', 2048)) * 1024 * 1024
+        )
+        # Caché del audio original por ID de video: un perfil nuevo de un video conocido no toca la red
+        self.source_cache = OutputCache(
+            Path(os.getenv('SOURCE_CACHE_DIR', self.temp_dir / 'source_cache')),
+            max_bytes=int(os.getenv('SOURCE_CACHE_MAX_MB', 4096)) * 1024 * 1024
+        )
         
     def validate_youtube_url(self, url):
         """
@@ -125,32 +222,13 @@ class YouTubeMP3Downloader:
         youtube_regex_match = re.match(youtube_regex, url)
         return youtube_regex_match is not None
     
-    def download_mp3(self, url):
+    def _base_ydl_opts(self):
         """
-        Descarga un video de YouTube y lo convierte a MP3
-        
-        Args:
-            url: URL del video de YouTube
-            
-        Returns:
-            tuple: (success: bool, file_path: str or error_message: str, video_title: str)
+        Opciones de yt-dlp comunes a la descarga completa y al streaming
+        (formato, cookies, cliente móvil, cabeceras y proxy)
         """
-        if not self.validate_youtube_url(url):
-            return False, "La URL no es válida de YouTube", None
-        
-        # Generar nombre único para el archivo temporal
-        timestamp = int(time.time())
-        temp_filename = f'temp_{timestamp}'
-        
-        # Configuración de yt-dlp para descargar como MP3
         ydl_opts = {
             'format': 'bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-            'outtmpl': str(self.temp_dir / f'{temp_filename}.%(ext)s'),
             'quiet': True,
             'no_warnings': True,
             'extract_flat': False,
@@ -196,47 +274,397 @@ class YouTubeMP3Downloader:
         if YOUTUBE_COOKIES_URL:
             print(f"{Fore.GREEN}🍪 Usando cookies de YouTube")
         
+        return ydl_opts
+    
+    def download_mp3(self, url, progress_hook=None, profile=None):
+        """
+        Descarga un video de YouTube y lo convierte al perfil de salida pedido
+        
+        El audio original se conserva en la caché de fuentes: pedir otro perfil del
+        mismo video solo lo convierte en local, sin volver a la red.
+        
+        Args:
+            url: URL del video de YouTube
+            progress_hook: Callback opcional que recibe cada dict de progreso de yt-dlp
+            profile: Perfil de salida (OutputProfile); por defecto DEFAULT_OUTPUT_PROFILE
+            
+        Returns:
+            tuple: (success: bool, file_path: str or error_message: str, video_title: str, metadata: dict)
+            metadata incluye id, duración, autor, miniatura y los tiempos de extracción/descarga en ms.
+        """
+        if not self.validate_youtube_url(url):
+            return False, "La URL no es válida de YouTube", None, None
+        profile = profile or get_profile(DEFAULT_OUTPUT_PROFILE)
+        video_id = extract_video_id(url)
+        
+        # Caché de salida: el archivo de este video y perfil ya se generó antes
+        start = time.perf_counter()
+        cached = self.output_cache.get(video_id, profile.name)
+        if cached is not None:
+            audio_file, meta = cached
+            total_ms = round((time.perf_counter() - start) * 1000)
+            metadata = {
+                **meta,
+                'file_path': str(audio_file),
+                'profile': profile.name,
+                'cache': 'hit',
+                'timing': {'extract_ms': 0, 'download_convert_ms': 0, 'total_ms': total_ms},
+            }
+            print(f"{Fore.GREEN}⚡ Servido desde caché: {meta.get('title', audio_file.name)}")
+            return True, str(audio_file), meta.get('title', 'Unknown'), metadata
+        
+        # Generar nombre único para el archivo temporal (varios trabajos pueden coincidir en el mismo segundo)
+        timestamp = int(time.time())
+        temp_filename = f'temp_{timestamp}_{uuid.uuid4().hex[:8]}'
+        
+        # Medición de tiempos: el primer hook de progreso marca el fin de la extracción
+        timing = {'start': time.perf_counter(), 'first_byte': None}
+        
         try:
-            print(f"{Fore.CYAN}📥 Descargando: {url}")
+            source = self.source_cache.get(video_id, SOURCE_PROFILE)
+            if source is not None:
+                # Caché de fuentes: el audio original ya está en disco, solo falta convertirlo
+                source_file, video_meta = source
+                cache_state = 'source-hit'
+                timing['first_byte'] = time.perf_counter()
+                if progress_hook is not None:
+                    progress_hook({'status': 'finished'})
+                print(f"{Fore.GREEN}⚡ Audio original en caché, convirtiendo a {profile.name}: {video_meta.get('title')}")
+            else:
+                source_file, video_meta = self._fetch_source(url, temp_filename, timing, progress_hook)
+                cache_state = 'miss'
+            video_title = video_meta.get('title', 'Unknown')
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Obtener información del video
-                info = ydl.extract_info(url, download=False)
-                video_title = info.get('title', 'Unknown')
-                
-                print(f"{Fore.GREEN}🎵 Título: {video_title}")
-                
-                # Descargar y convertir
-                ydl.download([url])
-                
-            # Encontrar el archivo MP3 generado
-            mp3_file = self.temp_dir / f'{temp_filename}.mp3'
+            # Conversión local con ffmpeg al perfil pedido
+            audio_file = self.temp_dir / f'{temp_filename}.{profile.ext}'
+            try:
+                self._transcode(source_file, audio_file, profile, video_meta.get('acodec'))
+            except Exception:
+                # Un original que ffmpeg rechaza fallaría igual en cada petición posterior: no se conserva
+                self._discard_source(source_file, video_meta, cached=source is not None)
+                raise
+            if source is None:
+                self._keep_source(source_file, video_meta)
+            
+            if video_meta.get('id'):
+                # Guardar en la caché de salida: las siguientes peticiones del mismo video y perfil no recodifican
+                audio_file = self.output_cache.put(video_meta['id'], profile.name, audio_file, meta=video_meta)
             
-            if not mp3_file.exists():
-                return False, "Error al generar el archivo MP3", None
+            end = time.perf_counter()
+            first_byte = timing['first_byte'] or end
+            metadata = {
+                **video_meta,
+                'file_path': str(audio_file),
+                'profile': profile.name,
+                'cache': cache_state,
+                'timing': {
+                    'extract_ms': round((first_byte - timing['start']) * 1000),
+                    'download_convert_ms': round((end - first_byte) * 1000),
+                    'total_ms': round((end - timing['start']) * 1000),
+                },
+            }
                 
-            print(f"{Fore.GREEN}✅ Descarga completada: {video_title}")
-            return True, str(mp3_file), video_title
+            print(f"{Fore.GREEN}✅ Descarga completada: {video_title} [{profile.name}] "
+                  f"(extracción {metadata['timing']['extract_ms']} ms, total {metadata['timing']['total_ms']} ms)")
+            return True, str(audio_file), video_title, metadata
             
         except yt_dlp.utils.DownloadError as e:
             error_msg = str(e)
             print(f"{Fore.RED}❌ Error al descargar: {error_msg}")
-            return False, f"Error al descargar: {error_msg}", None
+            return False, f"Error al descargar: {error_msg}", None, None
         except Exception as e:
             error_msg = str(e)
             print(f"{Fore.RED}❌ Error inesperado: {error_msg}")
-            return False, f"Error inesperado: {error_msg}", None
+            return False, f"Error inesperado: {error_msg}", None, None
+    
+    def _fetch_source(self, url, temp_filename, timing, progress_hook=None):
+        """
+        Descarga el mejor audio disponible sin convertir
+        
+        Returns:
+            tuple: (source_file: Path, video_meta: dict con id, título, duración, autor, miniatura y códec)
+        """
+        def timing_hook(d):
+            if timing['first_byte'] is None and d.get('status') in ('downloading', 'finished'):
+                timing['first_byte'] = time.perf_counter()
+        
+        ydl_opts = self._base_ydl_opts()
+        ydl_opts['outtmpl'] = str(self.temp_dir / f'{temp_filename}.source.%(ext)s')
+        ydl_opts['progress_hooks'] = [timing_hook]
+        if progress_hook is not None:
+            ydl_opts['progress_hooks'].append(progress_hook)
+        
+        print(f"{Fore.CYAN}📥 Descargando: {url}")
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = self._extract_and_download(ydl, url)
+            requested = info.get('requested_downloads') or []
+            if requested and requested[0].get('filepath'):
+                source_file = Path(requested[0]['filepath'])
+            else:
+                source_file = Path(ydl.prepare_filename(info))
+        
+        if not source_file.exists():
+            raise FileNotFoundError("No se encontró el audio descargado")
+        print(f"{Fore.GREEN}🎵 Título: {info.get('title', 'Unknown')}")
+        return source_file, {
+            'id': info.get('id'),
+            'title': info.get('title', 'Unknown'),
+            'duration': info.get('duration'),
+            'uploader': info.get('uploader'),
+            'thumbnail': info.get('thumbnail'),
+            'acodec': (requested[0] if requested else info).get('acodec'),
+        }
+    
+    def _keep_source(self, source_file, video_meta):
+        """Mueve el audio original a la caché de fuentes (o lo borra si no tiene ID de video)"""
+        try:
+            if video_meta.get('id'):
+                self.source_cache.put(video_meta['id'], SOURCE_PROFILE, source_file, meta=video_meta)
+            else:
+                source_file.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"{Fore.YELLOW}⚠️  No se pudo guardar el audio original en caché: {e}")
+    
+    def _discard_source(self, source_file, video_meta, cached=False):
+        """Borra el audio original (y su entrada de la caché de fuentes si venía de ella)"""
+        if cached and video_meta.get('id'):
+            self.source_cache.invalidate(video_meta['id'], SOURCE_PROFILE)
+        else:
+            source_file.unlink(missing_ok=True)
+    
+    @staticmethod
+    def _source_codec(acodec):
+        """Códec base del audio de origen ('mp4a.40.2' → 'mp4a') para decidir si basta con copiar"""
+        return (acodec or '').split('.')[0].lower() or None
+    
+    def _transcode(self, source_file, target_file, profile, acodec=None):
+        """Convierte el audio original al perfil de salida con ffmpeg (copia de stream si ya coincide)"""
+        cmd = [
+            FFMPEG_PATH, '-hide_banner', '-loglevel', 'error', '-nostdin', '-y',
+            '-i', str(source_file), '-vn', *profile.ffmpeg_args(self._source_codec(acodec)), str(target_file)
+        ]
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            target_file.unlink(missing_ok=True)
+            stderr = result.stderr.decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f"Error de ffmpeg: {stderr.splitlines()[-1] if stderr else result.returncode}")
+    
+    def resolve_stream(self, url):
+        """
+        Extrae (sin descargar) el formato de audio elegido, reutilizando la caché de extracción
+        
+        Returns:
+            tuple: (info: dict, fmt: dict con url, http_headers, acodec y ext del formato elegido)
+        """
+        video_id = extract_video_id(url)
+        cached = self.info_cache.get_playable(video_id)
+        with yt_dlp.YoutubeDL(self._base_ydl_opts()) as ydl:
+            if cached is not None:
+                info = ydl.process_ie_result(copy.deepcopy(cached), download=False)
+            else:
+                info = ydl.extract_info(url, download=False)
+                self.info_cache.put(info)
+        fmt = (info.get('requested_formats') or [info])[0]
+        if not fmt.get('url'):
+            raise ValueError("No se encontró un stream de audio descargable")
+        return info, fmt
+    
+    def stream_audio(self, url, profile=None):
+        """
+        Convierte mientras descarga: origen → ffmpeg → cliente, sin esperar al archivo completo.
+        Una copia se escribe en paralelo y entra en la caché de salida si la conversión termina bien;
+        el audio original se lee de la caché de fuentes si existe, o se guarda en ella al terminar.
+        
+        Returns:
+            tuple: (video_title: str, chunks: generador de bytes del audio convertido)
+        """
+        profile = profile or get_profile(DEFAULT_OUTPUT_PROFILE)
+        if profile.ext not in STREAM_FORMATS:
+            raise ValueError(f"El perfil {profile.name} no admite streaming")
+        
+        video_id = extract_video_id(url)
+        source = self.source_cache.get(video_id, SOURCE_PROFILE)
+        if source is not None:
+            source_file, video_meta = source
+            feed_args = (source_file, None, None)
+            source_copy = None
+        else:
+            info, fmt = self.resolve_stream(url)
+            video_id = info.get('id') or video_id
+            video_meta = {
+                'id': video_id,
+                'title': info.get('title', 'Unknown'),
+                'duration': info.get('duration'),
+                'uploader': info.get('uploader'),
+                'thumbnail': info.get('thumbnail'),
+                'acodec': fmt.get('acodec'),
+            }
+            source_copy = self.source_cache.partial_path(video_id, SOURCE_PROFILE, fmt.get('ext') or 'src')
+            feed_args = (fmt['url'], fmt.get('http_headers') or {}, source_copy)
+        video_title = video_meta.get('title', 'Unknown')
+        partial = self.output_cache.partial_path(video_id, profile.name, profile.ext)
+        
+        proc = subprocess.Popen(
+            [FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
+             '-i', 'pipe:0', '-vn', *profile.ffmpeg_args(self._source_codec(video_meta.get('acodec'))),
+             '-f', STREAM_FORMATS[profile.ext], 'pipe:1'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        errors = []
+        threading.Thread(
+            target=self._feed_source,
+            args=(*feed_args, proc.stdin, errors),
+            name='stream-feeder',
+            daemon=True
+        ).start()
+        print(f"{Fore.CYAN}📡 Streaming [{profile.name}]: {video_title}")
+        
+        finished = []
+        
+        def finish(completed):
+            """Detiene ffmpeg y guarda o descarta las copias (una sola vez)"""
+            if finished:
+                return
+            finished.append(True)
+            # Cliente desconectado o error: detener ffmpeg y descartar las copias incompletas
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            if completed:
+                self.output_cache.put(video_id, profile.name, partial, meta=video_meta)
+                if source_copy is not None:
+                    self.source_cache.put(video_id, SOURCE_PROFILE, source_copy, meta=video_meta)
+                print(f"{Fore.GREEN}✅ Streaming completado y guardado en caché: {video_title}")
+            else:
+                partial.unlink(missing_ok=True)
+                if source_copy is not None:
+                    source_copy.unlink(missing_ok=True)
+                if errors:
+                    print(f"{Fore.RED}❌ Error en streaming: {errors[0]}")
+        
+        def generate():
+            completed = False
+            try:
+                with open(partial, 'wb') as copy_file:
+                    while True:
+                        chunk = proc.stdout.read1(STREAM_CHUNK_BYTES)
+                        if not chunk:
+                            break
+                        copy_file.write(chunk)
+                        yield chunk
+                proc.wait()
+                completed = proc.returncode == 0 and not errors
+            finally:
+                finish(completed)
+        
+        # Si la respuesta se cierra sin haber empezado a iterar, el generador no llega a su finally
+        return video_title, ClosingIterable(generate(), lambda: finish(False))
+    
+    def _feed_source(self, source, headers, source_copy, sink, errors):
+        """
+        Escribe el audio de origen en la entrada de ffmpeg: desde la caché de fuentes (Path)
+        o descargándolo por rangos (URL), guardando en ese caso una copia en `source_copy`
+        """
+        try:
+            if isinstance(source, Path):
+                with open(source, 'rb') as source_file:
+                    while True:
+                        block = source_file.read(STREAM_CHUNK_BYTES)
+                        if not block:
+                            break
+                        sink.write(block)
+                return
+            
+            proxies = {'http': PROXY_URL, 'https': PROXY_URL} if PROXY_URL else None
+            with requests.Session() as http, open(source_copy, 'wb') as copy_file:
+                start = 0
+                while True:
+                    end = start + SOURCE_CHUNK_BYTES - 1
+                    response = http.get(
+                        source,
+                        headers={**headers, 'Range': f'bytes={start}-{end}'},
+                        proxies=proxies,
+                        stream=True,
+                        timeout=30
+                    )
+                    if response.status_code not in (200, 206):
+                        raise IOError(f"HTTP {response.status_code} al leer el stream de origen")
+                    received = 0
+                    for block in response.iter_content(STREAM_CHUNK_BYTES):
+                        sink.write(block)
+                        copy_file.write(block)
+                        received += len(block)
+                    # 200 = el servidor ignoró el rango y envió todo; rango corto = fin del archivo
+                    if response.status_code == 200 or received < SOURCE_CHUNK_BYTES:
+                        break
+                    start += received
+        except BrokenPipeError:
+            # ffmpeg terminado (cliente desconectado): no es un error de origen
+            errors.append('cancelado')
+        except Exception as e:
+            errors.append(e)
+        finally:
+            try:
+                sink.close()
+            except OSError:
+                pass
+    
+    def list_entries(self, url, limit=None):
+        """
+        URLs de los videos de una playlist con extracción plana (una sola petición, sin resolver cada video)
+        
+        `limit` corta la enumeración en yt-dlp (playlistend): un canal entero no se recorre para
+        luego rechazarlo. Solo se aceptan entradas del extractor de YouTube.
+        """
+        ydl_opts = self._base_ydl_opts()
+        ydl_opts['extract_flat'] = 'in_playlist'
+        if limit:
+            ydl_opts['playlistend'] = limit
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+        entries = [
+            f"https://www.youtube.com/watch?v={entry['id']}"
+            for entry in (info or {}).get('entries') or []
+            if entry and entry.get('id') and entry.get('ie_key', 'Youtube') == 'Youtube'
+        ]
+        if limit:
+            entries = entries[:limit]
+        return entries or [url]
+    
+    def _extract_and_download(self, ydl, url):
+        """
+        Una sola pasada de extracción + descarga + conversión, reutilizando el
+        info dict cacheado si sus URLs firmadas siguen vigentes
+        """
+        video_id = extract_video_id(url)
+        cached = self.info_cache.get_playable(video_id)
+        if cached is not None:
+            try:
+                print(f"{Fore.CYAN}⚡ Extracción reutilizada desde caché: {video_id}")
+                return ydl.process_ie_result(copy.deepcopy(cached), download=True)
+            except Exception as e:
+                # URLs rechazadas (p. ej. 403): descartar la entrada y extraer de nuevo
+                print(f"{Fore.YELLOW}⚠️  Caché de extracción inválida ({e}), re-extrayendo...")
+                self.info_cache.invalidate(video_id)
+        
+        info = ydl.extract_info(url, download=True)
+        self.info_cache.put(info)
+        return info
     
     def cleanup_old_files(self, max_age_minutes=30):
         """
-        Limpia archivos temporales antiguos
+        Limpia archivos temporales antiguos (restos de descargas fallidas o interrumpidas;
+        los MP3 terminados viven en la caché de salida)
         
         Args:
             max_age_minutes: Edad máxima de archivos en minutos
         """
         try:
             current_time = time.time()
-            for file in self.temp_dir.glob('temp_*.mp3'):
+            for file in self.temp_dir.glob('temp_*'):
                 file_age = current_time - file.stat().st_mtime
                 if file_age > (max_age_minutes * 60):
                     file.unlink()
@@ -249,6 +677,405 @@ class YouTubeMP3Downloader:
 downloader = YouTubeMP3Downloader()
 
 
+def _janitor_loop():
+    """Conserje en segundo plano: temporales viejos, cuota LRU de la caché e índice en disco"""
+    while True:
+        time.sleep(JANITOR_INTERVAL_SECONDS)
+        try:
+            downloader.cleanup_old_files()
+            downloader.output_cache.purge_partials()
+            removed = downloader.output_cache.evict()
+            if removed:
+                print(f"{Fore.YELLOW}🗑️  Caché de salida: {removed} entrada(s) desalojada(s) por cuota")
+            downloader.output_cache.save_index()
+            downloader.source_cache.purge_partials()
+            removed = downloader.source_cache.evict()
+            if removed:
+                print(f"{Fore.YELLOW}🗑️  Caché de fuentes: {removed} entrada(s) desalojada(s) por cuota")
+            downloader.source_cache.save_index()
+        except Exception as e:
+            print(f"{Fore.RED}⚠️  Error en el conserje de la caché: {e}")
+
+
+threading.Thread(target=_janitor_loop, name='cache-janitor', daemon=True).start()
+
+
+# ==================== CONTROL DE ADMISIÓN ====================
+
+class ServerBusy(Exception):
+    """La cola de conversiones está llena: el cliente debe reintentar más tarde"""
+    
+    def __init__(self, queue_position, retry_after):
+        super().__init__(f"Servidor ocupado (posición estimada en cola: {queue_position})")
+        self.queue_position = queue_position
+        self.retry_after = retry_after
+
+
+class AdmissionControl:
+    """Límite de conversiones simultáneas con una cola de espera FIFO acotada
+    
+    Cada petición admitida recibe un ticket con `reserve()` (o `ServerBusy` si la cola
+    está llena) y espera su turno con `acquire(ticket)`. Así, ante una ráfaga, solo
+    corren `max_active` procesos ffmpeg a la vez y el resto espera en orden en lugar
+    de repartirse la CPU entre todos.
+    """
+    
+    def __init__(self, max_active, max_queued, initial_estimate=30.0):
+        self.max_active = max(1, max_active)
+        self.max_queued = max(0, max_queued)
+        self._cond = threading.Condition()
+        self._active = 0
+        self._next_ticket = 0   # Siguiente ticket a emitir
+        self._serving = 0       # Siguiente ticket al que le toca un slot
+        self._avg_seconds = initial_estimate
+        self.rejected = 0
+    
+    def _waiting(self):
+        return self._next_ticket - self._serving
+    
+    def _estimate_wait(self, position):
+        """Segundos estimados hasta que se libere un slot para la posición dada"""
+        return max(1, math.ceil(self._avg_seconds * position / self.max_active))
+    
+    def reserve(self):
+        """Reserva un lugar en la cola y retorna el ticket; lanza ServerBusy si la cola está llena"""
+        with self._cond:
+            free_slots = max(0, self.max_active - self._active)
+            queued = self._waiting() - free_slots
+            if queued >= self.max_queued:
+                self.rejected += 1
+                position = queued + 1
+                raise ServerBusy(position, self._estimate_wait(position))
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            return ticket
+    
+    def acquire(self, ticket):
+        """Bloquea hasta que sea el turno del ticket y haya un slot libre"""
+        with self._cond:
+            while ticket != self._serving or self._active >= self.max_active:
+                self._cond.wait()
+            self._serving += 1
+            self._active += 1
+            self._cond.notify_all()
+    
+    def release(self, elapsed_seconds=None):
+        """Libera el slot; la duración alimenta la estimación de Retry-After"""
+        with self._cond:
+            self._active -= 1
+            if elapsed_seconds is not None:
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed_seconds
+            self._cond.notify_all()
+    
+    def position(self, ticket):
+        """Posición (1 = siguiente) de un ticket que aún espera; 0 si ya tiene slot"""
+        with self._cond:
+            return max(0, ticket - self._serving + 1)
+    
+    def stats(self):
+        with self._cond:
+            return {
+                'active': self._active,
+                'max_active': self.max_active,
+                'queued': self._waiting(),
+                'max_queued': self.max_queued,
+                'rejected': self.rejected,
+                'avg_job_seconds': round(self._avg_seconds, 1),
+            }
+
+
+admission = AdmissionControl(MAX_CONCURRENT_TRANSCODES, MAX_QUEUED_JOBS)
+
+
+# ==================== TRABAJOS EN SEGUNDO PLANO ====================
+
+class WebJob:
+    """Trabajo de descarga web: se ejecuta en el pool de workers y se consulta por su ID"""
+    
+    QUEUED = 'queued'
+    DOWNLOADING = 'downloading'
+    CONVERTING = 'converting'
+    DONE = 'done'
+    FAILED = 'failed'
+    
+    def __init__(self, url, key=None, profile=DEFAULT_OUTPUT_PROFILE):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.profile = profile
+        # Clave de coalescencia (ID de video + perfil) y peticiones adjuntas a este trabajo
+        self.key = key
+        self.requests = 1
+        # Ticket de admisión (None = servido desde la caché, no necesita slot de conversión)
+        self.ticket = None
+        self.state = self.QUEUED
+        self.progress = {'downloaded_bytes': 0, 'total_bytes': None, 'speed': None, 'eta': None}
+        self.file_path = None
+        self.title = None
+        self.metadata = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.done = threading.Event()
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+        # Versión del progreso: los oyentes SSE esperan a que cambie en lugar de sondear
+        self._changed = threading.Condition()
+        self.version = 0
+        self._notified_at = 0.0
+    
+    @property
+    def is_final(self):
+        return self.state in (self.DONE, self.FAILED)
+    
+    def on_progress(self, d):
+        """Hook de progreso de yt-dlp: guarda los campos numéricos de la descarga"""
+        if d.get('status') == 'downloading':
+            phase_changed = self.state != self.DOWNLOADING
+            self.state = self.DOWNLOADING
+            self.progress = {
+                'downloaded_bytes': d.get('downloaded_bytes') or 0,
+                'total_bytes': d.get('total_bytes') or d.get('total_bytes_estimate'),
+                'speed': d.get('speed'),
+                'eta': d.get('eta'),
+            }
+            self._notify(force=phase_changed)
+        elif d.get('status') == 'finished':
+            self.state = self.CONVERTING
+            self._notify(force=True)
+    
+    def _notify(self, force=False):
+        """Despierta a los oyentes SSE (los chunks de la descarga se agrupan: como mucho uno cada 0.1 s)"""
+        now = time.monotonic()
+        if not force and now - self._notified_at < 0.1:
+            return
+        self._notified_at = now
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+    
+    def wait_for_change(self, version, timeout):
+        """Bloquea hasta que el progreso supere `version` (o venza el timeout); retorna la versión actual"""
+        with self._changed:
+            if self.version == version:
+                self._changed.wait(timeout)
+            return self.version
+    
+    def progress_event(self):
+        """Estado resumido para el stream SSE: fase, bytes, velocidad, ETA y posición en la cola"""
+        progress = self.progress
+        total = progress['total_bytes']
+        event = {
+            'job_id': self.id,
+            'phase': self.state,
+            'downloaded_bytes': progress['downloaded_bytes'],
+            'total_bytes': total,
+            'percent': round(min(100.0, progress['downloaded_bytes'] * 100.0 / total), 1) if total else None,
+            'speed': progress['speed'],
+            'eta': progress['eta'],
+        }
+        if self.state == self.QUEUED and self.ticket is not None:
+            event['queue_position'] = admission.position(self.ticket)
+        return event
+    
+    def finish(self, success, result, title, metadata):
+        if success:
+            self.file_path = result
+            self.title = title
+            self.metadata = metadata
+            self.state = self.DONE
+        else:
+            self.error = result
+            self.state = self.FAILED
+        self.finished_at = time.time()
+        with self._callbacks_lock:
+            self.done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        self._notify(force=True)
+        for callback in callbacks:
+            callback(self)
+    
+    def add_done_callback(self, callback):
+        """Llama a callback(job) al terminar (de inmediato si ya terminó)"""
+        with self._callbacks_lock:
+            if not self.done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+    
+    def to_dict(self):
+        data = {
+            'job_id': self.id,
+            'url': self.url,
+            'profile': self.profile,
+            'state': self.state,
+            'progress': self.progress,
+            'title': self.title,
+            'error': self.error,
+            'requests': self.requests,
+        }
+        if self.state == self.QUEUED and self.ticket is not None:
+            data['queue_position'] = admission.position(self.ticket)
+        if self.state == self.DONE:
+            data['file_url'] = url_for('job_file', job_id=self.id)
+            data['timing'] = self.metadata.get('timing') if self.metadata else None
+            data['cache'] = self.metadata.get('cache') if self.metadata else None
+            if self.metadata and self.metadata.get('id'):
+                # URL estable (cacheable por el navegador con ETag)
+                data['audio_url'] = url_for('cached_audio', video_id=self.metadata['id'], profile=self.profile)
+        return data
+
+
+class WebJobManager:
+    """Registro de trabajos web con un pool acotado de workers en segundo plano
+    
+    Las peticiones simultáneas del mismo video y perfil se adjuntan al trabajo en
+    curso (single-flight) en lugar de repetir extracción, descarga y conversión.
+    Los trabajos nuevos pasan por el control de admisión: hay un hilo por cada slot
+    y lugar de cola, de modo que todo ticket emitido tiene quien lo espere.
+    """
+    
+    def __init__(self, downloader, admission, job_ttl_seconds=1800):
+        self.downloader = downloader
+        self.admission = admission
+        self.job_ttl_seconds = job_ttl_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=admission.max_active + admission.max_queued + 1,
+            thread_name_prefix='web-job'
+        )
+        self._jobs = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def flight_key(url, profile=DEFAULT_OUTPUT_PROFILE):
+        """Clave canónica: el mismo video con distintas URLs (youtu.be, shorts, &t=...) comparte trabajo"""
+        return (extract_video_id(url) or url, profile)
+    
+    def submit(self, url, profile=DEFAULT_OUTPUT_PROFILE):
+        """
+        Crea el trabajo y lo encola (o adjunta la petición al trabajo en curso); retorna de inmediato
+        
+        Raises:
+            ServerBusy: si el trabajo necesita conversión y la cola de admisión está llena
+        """
+        self._purge_expired()
+        key = self.flight_key(url, profile)
+        with self._lock:
+            inflight = self._inflight.get(key)
+            if inflight is not None and not inflight.is_final:
+                inflight.requests += 1
+                print(f"{Fore.CYAN}🔗 Petición adjuntada al trabajo en curso {inflight.id[:8]} ({inflight.requests} peticiones)")
+                return inflight
+            job = WebJob(url, key=key, profile=profile)
+            # Un acierto de la caché de salida no lanza ffmpeg: no ocupa slot ni cola
+            if self.downloader.output_cache.get(*key) is None:
+                job.ticket = self.admission.reserve()
+            self._jobs[job.id] = job
+            self._inflight[key] = job
+        self._executor.submit(self._run, job)
+        return job
+    
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def _run(self, job):
+        if job.ticket is not None:
+            self.admission.acquire(job.ticket)
+        started = time.time()
+        try:
+            result = self.downloader.download_mp3(
+                job.url, progress_hook=job.on_progress, profile=get_profile(job.profile)
+            )
+        except Exception as e:
+            result = (False, f"Error inesperado: {e}", None, None)
+        finally:
+            if job.ticket is not None:
+                self.admission.release(time.time() - started)
+        # Salir del registro antes de notificar: una petición posterior ya encuentra la caché de salida
+        with self._lock:
+            if self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+        job.finish(*result)
+    
+    def _purge_expired(self):
+        """Olvida los trabajos terminados hace más de job_ttl_seconds (sus archivos los limpia cleanup_old_files)"""
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at and now - job.finished_at > self.job_ttl_seconds
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+job_manager = WebJobManager(downloader, admission)
+
+
+def _busy_response(busy):
+    """429 con Retry-After y la posición estimada en la cola"""
+    print(f"{Fore.YELLOW}⏳ Petición rechazada: cola llena (posición {busy.queue_position}, reintentar en {busy.retry_after}s)")
+    response = jsonify({
+        'success': False,
+        'error': 'El servidor está ocupado, intenta de nuevo en unos segundos',
+        'queue_position': busy.queue_position,
+        'retry_after': busy.retry_after,
+    })
+    response.headers['Retry-After'] = str(busy.retry_after)
+    return response, 429
+
+
+# Tipo MIME por extensión de los perfiles de salida
+AUDIO_MIMETYPES = {profile.ext: profile.mimetype for profile in PROFILES.values()}
+
+
+def _requested_profile(name):
+    """Perfil de salida pedido por el cliente (el de por defecto si no indica ninguno; None si no existe)"""
+    return get_profile(name or DEFAULT_OUTPUT_PROFILE)
+
+
+def _invalid_profile_response(name):
+    return jsonify({
+        'success': False,
+        'error': f"Perfil '{name}' no válido. Opciones: {', '.join(PROFILES)}",
+    }), 400
+
+
+def _download_name(video_title, ext='mp3'):
+    """Nombre de archivo seguro para la descarga en el navegador"""
+    safe_title = re.sub(r'[^\w\s-]', '', video_title or 'audio')
+    safe_title = re.sub(r'[-\s]+', '-', safe_title)
+    return f"{safe_title}.{ext}"
+
+
+def _send_audio(file_path, title):
+    """Envía el audio con ETag (304 si el cliente ya lo tiene) y sendfile/X-Sendfile cuando el servidor lo soporta"""
+    path = Path(file_path)
+    ext = path.suffix.lstrip('.')
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name=_download_name(title, ext),
+        mimetype=AUDIO_MIMETYPES.get(ext, 'application/octet-stream'),
+        etag=downloader.output_cache.etag(path),
+        conditional=True,
+        max_age=3600
+    )
+
+
+def _send_job_file(job):
+    """Envía el audio de un trabajo terminado con los tiempos en la cabecera Server-Timing"""
+    response = _send_audio(job.file_path, job.title)
+    timing = job.metadata['timing']
+    response.headers['Server-Timing'] = (
+        f"extract;dur={timing['extract_ms']}, "
+        f"download;dur={timing['download_convert_ms']}, "
+        f"total;dur={timing['total_ms']}"
+    )
+    return response
+
+
 @app.route('/')
 def index():
     """Página principal"""
@@ -257,48 +1084,351 @@ def index():
 
 @app.route('/download', methods=['POST'])
 def download():
-    """Endpoint para descargar videos de YouTube como MP3"""
+    """Endpoint para descargar videos de YouTube como MP3 u otro perfil (compatibilidad: espera al trabajo y envía el archivo)"""
     try:
         data = request.get_json()
         url = data.get('url', '').strip()
         
         if not url:
             return jsonify({'success': False, 'error': 'Por favor ingresa una URL'}), 400
+        profile = _requested_profile(data.get('profile'))
+        if profile is None:
+            return _invalid_profile_response(data.get('profile'))
         
-        # Limpiar archivos antiguos antes de descargar
-        downloader.cleanup_old_files()
-        
-        # Descargar el video
-        success, result, video_title = downloader.download_mp3(url)
-        
-        if not success:
-            return jsonify({'success': False, 'error': result}), 400
+        # Modo streaming opcional: enviar el audio mientras se convierte
+        if data.get('stream') and profile.ext in STREAM_FORMATS:
+            if not downloader.validate_youtube_url(url):
+                return jsonify({'success': False, 'error': 'La URL no es válida de YouTube'}), 400
+            return _stream_response(url, profile)
         
-        # result contiene la ruta del archivo MP3
-        file_path = result
+        # Descargar el video en el pool de trabajos y esperar el resultado
+        job = job_manager.submit(url, profile.name)
+        job.done.wait()
         
-        # Generar nombre de archivo seguro
-        safe_title = re.sub(r'[^\w\s-]', '', video_title)
-        safe_title = re.sub(r'[-\s]+', '-', safe_title)
-        download_name = f"{safe_title}.mp3"
+        if job.state == WebJob.FAILED:
+            return jsonify({'success': False, 'error': job.error}), 400
         
         # Enviar el archivo al navegador
-        return send_file(
-            file_path,
-            as_attachment=True,
-            download_name=download_name,
-            mimetype='audio/mpeg'
-        )
+        return _send_job_file(job)
         
+    except ServerBusy as busy:
+        return _busy_response(busy)
     except Exception as e:
         print(f"{Fore.RED}❌ Error en endpoint /download: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _stream_response(url, profile):
+    """Respuesta chunked con el audio a medida que se convierte (o el archivo de caché si ya existe)"""
+    cached = downloader.output_cache.get(extract_video_id(url), profile.name)
+    if cached is not None:
+        path, meta = cached
+        return _send_audio(path, meta.get('title'))
+    
+    # El streaming también lanza un ffmpeg: espera su turno en la misma cola que los trabajos
+    ticket = admission.reserve()
+    admission.acquire(ticket)
+    started = time.time()
+    try:
+        video_title, chunks = downloader.stream_audio(url, profile)
+    except Exception:
+        admission.release()
+        raise
+    
+    # El turno se libera al cerrar la respuesta, también si el cliente se fue antes del primer chunk
+    body = ClosingIterable(chunks, lambda: admission.release(time.time() - started))
+    response = Response(body, mimetype=profile.mimetype)
+    response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(_download_name(video_title, profile.ext))}"
+    # Evitar que un proxy intermedio acumule la respuesta completa antes de reenviarla
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/stream', methods=['GET'])
+def stream():
+    """Descarga en modo streaming: el navegador recibe datos en cuanto ffmpeg empieza a codificar"""
+    url = request.args.get('url', '').strip()
+    if not url:
+        return jsonify({'success': False, 'error': 'Por favor ingresa una URL'}), 400
+    if not downloader.validate_youtube_url(url):
+        return jsonify({'success': False, 'error': 'La URL no es válida de YouTube'}), 400
+    profile = _requested_profile(request.args.get('profile'))
+    if profile is None:
+        return _invalid_profile_response(request.args.get('profile'))
+    if profile.ext not in STREAM_FORMATS:
+        return jsonify({'success': False, 'error': f"El perfil {profile.name} no admite streaming; usa /jobs"}), 400
+    try:
+        return _stream_response(url, profile)
+    except ServerBusy as busy:
+        return _busy_response(busy)
+    except Exception as e:
+        print(f"{Fore.RED}❌ Error en endpoint /stream: {e}")
+        return jsonify({'success': False, 'error': f"Error al preparar el streaming: {e}"}), 400
+
+
+class _ZipSink(io.RawIOBase):
+    """Destino no buscable para zipfile: acumula lo escrito hasta que el generador lo envía"""
+    
+    def __init__(self):
+        self._buffer = bytearray()
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self._buffer += data
+        return len(data)
+    
+    def take(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _batch_zip(urls, profile):
+    """
+    Genera un ZIP (sin compresión) con el audio de cada URL, añadiendo cada entrada en cuanto su trabajo termina
+    
+    Los trabajos pasan por el pool y la admisión como cualquier otro: se mantienen
+    como mucho `admission.max_active` en vuelo y, si la cola está llena, se reintenta
+    tras el Retry-After estimado. Nada se acumula en disco ni en memoria salvo el
+    bloque que se está enviando.
+    
+    `urls` no debe repetir videos: single-flight devolvería el mismo trabajo dos veces
+    y la ventana `in_flight` (un set) perdería la cuenta de las finalizaciones.
+    """
+    pending = list(urls)
+    in_flight = set()
+    finished = queue.Queue()
+    failures = []
+    used_names = set()
+    retry_at = 0.0
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED)
+    
+    while pending or in_flight:
+        # Mantener la ventana llena mientras la admisión lo permita
+        while pending and len(in_flight) < admission.max_active and time.time() >= retry_at:
+            try:
+                job = job_manager.submit(pending[0], profile.name)
+            except ServerBusy as busy:
+                retry_at = time.time() + busy.retry_after
+                break
+            pending.pop(0)
+            in_flight.add(job)
+            job.add_done_callback(finished.put)
+        
+        timeout = max(0.1, retry_at - time.time()) if pending and not in_flight else None
+        try:
+            job = finished.get(timeout=timeout)
+        except queue.Empty:
+            continue
+        in_flight.discard(job)
+        if job.state != WebJob.DONE or not Path(job.file_path).exists():
+            failures.append(f"{job.url}: {job.error or 'archivo no disponible'}")
+            continue
+        
+        # Nombre único dentro del ZIP (dos videos pueden tener el mismo título)
+        name = _download_name(job.title, profile.ext)
+        stem, counter = name[:-len(profile.ext) - 1], 2
+        while name in used_names:
+            name = f"{stem}-{counter}.{profile.ext}"
+            counter += 1
+        used_names.add(name)
+        
+        entry = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        entry.compress_type = zipfile.ZIP_STORED
+        with open(job.file_path, 'rb') as source, archive.open(entry, 'w') as target:
+            while True:
+                block = source.read(STREAM_CHUNK_BYTES)
+                if not block:
+                    break
+                target.write(block)
+                yield sink.take()
+        yield sink.take()
+    
+    if failures:
+        archive.writestr('errores.txt', '\n'.join(failures) + '\n')
+    archive.close()
+    yield sink.take()
+    print(f"{Fore.GREEN}📦 Lote completado: {len(used_names)} pista(s), {len(failures)} error(es)")
+
+
+@app.route('/batch', methods=['POST'])
+def batch():
+    """Descarga varias URLs (o una playlist) en paralelo y envía un ZIP que crece a medida que terminan"""
+    try:
+        data = request.get_json(silent=True) or {}
+        urls = [u.strip() for u in data.get('urls') or [] if isinstance(u, str) and u.strip()]
+        playlist = (data.get('url') or '').strip()
+        profile = _requested_profile(data.get('profile'))
+        if profile is None:
+            return _invalid_profile_response(data.get('profile'))
+        
+        if playlist:
+            # Validar antes de extraer: yt-dlp no debe consultar hosts arbitrarios (SSRF)
+            if not (downloader.validate_youtube_url(playlist) or is_youtube_collection_url(playlist)):
+                return jsonify({'success': False, 'error': 'La URL no es una playlist o canal de YouTube', 'invalid': [playlist]}), 400
+            # Una pista de más basta para detectar que se supera el límite del lote
+            urls.extend(downloader.list_entries(playlist, limit=BATCH_MAX_TRACKS + 1))
+        if not urls:
+            return jsonify({'success': False, 'error': 'Envía "urls" (lista) o "url" (playlist)'}), 400
+        invalid = [u for u in urls if not downloader.validate_youtube_url(u)]
+        if invalid:
+            return jsonify({'success': False, 'error': 'URLs no válidas de YouTube', 'invalid': invalid}), 400
+        # El mismo video repetido (aunque con otra forma de URL) compartiría un único trabajo
+        # por single-flight: se envía una sola vez y se informa cuántas se omitieron
+        unique = {}
+        for u in urls:
+            unique.setdefault(job_manager.flight_key(u, profile.name), u)
+        duplicates = len(urls) - len(unique)
+        urls = list(unique.values())
+        if len(urls) > BATCH_MAX_TRACKS:
+            return jsonify({'success': False, 'error': f'Máximo {BATCH_MAX_TRACKS} pistas por lote'}), 400
+        
+        print(f"{Fore.CYAN}📦 Lote de {len(urls)} pista(s) [{profile.name}]" + (f", {duplicates} duplicada(s) omitida(s)" if duplicates else ''))
+        response = Response(_batch_zip(urls, profile), mimetype='application/zip')
+        response.headers['Content-Disposition'] = f'attachment; filename="lote-{datetime.now():%Y%m%d-%H%M%S}.zip"'
+        response.headers['X-Batch-Duplicates'] = str(duplicates)
+        response.headers['X-Accel-Buffering'] = 'no'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+        
+    except Exception as e:
+        print(f"{Fore.RED}❌ Error en endpoint /batch: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Crea un trabajo de descarga y retorna su ID sin esperar a que termine"""
+    try:
+        data = request.get_json(silent=True) or {}
+        url = data.get('url', '').strip()
+        
+        if not url:
+            return jsonify({'success': False, 'error': 'Por favor ingresa una URL'}), 400
+        if not downloader.validate_youtube_url(url):
+            return jsonify({'success': False, 'error': 'La URL no es válida de YouTube'}), 400
+        profile = _requested_profile(data.get('profile'))
+        if profile is None:
+            return _invalid_profile_response(data.get('profile'))
+        
+        job = job_manager.submit(url, profile.name)
+        response = jsonify({
+            'success': True,
+            **job.to_dict(),
+            'status_url': url_for('job_status', job_id=job.id),
+            'events_url': url_for('job_events', job_id=job.id),
+        })
+        response.headers['Location'] = url_for('job_status', job_id=job.id)
+        return response, 202
+        
+    except ServerBusy as busy:
+        return _busy_response(busy)
+    except Exception as e:
+        print(f"{Fore.RED}❌ Error en endpoint /jobs: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Estado y progreso de un trabajo"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Trabajo no encontrado'}), 404
+    return jsonify({'success': True, **job.to_dict()})
+
+
+def _job_events(job):
+    """
+    Generador SSE del progreso de un trabajo
+    
+    Envía un evento `progress` cuando algo cambia (como mucho uno cada
+    SSE_MIN_INTERVAL_SECONDS), un comentario de latido si no hay cambios y un
+    evento final `done` o `failed` con el estado completo del trabajo.
+    """
+    version = -1
+    last_event = None
+    last_sent = 0.0
+    yield f"retry: {int(SSE_MIN_INTERVAL_SECONDS * 4000)}\n\n"
+    while True:
+        if job.is_final:
+            event_name = 'done' if job.state == WebJob.DONE else 'failed'
+            yield f"event: {event_name}\ndata: {json.dumps(job.to_dict())}\n\n"
+            return
+        
+        event = job.progress_event()
+        now = time.monotonic()
+        if event != last_event:
+            yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+            last_event, last_sent = event, now
+        elif now - last_sent >= SSE_HEARTBEAT_SECONDS:
+            yield ": keep-alive\n\n"
+            last_sent = now
+        
+        # En cola la posición cambia sin que el trabajo lo note: revisar a ritmo fijo
+        timeout = SSE_MIN_INTERVAL_SECONDS if job.state == WebJob.QUEUED else SSE_HEARTBEAT_SECONDS
+        version = job.wait_for_change(version, timeout)
+        # Limitar la frecuencia: agrupar los cambios que lleguen dentro del intervalo mínimo
+        remaining = last_sent + SSE_MIN_INTERVAL_SECONDS - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Progreso del trabajo en vivo (Server-Sent Events): EventSource('/jobs/<id>/events')"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Trabajo no encontrado'}), 404
+    response = Response(stream_with_context(_job_events(job)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route('/jobs/<job_id>/file', methods=['GET'])
+def job_file(job_id):
+    """Archivo de audio de un trabajo terminado"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Trabajo no encontrado'}), 404
+    if job.state == WebJob.FAILED:
+        return jsonify({'success': False, 'error': job.error}), 400
+    if job.state != WebJob.DONE:
+        return jsonify({'success': False, 'error': 'El trabajo aún no terminó', 'state': job.state}), 409
+    if not Path(job.file_path).exists():
+        return jsonify({'success': False, 'error': 'El archivo ya no está disponible'}), 410
+    return _send_job_file(job)
+
+
+@app.route('/audio/<video_id>', methods=['GET'])
+def cached_audio(video_id):
+    """Audio ya convertido de un video (perfil en ?profile=), servido directamente desde la caché de salida"""
+    profile = _requested_profile(request.args.get('profile'))
+    if profile is None:
+        return _invalid_profile_response(request.args.get('profile'))
+    cached = downloader.output_cache.get(video_id, profile.name)
+    if cached is None:
+        return jsonify({'success': False, 'error': 'El audio no está en caché'}), 404
+    path, meta = cached
+    return _send_audio(path, meta.get('title'))
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Endpoint de salud del servidor"""
-    return jsonify({'status': 'ok', 'message': 'Server is running'})
+    admission_stats = admission.stats()
+    return jsonify({
+        'status': 'busy' if admission_stats['queued'] >= admission_stats['max_queued'] + admission_stats['max_active'] - admission_stats['active'] else 'ok',
+        'message': 'Server is running',
+        'cache': downloader.output_cache.stats(),
+        'source_cache': downloader.source_cache.stats(),
+        'profiles': list(PROFILES),
+        'queue': admission_stats,
+    })
 
 
 # ==================== ADMIN ENDPOINTS ====================
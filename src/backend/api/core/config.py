@@ -6,6 +6,15 @@ class Settings(BaseSettings):
     base_dir: Path = Path(__file__).resolve().parent.parent.parent.parent.parent
     download_dir: Path = base_dir / "downloads"
     temp_dir: Path = base_dir / "temp"
+    max_concurrent_downloads: int = 3  # Descargas simultáneas iniciales
+    adaptive_concurrency: bool = True  # Ajustar las descargas simultáneas según el throughput medido
+    max_adaptive_downloads: int = 8
+    bandwidth_limit: int = 0  # Límite global en bytes/s compartido por todas las descargas (0 = sin límite)
+    bandwidth_limit_hours: str = ""  # p. ej. "8-19": el límite solo rige en ese horario
+    max_transcode_workers: int = 0  # 0 = un worker de ffmpeg por núcleo de CPU
+    info_cache_ttl: int = 6 * 3600
+    default_codec: str = "mp3"  # mp3 | native | perfil (mp3-128, mp3-320, mp3-v0, mp3-v2, opus, m4a...)
+    source_cache_max_mb: int = 4096  # Cuota de la caché de audio original por video (0 = desactivada)
 
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
 
@@ -9,3 +9,6 @@ class DownloadError(AppError):
 
 class FileSystemError(AppError):
     pass
+
+class DownloadCancelledError(DownloadError):
+    pass
@@ -8,3 +8,28 @@ def is_valid_youtube_url(url: str) -> bool:
         r'(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})'
     )
     return re.match(youtube_regex, url) is not None
+
+
+# ID canónico de YouTube: 11 caracteres [A-Za-z0-9_-]
+_VIDEO_ID_PATTERNS = (
+    re.compile(r'[?&]v=([0-9A-Za-z_-]{11})(?![0-9A-Za-z_-])'),
+    re.compile(r'youtu\.be/([0-9A-Za-z_-]{11})(?![0-9A-Za-z_-])'),
+    re.compile(r'/(?:embed|v|shorts|live)/([0-9A-Za-z_-]{11})(?![0-9A-Za-z_-])'),
+)
+
+def extract_video_id(url: str) -> str | None:
+    """Extrae el ID canónico de 11 caracteres de una URL de YouTube (o None si no se reconoce)."""
+    for pattern in _VIDEO_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def is_youtube_collection_url(url: str) -> bool:
+    """Indica si la URL es una playlist o un canal de YouTube (admite extracción plana)."""
+    return re.match(
+        r'(https?://)?(www\.|m\.|music\.)?youtube\.com/'
+        r'(playlist\?|watch\?.*list=|channel/|c/|user/|@)',
+        url
+    ) is not None
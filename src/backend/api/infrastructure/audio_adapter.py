@@ -1,9 +1,16 @@
 import re
-import yt_dlp
-import imageio_ffmpeg
+import copy
 from pathlib import Path
 from typing import Callable
-from src.backend.api.core.exceptions import DownloadError
+from yt_dlp.utils import sanitize_filename
+from src.backend.api.core.config import settings
+from src.backend.api.core.utils import extract_video_id
+from src.backend.api.core.exceptions import DownloadError, DownloadCancelledError
+from src.backend.api.infrastructure.info_cache import InfoCache
+from src.backend.api.infrastructure.ydl_pool import YdlPool, get_ffmpeg_path
+from src.backend.api.infrastructure.transcoder import FfmpegTranscoder
+from src.backend.api.infrastructure.output_cache import OutputCache
+from src.backend.api.infrastructure.output_profiles import COPY_ARGS, PROFILES, SOURCE_PROFILE
 
 # Elimina secuencias ANSI de color que yt-dlp inyecta en sus strings
 _ANSI = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
@@ -13,58 +20,273 @@ def _strip(text: str) -> str:
 
 
 class YtDlpAdapter:
-    def download_audio(
+    # Modos de códec: "mp3" recodifica a MP3 192k; "native" conserva el audio original (m4a/opus) sin recodificar;
+    # el resto son perfiles de salida (mp3-128/192/320, mp3-v0/v2, opus, m4a)
+    CODECS = ("mp3", "native", *PROFILES)
+    # Clave de calidad (códec-bitrate) por modo, usada en el índice de contenido
+    QUALITIES = {"mp3": "mp3-192", "native": "native", **{name: name for name in PROFILES}}
+
+    def __init__(self, pool_size: int | None = None, info_cache: InfoCache | None = None):
+        size = pool_size or max(settings.max_concurrent_downloads, settings.max_adaptive_downloads)
+        # Las instancias solo descargan: la conversión con ffmpeg es una etapa aparte (ver transcode)
+        self.pool = YdlPool(self._build_opts, size)
+        self.transcoder = FfmpegTranscoder()
+        # Directorio de trabajo para el audio descargado aún sin convertir
+        self.work_dir = settings.temp_dir / "fetch"
+        # Caché de extracción por ID de video (reintentos, variantes y prompts no re-extraen)
+        self.info_cache = info_cache or InfoCache(settings.temp_dir / "info_cache", settings.info_cache_ttl)
+        # Audio original por ID de video: un perfil nuevo de un video conocido se convierte sin volver a descargar
+        self.source_cache = OutputCache(settings.temp_dir / "source_cache", settings.source_cache_max_mb * 1024 * 1024)
+
+    @classmethod
+    def resolve_codec(cls, codec: str | None) -> str:
+        """Normaliza el modo de códec (o el configurado por defecto si no se indica)."""
+        codec = (codec or settings.default_codec or "mp3").lower()
+        return codec if codec in cls.CODECS else "mp3"
+
+    @classmethod
+    def quality_for(cls, codec: str | None) -> str:
+        return cls.QUALITIES[cls.resolve_codec(codec)]
+
+    def warm_up(self) -> None:
+        """Pre-inicializa las instancias de YoutubeDL del pool (pensado para un hilo en segundo plano)."""
+        try:
+            self.pool.warm_up()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        self.pool.close()
+
+    @staticmethod
+    def _build_opts() -> dict:
+        """Opciones base compartidas por todas las instancias del pool (sin postprocesadores)."""
+        return {
+            "ffmpeg_location": get_ffmpeg_path(),
+            "format": "bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best",
+            # Nombre estable por ID de video: un .part huérfano se continúa con HTTP Range
+            "continuedl": True,
+            "quiet": True,
+            "no_warnings": True,
+        }
+
+    def fetch_info(self, url: str) -> dict:
+        """Metadatos del video (título, duración, autor, formatos) desde la caché o con una extracción sin descarga."""
+        cached = self.info_cache.get(extract_video_id(url))
+        if cached is not None:
+            return cached
+        try:
+            with self.pool.acquire() as ydl:
+                info = ydl.extract_info(url, download=False)
+        except Exception as e:
+            raise DownloadError(_strip(str(e)))
+        return self.info_cache.put(info) or info
+
+    def list_entries(self, url: str, max_depth: int = 2) -> list[dict]:
+        """Lista los videos de una playlist o canal con extracción plana (sin resolver cada video)."""
+        try:
+            with self.pool.acquire() as ydl:
+                previous = ydl.params.get("extract_flat")
+                ydl.params["extract_flat"] = "in_playlist"
+                try:
+                    info = ydl.extract_info(url, download=False)
+                finally:
+                    ydl.params["extract_flat"] = previous
+        except Exception as e:
+            raise DownloadError(_strip(str(e)))
+
+        entries = []
+        for entry in (info or {}).get("entries") or []:
+            if not entry:
+                continue
+            entry_url = entry.get("url") or entry.get("webpage_url") or ""
+            # Los canales devuelven pestañas (Videos, Shorts...) como sub-playlists
+            if entry.get("_type") == "url" and entry.get("ie_key") == "YoutubeTab":
+                if max_depth > 1 and entry_url:
+                    entries.extend(self.list_entries(entry_url, max_depth - 1))
+                continue
+            if entry.get("id") and not entry_url.startswith("http"):
+                entry_url = f"https://www.youtube.com/watch?v={entry['id']}"
+            if not entry_url:
+                continue
+            entries.append({
+                "url": entry_url,
+                "title": entry.get("title"),
+                "uploader": entry.get("uploader") or entry.get("channel"),
+            })
+        if not entries and info and info.get("id") and not info.get("entries"):
+            # No era una colección: un único video
+            entries.append({"url": url, "title": info.get("title"), "uploader": info.get("uploader")})
+        return entries
+
+    def _extract_and_download(self, ydl, url: str) -> dict:
+        """Descarga reutilizando el info dict cacheado si sus URLs firmadas siguen vigentes."""
+        video_id = extract_video_id(url)
+        cached = self.info_cache.get_playable(video_id)
+        if cached is not None:
+            try:
+                return ydl.process_ie_result(copy.deepcopy(cached), download=True)
+            except DownloadCancelledError:
+                raise
+            except Exception:
+                # URLs rechazadas (p. ej. 403): descartar la entrada y extraer de nuevo
+                self.info_cache.invalidate(video_id)
+        info = ydl.extract_info(url, download=True)
+        self.info_cache.put(info)
+        return info
+
+    def fetch_audio(
         self,
         url: str,
-        output_path: Path,
         progress_callback: Callable[[str, str], None] | None = None,
-    ) -> Path:
-        ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
+        status_callback: Callable[[str], None] | None = None,
+        sample_callback: Callable[[dict], None] | None = None,
+        fragments: int = 1,
+    ) -> tuple[Path, dict]:
+        """Etapa de red: descarga el mejor audio disponible sin convertir.
+
+        `sample_callback` recibe el dict crudo de cada hook (bytes, total, velocidad, eta)
+        para el progreso y la medición de throughput; `progress_callback` solo recibe
+        mensajes de fase. `fragments` fija las descargas de fragmentos simultáneas (DASH/HLS).
+
+        Retorna la ruta del archivo descargado (en el directorio de trabajo, o en la
+        caché de fuentes si el video ya se descargó antes) y un resumen del video
+        (título y códec de audio) para la etapa de conversión.
+        """
+        video_id = extract_video_id(url)
+        cached = self.source_cache.get(video_id, SOURCE_PROFILE) if settings.source_cache_max_mb else None
+        if cached is not None:
+            raw_path, meta = cached
+            if progress_callback is not None:
+                progress_callback("  source audio cached, skipping download...", "muted")
+            return raw_path, {"id": video_id, "title": meta.get("title") or raw_path.stem, "acodec": meta.get("acodec")}
 
         def _hook(d: dict):
-            if progress_callback is None:
-                return
+            # El progreso por chunk viaja como dict numérico (sample_callback), sin formatear texto aquí
+            if sample_callback is not None:
+                sample_callback(d)
             if d["status"] == "downloading":
-                percent_raw = _strip(d.get("_percent_str", "0%"))
-                speed_raw   = _strip(d.get("_speed_str", "--"))
-                eta_raw     = _strip(d.get("_eta_str", "--"))
-                try:
-                    pct = float(percent_raw.replace("%", ""))
-                except ValueError:
-                    pct = 0.0
-                bar = _dot_bar(pct)
-                msg = f"  {bar}  {percent_raw:<6}  {speed_raw:<12}  eta {eta_raw}"
-                progress_callback(msg, "progress")
-            elif d["status"] == "finished":
-                progress_callback("  converting to mp3...", "muted")
-
-        ydl_opts = {
-            "ffmpeg_location": ffmpeg_path,
-            "format": "bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best",
-            "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "192"}],
-            "outtmpl": str(output_path / "%(title)s.%(ext)s"),
-            "quiet": True,
-            "no_warnings": True,
-            "progress_hooks": [_hook],
-        }
+                if status_callback is not None:
+                    status_callback("downloading")
+            elif d["status"] == "finished" and progress_callback is not None:
+                progress_callback("  download complete, waiting for converter...", "muted")
+
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        outtmpl = str(self.work_dir / "%(id)s.%(ext)s")
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=True)
-                mp3_path = Path(ydl.prepare_filename(info)).with_suffix(".mp3")
-                if mp3_path.exists():
-                    return mp3_path
-                raise DownloadError("Archivo MP3 no encontrado tras la descarga.")
+            with self.pool.acquire(outtmpl, _hook) as ydl:
+                # Se copia en los parámetros del descargador al iniciar cada descarga
+                ydl.params["concurrent_fragment_downloads"] = max(1, fragments)
+                info = self._extract_and_download(ydl, url)
+                requested = info.get("requested_downloads") or []
+                if requested and requested[0].get("filepath"):
+                    raw_path = Path(requested[0]["filepath"])
+                else:
+                    raw_path = Path(ydl.prepare_filename(info))
+                if not raw_path.exists():
+                    raise DownloadError("Archivo de audio no encontrado tras la descarga.")
+                return raw_path, {
+                    "id": info.get("id"),
+                    "title": info.get("title") or raw_path.stem,
+                    "acodec": (requested[0] if requested else info).get("acodec"),
+                }
         except DownloadError:
             raise
         except Exception as e:
             raise DownloadError(_strip(str(e)))
 
+    def transcode(
+        self,
+        raw_path: Path,
+        info: dict,
+        output_path: Path,
+        codec: str | None = None,
+        progress_callback: Callable[[str, str], None] | None = None,
+        checkpoint: Callable[[], None] | None = None,
+        filename: str | None = None,
+        tags: dict | None = None,
+    ) -> Path:
+        """Etapa de CPU: convierte el audio descargado al códec pedido dentro del álbum destino.
+
+        Escribe directamente el nombre final (`filename`, o el título del video) y
+        las etiquetas `tags` en la misma pasada de ffmpeg. Este método es el dueño
+        del audio original: si ffmpeg lo rechaza se borra (puede estar truncado o
+        dañado); en cualquier otro caso pasa a la caché de fuentes (ver `release_source`).
+        """
+        try:
+            if checkpoint is not None:
+                checkpoint()
+            codec = self.resolve_codec(codec)
+            ext, codec_args = self.transcoder.output_format(codec, raw_path, info.get("acodec"))
+            if progress_callback is not None:
+                if codec_args == COPY_ARGS:
+                    progress_callback("  remuxing (stream copy)...", "muted")
+                else:
+                    progress_callback(f"  converting to {ext} ({self.quality_for(codec)})...", "muted")
+            stem = filename or sanitize_filename(info.get("title") or raw_path.stem)
+            target = output_path / f"{stem}.{ext}"
+            path = self.transcoder.transcode(
+                raw_path, target, codec_args=codec_args, metadata=tags, checkpoint=checkpoint
+            )
+        except DownloadCancelledError:
+            # Cancelación: el audio original está completo y sigue sirviendo
+            self.release_source(raw_path, info)
+            raise
+        except DownloadError:
+            # ffmpeg falló: no se cachea un original que fallaría en cada perfil posterior
+            self.discard_source(raw_path, info)
+            raise
+        except BaseException:
+            self.release_source(raw_path, info)
+            raise
+        self.release_source(raw_path, info)
+        return path
+
+    def release_source(self, raw_path: Path, info: dict) -> None:
+        """Guarda el audio descargado en la caché de fuentes (o lo borra si no puede cachearse)."""
+        if raw_path.parent == self.source_cache.cache_dir or not raw_path.exists():
+            return
+        if info.get("id") and settings.source_cache_max_mb:
+            try:
+                self.source_cache.put(info["id"], SOURCE_PROFILE, raw_path, {
+                    "title": info.get("title"),
+                    "acodec": info.get("acodec"),
+                })
+                self.source_cache.evict()
+                self.source_cache.save_index()
+                return
+            except OSError:
+                pass
+        try:
+            raw_path.unlink()
+        except OSError:
+            pass
+
+    def discard_source(self, raw_path: Path, info: dict) -> None:
+        """Borra un audio original que no debe reutilizarse (si venía de la caché de fuentes, también su entrada)."""
+        if raw_path.parent == self.source_cache.cache_dir:
+            if info.get("id"):
+                self.source_cache.invalidate(info["id"], SOURCE_PROFILE)
+            return
+        try:
+            raw_path.unlink()
+        except OSError:
+            pass
+
+    def download_audio(
+        self,
+        url: str,
+        output_path: Path,
+        progress_callback: Callable[[str, str], None] | None = None,
+        status_callback: Callable[[str], None] | None = None,
+        codec: str | None = None,
+        tags: dict | None = None,
+        sample_callback: Callable[[dict], None] | None = None,
+    ) -> Path:
+        """Descarga y convierte en el mismo hilo (uso síncrono, sin la cola por etapas)."""
+        raw_path, info = self.fetch_audio(url, progress_callback, status_callback, sample_callback)
+        if status_callback is not None:
+            status_callback("converting")
+        return self.transcode(raw_path, info, output_path, codec, progress_callback, tags=tags)
 
-def _dot_bar(percent: float, width: int = 20) -> str:
-    """Barra minimalista de puntos: ···············╸"""
-    filled = int((percent / 100) * width)
-    if filled >= width:
-        return "·" * width
-    bar = "·" * filled + "╸" + " " * (width - filled - 1)
-    return bar
@@ -0,0 +1,153 @@
+import os
+import re
+import json
+import time
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+# Campos del info dict de yt-dlp que se conservan en caché
+_INFO_KEYS = (
+    "id", "title", "fulltitle", "duration", "uploader", "channel", "thumbnail",
+    "webpage_url", "original_url", "extractor", "extractor_key", "upload_date",
+)
+# Campos de cada formato necesarios para que yt-dlp pueda descargarlo sin re-extraer
+_FORMAT_KEYS = (
+    "format_id", "format_note", "url", "ext", "protocol", "acodec", "vcodec",
+    "abr", "asr", "tbr", "audio_channels", "filesize", "filesize_approx",
+    "container", "quality", "source_preference", "language", "http_headers",
+    "downloader_options",
+)
+
+_EXPIRE_PATH = re.compile(r"/expire/(\d+)")
+
+# Margen de seguridad antes de la caducidad de las URLs firmadas
+_STREAM_MARGIN_SECONDS = 120
+
+
+class InfoCache:
+    """Caché en disco (un JSON por ID de video) de la extracción de yt-dlp con TTL.
+
+    Guarda un info dict recortado (título, duración, autor, miniatura y lista de
+    formatos de audio). Los metadatos caducan por TTL; las URLs firmadas de los
+    streams caducan además según su propio parámetro `expire`.
+    """
+
+    def __init__(self, cache_dir: Path, ttl_seconds: int = 6 * 3600):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def _entry_path(self, video_id: str) -> Path:
+        return self.cache_dir / f"{video_id}.json"
+
+    def _read(self, video_id: str) -> dict | None:
+        path = self._entry_path(video_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) <= time.time():
+            self.invalidate(video_id)
+            return None
+        return entry
+
+    def get(self, video_id: str) -> dict | None:
+        """Metadatos vigentes (dentro del TTL) aunque las URLs de stream ya hayan caducado."""
+        if not video_id:
+            return None
+        entry = self._read(video_id)
+        return entry["info"] if entry else None
+
+    def get_playable(self, video_id: str) -> dict | None:
+        """Info dict reutilizable para descargar: solo si las URLs firmadas siguen vigentes."""
+        if not video_id:
+            return None
+        entry = self._read(video_id)
+        if not entry or not entry["info"].get("formats"):
+            return None
+        if entry.get("streams_expire_at", 0) - _STREAM_MARGIN_SECONDS <= time.time():
+            return None
+        return entry["info"]
+
+    def put(self, info: dict) -> dict | None:
+        """Recorta y guarda el info dict. Retorna la versión recortada."""
+        video_id = info.get("id") if info else None
+        if not video_id:
+            return None
+        trimmed = self.trim_info(info)
+        now = time.time()
+        entry = {
+            "cached_at": now,
+            "expires_at": now + self.ttl_seconds,
+            "streams_expire_at": self._streams_expiry(trimmed["formats"], now),
+            "info": trimmed,
+        }
+        path = self._entry_path(video_id)
+        with self._lock:
+            try:
+                tmp_path = path.with_suffix(".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except OSError:
+                pass
+        return trimmed
+
+    def invalidate(self, video_id: str) -> None:
+        try:
+            self._entry_path(video_id).unlink()
+        except OSError:
+            pass
+
+    def purge_expired(self) -> int:
+        """Elimina las entradas caducadas. Retorna cuántas se borraron."""
+        removed = 0
+        now = time.time()
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    expired = json.load(f).get("expires_at", 0) <= now
+            except (OSError, ValueError):
+                expired = True
+            if expired:
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    @staticmethod
+    def trim_info(info: dict) -> dict:
+        trimmed = {k: info[k] for k in _INFO_KEYS if info.get(k) is not None}
+        formats = []
+        for fmt in info.get("formats") or []:
+            # Solo formatos con audio: el selector pide bestaudio (o best como último recurso)
+            if fmt.get("acodec") == "none" or not fmt.get("url"):
+                continue
+            formats.append({k: fmt[k] for k in _FORMAT_KEYS if fmt.get(k) is not None})
+        trimmed["formats"] = formats
+        return trimmed
+
+    def _streams_expiry(self, formats: list, now: float) -> float:
+        """Caducidad más temprana de las URLs firmadas (o el TTL si no declaran `expire`)."""
+        expiries = []
+        for fmt in formats:
+            url = fmt.get("url", "")
+            values = parse_qs(urlparse(url).query).get("expire")
+            if values:
+                expiries.append(values[0])
+            else:
+                match = _EXPIRE_PATH.search(url)
+                if match:
+                    expiries.append(match.group(1))
+        parsed = []
+        for value in expiries:
+            try:
+                parsed.append(float(value))
+            except ValueError:
+                pass
+        return min(parsed) if parsed else now + self.ttl_seconds
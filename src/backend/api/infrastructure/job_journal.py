@@ -0,0 +1,99 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+# Etapas persistidas de un trabajo pendiente
+STAGE_QUEUED = "queued"    # Falta todo: descarga y conversión
+STAGE_FETCHED = "fetched"  # Audio descargado en el directorio de trabajo, falta convertir
+
+
+class JobJournal:
+    """Diario SQLite de la cola de descargas: sobrevive a cierres y caídas de la aplicación.
+
+    Guarda los trabajos en cola o en curso con sus metadatos y la última etapa
+    completada; los trabajos en estado final se borran del diario.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Una sola conexión compartida por los workers de ambas etapas (serializada con el lock)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    album_dir TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    raw_path TEXT,
+                    info TEXT,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            # Filas de la sesión anterior: solo estas se reanudan (nunca las de trabajos de esta sesión)
+            self.previous_max_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM jobs").fetchone()[0]
+
+    def add(self, job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, url, album_dir, metadata, stage, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    job.id,
+                    job.url,
+                    str(job.album_dir),
+                    json.dumps(job.metadata, ensure_ascii=False),
+                    STAGE_QUEUED,
+                    job.created_at.isoformat(),
+                ),
+            )
+
+    def mark_fetched(self, job_id: int, raw_path: Path, info: dict) -> None:
+        """La etapa de red terminó: al reanudar solo falta la conversión."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET stage = ?, raw_path = ?, info = ? WHERE id = ?",
+                (STAGE_FETCHED, str(raw_path), json.dumps(info, ensure_ascii=False), job_id),
+            )
+
+    def remove(self, job_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def take_pending(self) -> list[dict]:
+        """Retorna los trabajos pendientes de la sesión anterior y los quita del diario (se re-encolan con IDs nuevos).
+
+        Solo toma las filas que existían al abrir el diario: un trabajo encolado en esta
+        sesión antes de la reanudación conserva su fila y no se encola dos veces.
+        """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT url, album_dir, metadata, stage, raw_path, info FROM jobs WHERE id <= ? ORDER BY id",
+                (self.previous_max_id,),
+            ).fetchall()
+            self._conn.execute("DELETE FROM jobs WHERE id <= ?", (self.previous_max_id,))
+        pending = []
+        for url, album_dir, metadata, stage, raw_path, info in rows:
+            try:
+                pending.append({
+                    "url": url,
+                    "album_dir": Path(album_dir),
+                    "metadata": json.loads(metadata),
+                    "stage": stage,
+                    "raw_path": Path(raw_path) if raw_path else None,
+                    "info": json.loads(info) if info else None,
+                })
+            except ValueError:
+                continue
+        return pending
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import shutil
+import threading
+from pathlib import Path
+
+_INDEX_FILE = "index.json"
+
+
+class OutputCache:
+    """Caché persistente de audio por ID de video y perfil (códec-bitrate, o "source" para el original).
+
+    Tiene una cuota en bytes: al superarla se desalojan primero las entradas usadas
+    hace más tiempo (LRU). El desalojo lo hace `evict()`, pensado para un hilo
+    conserje periódico y no para el camino de cada petición.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 2 * 1024 ** 3):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries: dict[str, dict] = {}
+        self._load_index()
+
+    @staticmethod
+    def _key(video_id: str, profile: str) -> str:
+        return f"{video_id}.{profile}"
+
+    # ── Índice ────────────────────────────────────────────────────────────────
+
+    def _load_index(self) -> None:
+        """Carga el índice y lo concilia con los archivos que realmente hay en disco."""
+        try:
+            with open(self.cache_dir / _INDEX_FILE, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        for key, entry in list(entries.items()):
+            path = self.cache_dir / entry.get("file", "")
+            if not entry.get("file") or not path.is_file():
+                del entries[key]
+        # Archivos sin entrada (índice perdido): se adoptan usando su mtime como último acceso
+        known = {entry["file"] for entry in entries.values()}
+        for path in self.cache_dir.iterdir():
+            if path.name == _INDEX_FILE or path.name in known or path.name.startswith(".") or not path.is_file():
+                continue
+            stat = path.stat()
+            entries[path.stem] = {
+                "file": path.name,
+                "size": stat.st_size,
+                "last_access": stat.st_mtime,
+                "hits": 0,
+                "meta": {},
+            }
+        self._entries = entries
+        self._dirty = True
+
+    def save_index(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self._entries, ensure_ascii=False)
+            self._dirty = False
+        try:
+            tmp_path = self.cache_dir / f".{_INDEX_FILE}.tmp"
+            tmp_path.write_text(snapshot, encoding="utf-8")
+            os.replace(tmp_path, self.cache_dir / _INDEX_FILE)
+        except OSError:
+            pass
+
+    # ── Operaciones ───────────────────────────────────────────────────────────
+
+    def get(self, video_id: str, profile: str) -> tuple[Path, dict] | None:
+        """Retorna (archivo, metadatos) si está en caché y lo marca como recién usado."""
+        if not video_id:
+            return None
+        key = self._key(video_id, profile)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            path = self.cache_dir / entry["file"]
+            if not path.is_file():
+                del self._entries[key]
+                self._dirty = True
+                return None
+            entry["last_access"] = time.time()
+            entry["hits"] += 1
+            self._dirty = True
+            return path, dict(entry["meta"])
+
+    def put(self, video_id: str, profile: str, source_path: Path, meta: dict | None = None) -> Path:
+        """Mueve el archivo convertido a la caché (en el mismo sistema de archivos, sin copia) y lo registra."""
+        key = self._key(video_id, profile)
+        target = self.cache_dir / f"{key}{Path(source_path).suffix}"
+        shutil.move(str(source_path), str(target))
+        with self._lock:
+            self._entries[key] = {
+                "file": target.name,
+                "size": target.stat().st_size,
+                "last_access": time.time(),
+                "hits": 0,
+                "meta": dict(meta or {}),
+            }
+            self._dirty = True
+        return target
+
+    def invalidate(self, video_id: str, profile: str) -> None:
+        """Borra una entrada que resultó inservible (p. ej. un audio original que ffmpeg rechaza)."""
+        key = self._key(video_id, profile)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return
+            self._dirty = True
+        try:
+            (self.cache_dir / entry["file"]).unlink()
+        except OSError:
+            pass
+
+    def partial_path(self, video_id: str, profile: str, ext: str) -> Path:
+        """Ruta temporal (oculta, ignorada por el índice) para escribir una entrada antes de `put`."""
+        return self.cache_dir / f".{self._key(video_id, profile)}.{os.getpid()}.{threading.get_ident()}.{ext}"
+
+    def etag(self, path: Path) -> str:
+        stat = path.stat()
+        return f"{path.stem}-{stat.st_size:x}-{int(stat.st_mtime):x}"
+
+    def evict(self) -> int:
+        """Desaloja entradas LRU hasta quedar bajo la cuota. Retorna cuántas se borraron."""
+        removed = 0
+        with self._lock:
+            total = sum(entry["size"] for entry in self._entries.values())
+            if total <= self.max_bytes:
+                return 0
+            for key, entry in sorted(self._entries.items(), key=lambda item: item[1]["last_access"]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    (self.cache_dir / entry["file"]).unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    continue
+                total -= entry["size"]
+                del self._entries[key]
+                removed += 1
+            self._dirty = True
+        return removed
+
+    def purge_partials(self, max_age_seconds: int = 3600) -> None:
+        """Borra escrituras temporales abandonadas (p. ej. de un proceso caído)."""
+        now = time.time()
+        for path in self.cache_dir.glob(".*"):
+            if path.name == f".{_INDEX_FILE}.tmp":
+                continue
+            try:
+                if now - path.stat().st_mtime > max_age_seconds:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(entry["size"] for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,72 @@
+"""Perfiles de salida (códec + calidad) compartidos por la app de escritorio, el servidor web y la consola.
+
+Solo usa la librería estándar para poder importarse desde `src/app.py` y `src/server.py`.
+"""
+
+# Argumentos de ffmpeg para conservar el audio sin recodificar
+COPY_ARGS = ["-c:a", "copy"]
+
+# Perfil con el que se indexa el audio original (sin convertir) en la caché de fuentes
+SOURCE_PROFILE = "source"
+
+
+class OutputProfile:
+    """Parámetros de un formato de salida.
+
+    `copy_codecs` lista los códecs de origen que ya cumplen el perfil: en ese caso
+    el audio se copia tal cual (p. ej. AAC de YouTube → m4a) en lugar de recodificar.
+    """
+
+    __slots__ = ("name", "ext", "encoder_args", "mimetype", "copy_codecs", "postprocessor", "description")
+
+    def __init__(
+        self,
+        name: str,
+        ext: str,
+        encoder_args: list[str],
+        mimetype: str,
+        postprocessor: tuple[str, str],
+        description: str,
+        copy_codecs: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.ext = ext
+        self.encoder_args = encoder_args
+        self.mimetype = mimetype
+        # (preferredcodec, preferredquality) equivalentes para FFmpegExtractAudio de yt-dlp
+        self.postprocessor = postprocessor
+        self.description = description
+        self.copy_codecs = copy_codecs
+
+    def ffmpeg_args(self, source_codec: str | None = None) -> list[str]:
+        """Argumentos de códec de ffmpeg para un audio de origen con el códec indicado."""
+        if source_codec and source_codec in self.copy_codecs:
+            return list(COPY_ARGS)
+        return list(self.encoder_args)
+
+    def ytdlp_postprocessor(self) -> dict:
+        """Postprocesador de yt-dlp (para quien convierte dentro de la propia descarga)."""
+        codec, quality = self.postprocessor
+        return {"key": "FFmpegExtractAudio", "preferredcodec": codec, "preferredquality": quality}
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        OutputProfile("mp3-128", "mp3", ["-c:a", "libmp3lame", "-b:a", "128k"], "audio/mpeg", ("mp3", "128"), "MP3 CBR 128 kbps"),
+        OutputProfile("mp3-192", "mp3", ["-c:a", "libmp3lame", "-b:a", "192k"], "audio/mpeg", ("mp3", "192"), "MP3 CBR 192 kbps"),
+        OutputProfile("mp3-320", "mp3", ["-c:a", "libmp3lame", "-b:a", "320k"], "audio/mpeg", ("mp3", "320"), "MP3 CBR 320 kbps"),
+        # En yt-dlp una calidad de 0 a 10 es VBR (-q:a), igual que en LAME
+        OutputProfile("mp3-v0", "mp3", ["-c:a", "libmp3lame", "-q:a", "0"], "audio/mpeg", ("mp3", "0"), "MP3 VBR V0 (~245 kbps)"),
+        OutputProfile("mp3-v2", "mp3", ["-c:a", "libmp3lame", "-q:a", "2"], "audio/mpeg", ("mp3", "2"), "MP3 VBR V2 (~190 kbps)"),
+        OutputProfile("opus", "opus", ["-c:a", "libopus", "-b:a", "128k"], "audio/ogg", ("opus", "128"), "Opus 128 kbps", ("opus",)),
+        OutputProfile("m4a", "m4a", ["-c:a", "aac", "-b:a", "192k"], "audio/mp4", ("m4a", "192"), "AAC 192 kbps (m4a)", ("aac", "mp4a")),
+    )
+}
+
+DEFAULT_PROFILE = "mp3-192"
+
+
+def get_profile(name: str | None) -> OutputProfile | None:
+    """Perfil por nombre (sin distinguir mayúsculas); el perfil por defecto si no se indica, None si no existe."""
+    return PROFILES.get((name or DEFAULT_PROFILE).lower())
@@ -0,0 +1,102 @@
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Callable
+from src.backend.api.core.exceptions import DownloadError
+from src.backend.api.infrastructure.ydl_pool import get_ffmpeg_path
+from src.backend.api.infrastructure.output_profiles import COPY_ARGS, DEFAULT_PROFILE, PROFILES
+
+# Contenedor de salida por códec de origen al conservar el audio sin recodificar (modo "native")
+_NATIVE_CONTAINERS = {
+    "aac": "m4a",
+    "mp4a": "m4a",
+    "opus": "opus",
+    "vorbis": "ogg",
+    "mp3": "mp3",
+}
+# Códec probable según la extensión del archivo descargado (si yt-dlp no lo informó)
+_CODEC_BY_EXT = {"m4a": "aac", "mp4": "aac", "webm": "opus", "opus": "opus", "ogg": "vorbis", "mp3": "mp3"}
+
+# Contenedores donde ffmpeg conserva claves de metadatos arbitrarias (ID3 TXXX / comentarios Vorbis);
+# en M4A solo escribe las claves estándar (title, artist, album, comment...)
+CUSTOM_TAG_EXTENSIONS = (".mp3", ".opus", ".ogg")
+
+# Intervalo de sondeo del proceso ffmpeg (para atender cancelaciones)
+_POLL_SECONDS = 0.2
+
+
+class FfmpegTranscoder:
+    """Etapa de conversión: convierte el audio descargado con ffmpeg, fuera del hilo de red."""
+
+    @staticmethod
+    def output_format(codec: str, source_path: Path, acodec: str | None = None) -> tuple[str, list[str]]:
+        """(extensión final, argumentos de códec de ffmpeg) según el modo/perfil y el audio de origen.
+
+        `codec` es "native" o el nombre de un perfil de salida (ver `output_profiles`).
+        """
+        source_codec = (acodec or "").split(".")[0].lower() or _CODEC_BY_EXT.get(source_path.suffix.lstrip(".").lower())
+        if codec == "native":
+            if source_codec in _NATIVE_CONTAINERS:
+                return _NATIVE_CONTAINERS[source_codec], list(COPY_ARGS)
+            # Códec desconocido: se recodifica con el perfil por defecto en lugar de adivinar un contenedor
+            codec = DEFAULT_PROFILE
+        profile = PROFILES.get(codec) or PROFILES[DEFAULT_PROFILE]
+        return profile.ext, profile.ffmpeg_args(source_codec)
+
+    def transcode(
+        self,
+        source_path: Path,
+        target_path: Path,
+        codec_args: list[str] | None = None,
+        metadata: dict | None = None,
+        checkpoint: Callable[[], None] | None = None,
+    ) -> Path:
+        """Convierte `source_path` en `target_path` con `codec_args` (por defecto, el perfil MP3 192k).
+
+        Las etiquetas de `metadata` se escriben en la misma pasada de ffmpeg (sin
+        re-abrir el archivo después). Escribe a un archivo temporal y lo mueve al
+        final, así una cancelación nunca deja un archivo a medias en el Vault.
+        """
+        codec_args = codec_args or PROFILES[DEFAULT_PROFILE].encoder_args
+        # Solo las etiquetas indicadas: no se heredan las del contenedor de origen
+        metadata_args = ["-map_metadata", "-1"]
+        for key, value in (metadata or {}).items():
+            if value:
+                metadata_args += ["-metadata", f"{key}={value}"]
+
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target_path.with_name(f".{target_path.stem}.part{target_path.suffix}")
+        cmd = [
+            get_ffmpeg_path(), "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+            "-i", str(source_path), "-vn", *codec_args, *metadata_args, str(tmp_path),
+        ]
+        # stderr va a un archivo temporal: con un pipe que nadie lee mientras se sondea el proceso,
+        # un ffmpeg que escribe muchos errores (origen dañado) llenaría el buffer y se bloquearía
+        stderr_file = tempfile.TemporaryFile()
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=stderr_file)
+        try:
+            while True:
+                try:
+                    proc.wait(timeout=_POLL_SECONDS)
+                    break
+                except subprocess.TimeoutExpired:
+                    if checkpoint is not None:
+                        checkpoint()
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace").strip()
+            if proc.returncode != 0:
+                raise DownloadError(f"Error de ffmpeg: {stderr.splitlines()[-1] if stderr else proc.returncode}")
+            os.replace(tmp_path, target_path)
+            return target_path
+        except BaseException:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+        finally:
+            stderr_file.close()
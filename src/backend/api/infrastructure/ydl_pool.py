@@ -0,0 +1,110 @@
+import queue
+import threading
+import functools
+import yt_dlp
+import imageio_ffmpeg
+from contextlib import contextmanager
+from typing import Callable
+
+
+@functools.lru_cache(maxsize=1)
+def get_ffmpeg_path() -> str:
+    """Resuelve la ruta del ejecutable de FFmpeg una sola vez por proceso."""
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+class _YdlWorker:
+    """Instancia de YoutubeDL reutilizable con un hook de progreso intercambiable por trabajo."""
+
+    def __init__(self, opts: dict):
+        self.hook: Callable[[dict], None] | None = None
+        # El hook registrado es fijo; solo cambia el destino al que despacha
+        self.ydl = yt_dlp.YoutubeDL({**opts, "progress_hooks": [self._dispatch]})
+
+    def _dispatch(self, d: dict):
+        if self.hook is not None:
+            self.hook(d)
+
+    def close(self):
+        try:
+            self.ydl.close()
+        except Exception:
+            pass
+
+
+class YdlPool:
+    """Pool de instancias YoutubeDL pre-inicializadas.
+
+    Crear un YoutubeDL carga el registro de extractores, los handlers HTTP y el
+    cookie jar; reutilizarlas evita ese coste por descarga y mantiene vivas las
+    conexiones HTTP entre trabajos.
+    """
+
+    def __init__(self, opts_factory: Callable[[], dict], size: int):
+        self._opts_factory = opts_factory
+        self.size = max(1, size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def warm_up(self, count: int | None = None) -> None:
+        """Crea por adelantado instancias ociosas (por defecto, el tamaño completo del pool)."""
+        target = self.size if count is None else min(count, self.size)
+        while True:
+            with self._lock:
+                if self._created >= target:
+                    return
+                self._created += 1
+            try:
+                worker = self._new_worker()
+            except Exception:
+                # La plaza reservada vuelve al pool (igual que en `_checkout`)
+                with self._lock:
+                    self._created -= 1
+                raise
+            self._idle.put(worker)
+
+    @contextmanager
+    def acquire(self, outtmpl: str | None = None, hook: Callable[[dict], None] | None = None):
+        """Presta una instancia configurada para un trabajo y la devuelve al pool al terminar."""
+        worker = self._checkout()
+        if outtmpl is not None:
+            worker.ydl.params["outtmpl"]["default"] = outtmpl
+        worker.hook = hook
+        try:
+            yield worker.ydl
+        finally:
+            worker.hook = None
+            self._idle.put(worker)
+
+    def close(self) -> None:
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.close()
+        with self._lock:
+            self._created = 0
+
+    def _checkout(self) -> _YdlWorker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._new_worker()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        # Pool agotado: esperar a que otro trabajo devuelva su instancia
+        return self._idle.get()
+
+    def _new_worker(self) -> _YdlWorker:
+        return _YdlWorker(self._opts_factory())
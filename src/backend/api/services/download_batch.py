@@ -0,0 +1,67 @@
+import itertools
+import threading
+from pathlib import Path
+from typing import Callable
+from src.backend.api.services.download_job import DownloadJob, JobState
+
+
+_batch_ids = itertools.count(1)
+
+
+class DownloadBatch:
+    """Lote de descargas (playlist, canal, bloque de URLs o archivo .txt) repartido en la cola."""
+
+    def __init__(
+        self,
+        sources: list[str],
+        album_dir: Path,
+        on_resolved: Callable[["DownloadBatch"], None] | None = None,
+        on_finished: Callable[["DownloadBatch"], None] | None = None,
+    ):
+        self.id = next(_batch_ids)
+        self.sources = list(sources)
+        self.album_dir = Path(album_dir)
+        self.on_resolved = on_resolved
+        self.on_finished = on_finished
+        self.jobs: list[DownloadJob] = []
+        self.errors: list[str] = []  # Fuentes que no se pudieron resolver o encolar
+        self.resolved = False
+        self._finished_notified = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_final(self) -> bool:
+        return self.resolved and all(job.is_final for job in self.jobs)
+
+    def add_job(self, job: DownloadJob) -> None:
+        with self._lock:
+            self.jobs.append(job)
+
+    def mark_resolved(self) -> None:
+        self.resolved = True
+        if self.on_resolved is not None:
+            self.on_resolved(self)
+        self.check_finished()
+
+    def check_finished(self) -> None:
+        """Notifica una sola vez cuando todos los trabajos del lote llegaron a un estado final."""
+        with self._lock:
+            if self._finished_notified or not self.is_final:
+                return
+            self._finished_notified = True
+        if self.on_finished is not None:
+            self.on_finished(self)
+
+    def summary(self) -> dict:
+        counts = {JobState.DONE: 0, JobState.FAILED: 0, JobState.CANCELLED: 0}
+        for job in self.jobs:
+            if job.state in counts:
+                counts[job.state] += 1
+        return {
+            "id": self.id,
+            "total": len(self.jobs),
+            "done": counts[JobState.DONE],
+            "failed": counts[JobState.FAILED] + len(self.errors),
+            "cancelled": counts[JobState.CANCELLED],
+            "errors": list(self.errors),
+        }
@@ -0,0 +1,120 @@
+import itertools
+import threading
+import datetime
+from pathlib import Path
+from typing import Callable
+from src.backend.api.core.exceptions import DownloadCancelledError
+
+
+class JobState:
+    """Estados posibles de un trabajo de descarga dentro de la cola."""
+    QUEUED = "queued"
+    RESOLVING = "resolving"
+    DOWNLOADING = "downloading"
+    CONVERTING = "converting"
+    TAGGING = "tagging"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINAL = (DONE, FAILED, CANCELLED)
+
+
+_job_ids = itertools.count(1)
+
+
+def skip_job_ids(last_id: int) -> None:
+    """Hace que los próximos IDs de trabajo sean mayores que `last_id` (p. ej. los del diario anterior)."""
+    global _job_ids
+    _job_ids = itertools.count(max(next(_job_ids), last_id + 1))
+
+
+class DownloadJob:
+    """Trabajo de descarga encolado en el DownloadService (URL, destino, metadatos y estado)."""
+
+    def __init__(
+        self,
+        url: str,
+        album_dir: Path,
+        metadata: dict | None = None,
+        progress_callback: Callable[["DownloadJob", str, str], None] | None = None,
+        on_state_changed: Callable[["DownloadJob"], None] | None = None,
+        batch_id: int | None = None,
+    ):
+        self.id = next(_job_ids)
+        self.batch_id = batch_id
+        self.url = url
+        self.album_dir = Path(album_dir)
+        self.metadata = dict(metadata or {})
+        self.progress_callback = progress_callback
+        self.on_state_changed = on_state_changed
+        self.state = JobState.QUEUED
+        self.path: Path | None = None
+        # Audio ya descargado pendiente de convertir (p. ej. al reanudar tras un cierre)
+        self.raw_path: Path | None = None
+        self.source_info: dict | None = None
+        self.error: str | None = None
+        self.created_at = datetime.datetime.now()
+
+        self._cancel_event = threading.Event()
+        # Activo = puede avanzar; se limpia al pausar
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+
+    # ── Estado ────────────────────────────────────────────────────────────────
+
+    @property
+    def is_final(self) -> bool:
+        return self.state in JobState.FINAL
+
+    @property
+    def paused(self) -> bool:
+        return not self._resume_event.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def set_state(self, state: str) -> None:
+        """Actualiza el estado del trabajo y notifica al observador si cambió."""
+        if self.state == state:
+            return
+        self.state = state
+        if self.on_state_changed is not None:
+            self.on_state_changed(self)
+
+    # ── Control (cancelar / pausar) ───────────────────────────────────────────
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+        # Despertar al hilo si estaba pausado para que note la cancelación
+        self._resume_event.set()
+
+    def pause(self) -> None:
+        self._resume_event.clear()
+
+    def resume(self) -> None:
+        self._resume_event.set()
+
+    def checkpoint(self) -> None:
+        """Punto de control llamado por el worker: bloquea mientras está pausado y aborta si se canceló."""
+        self._resume_event.wait()
+        if self._cancel_event.is_set():
+            raise DownloadCancelledError(f"Trabajo #{self.id} cancelado.")
+
+    def report(self, msg: str, tag: str = "gray") -> None:
+        """Reenvía un mensaje de progreso al callback del trabajo (si existe)."""
+        if self.progress_callback is not None:
+            self.progress_callback(self, msg, tag)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "batch_id": self.batch_id,
+            "url": self.url,
+            "album": self.album_dir.name,
+            "state": self.state,
+            "paused": self.paused,
+            "path": str(self.path) if self.path else None,
+            "error": self.error,
+        }
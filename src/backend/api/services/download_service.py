@@ -1,27 +1,505 @@
+import os
+import re
+import queue
+import threading
 from pathlib import Path
 from typing import Callable
-from src.backend.api.core.utils import is_valid_youtube_url
-from src.backend.api.core.exceptions import InvalidUrlError
+from src.backend.api.core.config import settings
+from src.backend.api.core.utils import is_valid_youtube_url, is_youtube_collection_url, extract_video_id
+from src.backend.api.core.exceptions import InvalidUrlError, DownloadCancelledError
 from src.backend.api.infrastructure.audio_adapter import YtDlpAdapter
+from src.backend.api.infrastructure.transcoder import CUSTOM_TAG_EXTENSIONS
+from src.backend.api.infrastructure.job_journal import JobJournal, STAGE_FETCHED
+from src.backend.api.services.download_job import DownloadJob, JobState, skip_job_ids
+from src.backend.api.services.download_batch import DownloadBatch
+from src.backend.api.services.throughput_controller import ThroughputController
+from src.backend.api.services.progress_bus import ProgressBus, ProgressEvent
+from src.backend.vault.vault_service import VaultService
+from src.backend.vault.content_index_service import ContentIndexService, write_source_tags, source_tag_values
 
 
 class DownloadService:
-    def __init__(self, audio_adapter: YtDlpAdapter, download_dir: Path):
+    def __init__(
+        self,
+        audio_adapter: YtDlpAdapter,
+        download_dir: Path,
+        max_workers: int | None = None,
+        content_index: ContentIndexService | None = None,
+        journal: JobJournal | None = None,
+        controller: ThroughputController | None = None,
+    ):
         self.audio_adapter = audio_adapter
         self.download_dir = download_dir
         self.download_dir.mkdir(parents=True, exist_ok=True)
+        # Índice ID de video → archivo del Vault para evitar re-descargas
+        self.content_index = content_index
+        # Diario persistente de la cola para reanudar trabajos tras un cierre o caída
+        self.journal = journal
+        if journal is not None:
+            # Los IDs nuevos no deben pisar las filas pendientes de la sesión anterior
+            skip_job_ids(journal.previous_max_id)
+        # Último progreso numérico por trabajo; la UI lo drena a su propio ritmo
+        self.progress_bus = ProgressBus()
+
+        # Etapa de red: cola de trabajos con un pool de workers (I/O). Cuántos descargan a la
+        # vez (y con cuánto ancho de banda) lo decide el controlador de throughput
+        self.controller = controller or ThroughputController(initial_workers=max_workers)
+        self.max_workers = self.controller.max_workers
+        self._queue: queue.Queue = queue.Queue()
+        # Etapa de conversión: un worker por núcleo para ffmpeg. La cola acotada entre
+        # etapas aplica contrapresión: si ffmpeg va atrasado, la red deja de adelantarse
+        self.max_transcode_workers = max(1, settings.max_transcode_workers or os.cpu_count() or 1)
+        self._transcode_queue: queue.Queue = queue.Queue(maxsize=self.max_transcode_workers)
+        self._jobs: dict[int, DownloadJob] = {}
+        self._parked: dict[int, DownloadJob] = {}  # Trabajos pausados antes de empezar
+        self._batches: dict[int, DownloadBatch] = {}
+        self._lock = threading.Lock()
+        self._workers: list[threading.Thread] = []
+        self._transcode_workers: list[threading.Thread] = []
 
     def process_download(
         self,
         url: str,
         album_dir: Path | None = None,
         progress_callback: Callable[[str, str], None] | None = None,
+        status_callback: Callable[[str], None] | None = None,
+        allow_hardlink: bool = True,
+        codec: str | None = None,
     ) -> Path:
+        """Descarga y convierte de forma síncrona en el hilo llamante (sin pasar por la cola)."""
+        self.validate_url(url)
+        target_dir = album_dir if album_dir is not None else self.download_dir
+        target_dir.mkdir(parents=True, exist_ok=True)
+
+        video_id = extract_video_id(url)
+        quality = self.audio_adapter.quality_for(codec)
+        existing = self._reuse_existing(video_id, quality, target_dir, allow_hardlink, progress_callback)
+        if existing is not None:
+            return existing
+
+        def on_sample(d: dict):
+            if progress_callback is not None and d.get("status") == "downloading":
+                progress_callback(ProgressEvent.from_hook(0, d).render(), "progress")
+
+        tags = source_tag_values(video_id, quality) if video_id else None
+        path = self.audio_adapter.download_audio(
+            url, target_dir, progress_callback, status_callback, codec=codec, tags=tags, sample_callback=on_sample
+        )
+        self._register_download(path, video_id, quality)
+        return path
+
+    def _reuse_existing(
+        self,
+        video_id: str | None,
+        quality: str,
+        target_dir: Path,
+        allow_hardlink: bool,
+        progress_callback: Callable[[str, str], None] | None = None,
+        filename: str | None = None,
+    ) -> Path | None:
+        """Duplicado: el video ya está en el Vault con la misma calidad, se reutiliza sin red ni ffmpeg."""
+        if self.content_index is None or not video_id:
+            return None
+        existing = self.content_index.lookup(video_id, quality, prefer_dir=target_dir)
+        if existing is None:
+            return None
+        if progress_callback is not None:
+            progress_callback("  ya existe en el vault, reutilizando archivo...", "muted")
+        path = self.content_index.materialize(existing, target_dir, allow_hardlink=allow_hardlink, name=filename)
+        self.content_index.register(video_id, quality, path)
+        return path
+
+    def _register_download(self, path: Path, video_id: str | None, quality: str) -> None:
+        """Registra el archivo convertido en el índice de contenido."""
+        if not video_id:
+            return
+        if path.suffix.lower() not in CUSTOM_TAG_EXTENSIONS:
+            # ffmpeg no guarda claves propias en este contenedor (M4A): una única pasada de Mutagen
+            write_source_tags(path, video_id, quality)
+        if self.content_index is not None:
+            self.content_index.register(video_id, quality, path)
+
+    def prefetch_info(self, url: str, on_info: Callable[[dict], None] | None = None) -> None:
+        """Calienta la caché de extracción en segundo plano (p. ej. mientras se piden los metadatos)."""
+        def _task():
+            try:
+                info = self.audio_adapter.fetch_info(url)
+            except Exception:
+                return
+            if on_info is not None:
+                on_info(info)
+
+        threading.Thread(target=_task, daemon=True).start()
+
+    @staticmethod
+    def validate_url(url: str) -> None:
         if not url:
             raise InvalidUrlError("La URL no puede estar vacía.")
         if not is_valid_youtube_url(url):
             raise InvalidUrlError("La URL no corresponde a YouTube.")
-            
-        target_dir = album_dir if album_dir is not None else self.download_dir
-        target_dir.mkdir(parents=True, exist_ok=True)
-        return self.audio_adapter.download_audio(url, target_dir, progress_callback)
+
+    # ── Cola de trabajos ──────────────────────────────────────────────────────
+
+    def submit(
+        self,
+        url: str,
+        album_dir: Path | None = None,
+        metadata: dict | None = None,
+        progress_callback: Callable[[DownloadJob, str, str], None] | None = None,
+        on_state_changed: Callable[[DownloadJob], None] | None = None,
+        batch_id: int | None = None,
+        resume_from: tuple[Path, dict] | None = None,
+    ) -> DownloadJob:
+        """Encola una descarga y retorna inmediatamente el trabajo creado.
+
+        `resume_from` (audio descargado, resumen del video) permite saltar la etapa de red.
+        """
+        self.validate_url(url)
+
+        def state_changed(changed: DownloadJob):
+            if changed.is_final:
+                self.progress_bus.discard(changed.id)
+                if self.journal is not None:
+                    self.journal.remove(changed.id)
+            if on_state_changed is not None:
+                on_state_changed(changed)
+
+        job = DownloadJob(
+            url,
+            album_dir if album_dir is not None else self.download_dir,
+            metadata=metadata,
+            progress_callback=progress_callback,
+            on_state_changed=state_changed,
+            batch_id=batch_id,
+        )
+        if resume_from is not None:
+            job.raw_path, job.source_info = resume_from
+        if self.journal is not None:
+            self.journal.add(job)
+            if job.raw_path is not None:
+                self.journal.mark_fetched(job.id, job.raw_path, job.source_info)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._ensure_workers()
+        self._queue.put(job)
+        return job
+
+    def restore_pending(
+        self,
+        progress_callback: Callable[[DownloadJob, str, str], None] | None = None,
+        on_state_changed: Callable[[DownloadJob], None] | None = None,
+    ) -> list[DownloadJob]:
+        """Re-encola los trabajos que quedaron pendientes en el diario de la sesión anterior.
+
+        Los que ya tenían el audio descargado pasan directo a la conversión; el resto
+        vuelve a la etapa de red, donde yt-dlp continúa el `.part` con peticiones HTTP Range.
+        """
+        if self.journal is None:
+            return []
+        jobs = []
+        for entry in self.journal.take_pending():
+            try:
+                job = self.submit(
+                    entry["url"],
+                    album_dir=entry["album_dir"],
+                    metadata=entry["metadata"],
+                    progress_callback=progress_callback,
+                    on_state_changed=on_state_changed,
+                    resume_from=(entry["raw_path"], entry["info"]) if entry["stage"] == STAGE_FETCHED else None,
+                )
+            except Exception:
+                continue
+            jobs.append(job)
+        return jobs
+
+    def submit_batch(
+        self,
+        sources: list[str],
+        album_dir: Path | None = None,
+        metadata: dict | None = None,
+        progress_callback: Callable[[DownloadJob, str, str], None] | None = None,
+        on_state_changed: Callable[[DownloadJob], None] | None = None,
+        on_resolved: Callable[[DownloadBatch], None] | None = None,
+        on_finished: Callable[[DownloadBatch], None] | None = None,
+    ) -> DownloadBatch:
+        """Resuelve en segundo plano playlists, canales, bloques de URLs o archivos .txt y encola cada video.
+
+        La concurrencia queda acotada por los pools de workers de ambas etapas de la cola.
+        """
+        batch = DownloadBatch(
+            sources,
+            album_dir if album_dir is not None else self.download_dir,
+            on_resolved=on_resolved,
+            on_finished=on_finished,
+        )
+        with self._lock:
+            self._batches[batch.id] = batch
+
+        def job_state_changed(job: DownloadJob):
+            if on_state_changed is not None:
+                on_state_changed(job)
+            if job.is_final:
+                batch.check_finished()
+
+        def _resolve():
+            seen = set()
+            for entry in self._expand_sources(batch.sources, batch.errors):
+                key = extract_video_id(entry["url"]) or entry["url"]
+                if key in seen:
+                    continue
+                seen.add(key)
+                item_metadata = {
+                    "album": batch.album_dir.name,
+                    "song": "",
+                    "artist": entry.get("uploader") or "Artista Desconocido",
+                    "description": "",
+                    **(metadata or {}),
+                }
+                try:
+                    job = self.submit(
+                        entry["url"],
+                        album_dir=batch.album_dir,
+                        metadata=item_metadata,
+                        progress_callback=progress_callback,
+                        on_state_changed=job_state_changed,
+                        batch_id=batch.id,
+                    )
+                    batch.add_job(job)
+                except Exception as e:
+                    batch.errors.append(f"{entry['url']}: {e}")
+            batch.mark_resolved()
+
+        threading.Thread(target=_resolve, daemon=True).start()
+        return batch
+
+    def get_batch(self, batch_id: int) -> DownloadBatch | None:
+        return self._batches.get(batch_id)
+
+    def _expand_sources(self, sources: list[str], errors: list[str], depth: int = 0):
+        """Genera entradas {url, title, uploader} a partir de URLs, colecciones y archivos .txt."""
+        for source in sources:
+            source = source.strip()
+            if not source or source.startswith("#"):
+                continue
+            if source.lower().endswith(".txt") and depth == 0:
+                try:
+                    lines = Path(source).read_text(encoding="utf-8").splitlines()
+                except OSError as e:
+                    errors.append(f"{source}: {e}")
+                    continue
+                yield from self._expand_sources(lines, errors, depth + 1)
+            elif is_youtube_collection_url(source):
+                try:
+                    yield from self.audio_adapter.list_entries(source)
+                except Exception as e:
+                    errors.append(f"{source}: {e}")
+            elif is_valid_youtube_url(source):
+                yield {"url": source, "title": None, "uploader": None}
+            else:
+                errors.append(f"{source}: URL no válida de YouTube")
+
+    def get_job(self, job_id: int) -> DownloadJob | None:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, include_finished: bool = True) -> list[DownloadJob]:
+        jobs = sorted(self._jobs.values(), key=lambda j: j.id)
+        if include_finished:
+            return jobs
+        return [j for j in jobs if not j.is_final]
+
+    def pending_count(self) -> int:
+        return len(self.list_jobs(include_finished=False))
+
+    def cancel(self, job_id: int) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.is_final:
+            return False
+        job.cancel()
+        with self._lock:
+            parked = self._parked.pop(job_id, None)
+        if parked is not None or job.state == JobState.QUEUED:
+            job.set_state(JobState.CANCELLED)
+        return True
+
+    def pause(self, job_id: int) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.is_final:
+            return False
+        job.pause()
+        return True
+
+    def resume(self, job_id: int) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.is_final:
+            return False
+        job.resume()
+        with self._lock:
+            parked = self._parked.pop(job_id, None)
+        if parked is not None:
+            self._queue.put(parked)
+        return True
+
+    def clear_finished(self) -> None:
+        with self._lock:
+            self._jobs = {jid: j for jid, j in self._jobs.items() if not j.is_final}
+
+    def _ensure_workers(self) -> None:
+        """Arranca los hilos de ambas etapas de forma perezosa (hasta sus máximos)."""
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._worker_loop, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        self._transcode_workers = [w for w in self._transcode_workers if w.is_alive()]
+        while len(self._transcode_workers) < self.max_transcode_workers:
+            worker = threading.Thread(target=self._transcode_loop, daemon=True)
+            worker.start()
+            self._transcode_workers.append(worker)
+
+    def _worker_loop(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job.cancelled:
+                    job.set_state(JobState.CANCELLED)
+                    continue
+                # No ocupar un worker con un trabajo pausado: se reencola al reanudar. La comprobación
+                # va bajo el lock con el que `resume`/`cancel` lo sacan de `_parked`: si se reanuda
+                # justo antes, no queda aparcado para siempre
+                with self._lock:
+                    parked = job.paused
+                    if parked:
+                        self._parked[job.id] = job
+                if parked:
+                    continue
+                with self.controller.slot():
+                    fetched = self._run_job(job)
+                if fetched is not None:
+                    # Bloquea si la etapa de conversión está saturada (contrapresión)
+                    self._transcode_queue.put((job, *fetched))
+            finally:
+                self._queue.task_done()
+
+    def _transcode_loop(self) -> None:
+        while True:
+            job, raw_path, info = self._transcode_queue.get()
+            try:
+                self._run_transcode(job, raw_path, info)
+            finally:
+                self._transcode_queue.task_done()
+
+    def _run_job(self, job: DownloadJob) -> tuple[Path, dict] | None:
+        """Etapa de red: resuelve duplicados o descarga el audio.
+
+        Retorna (audio descargado, resumen del video) para la etapa de conversión, o
+        None si el trabajo ya terminó aquí (duplicado, fallo o cancelación).
+        """
+        def on_progress(msg: str, tag: str = "gray"):
+            job.checkpoint()
+            job.report(msg, tag)
+
+        def on_status(phase: str):
+            job.set_state(phase)
+
+        def on_sample(d: dict):
+            # Llamado en cada chunk: solo actualiza estado numérico, el render lo hace la UI
+            self.controller.record(job.id, d)
+            if d.get("status") == "downloading":
+                job.checkpoint()
+                self.progress_bus.publish(ProgressEvent.from_hook(job.id, d))
+
+        try:
+            job.set_state(JobState.RESOLVING)
+            job.report("  connecting...", "muted")
+            codec = job.metadata.get("codec")
+            filename, tags = self._job_tags(job)
+            existing = self._reuse_existing(
+                extract_video_id(job.url),
+                self.audio_adapter.quality_for(codec),
+                job.album_dir,
+                # Las etiquetas se editan in situ: con re-etiquetado un hardlink modificaría también el original
+                allow_hardlink=not tags,
+                progress_callback=on_progress,
+                filename=filename,
+            )
+            if existing is not None:
+                if tags:
+                    job.set_state(JobState.TAGGING)
+                    VaultService.write_tags(existing, **{**tags, "title": tags["title"] or existing.stem})
+                job.path = existing
+                job.set_state(JobState.DONE)
+                return None
+
+            if job.raw_path is not None and job.raw_path.exists() and job.source_info:
+                # Reanudación: la descarga ya se completó en la sesión anterior
+                job.report("  audio ya descargado, pasando a conversión...", "muted")
+                raw_path, info = job.raw_path, job.source_info
+            else:
+                raw_path, info = self.audio_adapter.fetch_audio(
+                    job.url,
+                    on_progress,
+                    on_status,
+                    sample_callback=on_sample,
+                    fragments=self.controller.fragment_concurrency,
+                )
+                if self.journal is not None:
+                    self.journal.mark_fetched(job.id, raw_path, info)
+            job.checkpoint()
+        except Exception as e:
+            self._fail_job(job, e)
+            return None
+        return raw_path, info
+
+    def _run_transcode(self, job: DownloadJob, raw_path: Path, info: dict) -> None:
+        """Etapa de conversión: ffmpeg al códec pedido escribiendo nombre final y etiquetas en una pasada."""
+        # `audio_adapter.transcode` es el único responsable de cachear o borrar `raw_path`
+        # (incluida una cancelación antes de lanzar ffmpeg: comprueba `checkpoint` al empezar)
+        try:
+            job.set_state(JobState.CONVERTING)
+            codec = job.metadata.get("codec")
+            video_id = extract_video_id(job.url)
+            quality = self.audio_adapter.quality_for(codec)
+            filename, tags = self._job_tags(job)
+            if tags:
+                tags["title"] = tags["title"] or info.get("title")
+            if video_id:
+                tags.update(source_tag_values(video_id, quality))
+            job.path = self.audio_adapter.transcode(
+                raw_path,
+                info,
+                job.album_dir,
+                codec,
+                progress_callback=lambda msg, tag="gray": job.report(msg, tag),
+                checkpoint=job.checkpoint,
+                filename=filename,
+                tags=tags,
+            )
+            self._register_download(job.path, video_id, quality)
+            job.set_state(JobState.DONE)
+        except Exception as e:
+            self._fail_job(job, e)
+
+    @staticmethod
+    def _fail_job(job: DownloadJob, error: Exception) -> None:
+        if isinstance(error, DownloadCancelledError):
+            job.set_state(JobState.CANCELLED)
+            return
+        job.error = str(error)
+        job.set_state(JobState.FAILED)
+
+    @staticmethod
+    def _job_tags(job: DownloadJob) -> tuple[str | None, dict]:
+        """Nombre final del archivo y etiquetas (title, artist, album, comment) pedidas por el trabajo (RF-033).
+
+        Retorna (None, {}) si el trabajo no pide re-etiquetar (p. ej. solo indica el códec).
+        """
+        metadata = job.metadata
+        if not any(metadata.get(key) for key in ("song", "artist", "album", "description")):
+            return None, {}
+        song_name = re.sub(r'[\\/*?:"<>|]', "", metadata.get("song") or "").strip() or None
+        return song_name, {
+            "title": song_name,
+            "artist": metadata.get("artist") or "Artista Desconocido",
+            "album": metadata.get("album") or job.album_dir.name,
+            "comment": metadata.get("description"),
+        }
@@ -0,0 +1,98 @@
+import time
+import threading
+
+
+class ProgressEvent:
+    """Estado numérico de la descarga de un trabajo, tomado de los campos crudos del hook de yt-dlp."""
+
+    __slots__ = ("job_id", "downloaded_bytes", "total_bytes", "speed", "eta", "timestamp")
+
+    def __init__(
+        self,
+        job_id: int,
+        downloaded_bytes: int,
+        total_bytes: int | None,
+        speed: float | None,
+        eta: float | None,
+    ):
+        self.job_id = job_id
+        self.downloaded_bytes = downloaded_bytes
+        self.total_bytes = total_bytes
+        self.speed = speed
+        self.eta = eta
+        self.timestamp = time.monotonic()
+
+    @classmethod
+    def from_hook(cls, job_id: int, d: dict) -> "ProgressEvent":
+        return cls(
+            job_id,
+            d.get("downloaded_bytes") or 0,
+            d.get("total_bytes") or d.get("total_bytes_estimate"),
+            d.get("speed"),
+            d.get("eta"),
+        )
+
+    @property
+    def percent(self) -> float:
+        if not self.total_bytes:
+            return 0.0
+        return min(100.0, self.downloaded_bytes * 100.0 / self.total_bytes)
+
+    def render(self) -> str:
+        """Línea de progreso: ···············╸  45.3%  1.2MiB/s     eta 00:12"""
+        speed = f"{format_bytes(self.speed)}/s" if self.speed else "--"
+        eta = format_eta(self.eta) if self.eta is not None else "--"
+        return f"  {dot_bar(self.percent)}  {self.percent:5.1f}%  {speed:<12}  eta {eta}"
+
+
+class ProgressBus:
+    """Canal de eventos de progreso entre los workers y la UI que conserva solo el último por trabajo.
+
+    Los workers publican en cada chunk (coste O(1), sin tocar la UI); el consumidor
+    drena a su ritmo (p. ej. a una tasa de fotogramas fija) y recibe como mucho un
+    evento por trabajo, sin importar la velocidad de la red.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest: dict[int, ProgressEvent] = {}
+
+    def publish(self, event: ProgressEvent) -> None:
+        with self._lock:
+            self._latest[event.job_id] = event
+
+    def discard(self, job_id: int) -> None:
+        with self._lock:
+            self._latest.pop(job_id, None)
+
+    def drain(self) -> list[ProgressEvent]:
+        """Retorna (y vacía) el último evento pendiente de cada trabajo."""
+        with self._lock:
+            if not self._latest:
+                return []
+            latest, self._latest = self._latest, {}
+        return sorted(latest.values(), key=lambda e: e.job_id)
+
+
+def dot_bar(percent: float, width: int = 20) -> str:
+    """Barra minimalista de puntos: ···············╸"""
+    filled = int((percent / 100) * width)
+    if filled >= width:
+        return "·" * width
+    bar = "·" * filled + "╸" + " " * (width - filled - 1)
+    return bar
+
+
+def format_bytes(value: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}GiB"
+
+
+def format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
@@ -0,0 +1,191 @@
+import time
+import datetime
+import threading
+from contextlib import contextmanager
+from src.backend.api.core.config import settings
+
+# Ventana de medición antes de decidir si subir o bajar la concurrencia
+_WINDOW_SECONDS = 10.0
+# Mejora mínima de throughput para considerar que un worker extra ayudó
+_MIN_GAIN = 0.05
+# Velocidades reportadas hace más de esto se consideran de descargas ya terminadas
+_STALE_SECONDS = 3.0
+# Espera máxima de una sola pausa del limitador (mantiene los hooks reactivos a cancelaciones)
+_MAX_THROTTLE_SLEEP = 2.0
+# Conexiones totales repartidas entre descargas (fragmentos DASH/HLS por trabajo)
+_CONNECTION_BUDGET = 8
+
+
+def _parse_hours(spec: str) -> tuple[int, int] | None:
+    """Convierte "8-19" en (8, 19). Vacío o inválido = el límite rige todo el día."""
+    try:
+        start, end = (int(part) for part in spec.split("-", 1))
+    except ValueError:
+        return None
+    return start % 24, end % 24
+
+
+class ThroughputController:
+    """Controla cuántas descargas corren a la vez y cuánto ancho de banda usan entre todas.
+
+    - Concurrencia adaptativa: mide el throughput agregado (campo `speed` de los hooks
+      de yt-dlp) por ventanas y sube o baja el número de workers activos buscando el
+      punto de saturación del enlace (hill climbing).
+    - Límite global opcional (bytes/s) compartido por todos los trabajos mediante un
+      token bucket alimentado por los bytes descargados que reportan los hooks.
+    """
+
+    def __init__(
+        self,
+        initial_workers: int | None = None,
+        max_workers: int | None = None,
+        bandwidth_limit: int | None = None,
+        limit_hours: str | None = None,
+        adaptive: bool | None = None,
+    ):
+        self.max_workers = max(1, max_workers or settings.max_adaptive_downloads)
+        self.target_workers = min(self.max_workers, max(1, initial_workers or settings.max_concurrent_downloads))
+        self.adaptive = settings.adaptive_concurrency if adaptive is None else adaptive
+        self.bandwidth_limit = settings.bandwidth_limit if bandwidth_limit is None else bandwidth_limit
+        self.limit_hours = _parse_hours(settings.bandwidth_limit_hours if limit_hours is None else limit_hours)
+
+        self._cond = threading.Condition()
+        self._active = 0
+
+        # Medición
+        self._lock = threading.Lock()
+        self._speeds: dict[int, tuple[float, float]] = {}  # clave → (velocidad, instante)
+        self._bytes_seen: dict[int, int] = {}
+        self._samples: list[float] = []
+        self._window_start = time.monotonic()
+        self._last_rate: float | None = None
+        self._last_step = 0  # +1 subió, -1 bajó, 0 se mantuvo
+        self.current_rate = 0.0
+
+        # Token bucket del límite global
+        self._tokens = 0.0
+        self._tokens_at = time.monotonic()
+
+    # ── Slots de concurrencia ─────────────────────────────────────────────────
+
+    @contextmanager
+    def slot(self):
+        """Ocupa uno de los `target_workers` slots de descarga durante la etapa de red."""
+        with self._cond:
+            while self._active >= self.target_workers:
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def fragment_concurrency(self) -> int:
+        """Fragmentos simultáneos por descarga: con menos trabajos activos, más conexiones cada uno."""
+        return max(1, min(4, _CONNECTION_BUDGET // max(1, self.target_workers)))
+
+    def _set_target(self, target: int) -> None:
+        with self._cond:
+            self.target_workers = min(self.max_workers, max(1, target))
+            self._cond.notify_all()
+
+    # ── Medición y límite ─────────────────────────────────────────────────────
+
+    def limit_active(self) -> int:
+        """Límite global vigente en bytes/s (0 = sin límite, o fuera del horario configurado)."""
+        if not self.bandwidth_limit:
+            return 0
+        if self.limit_hours is not None:
+            start, end = self.limit_hours
+            hour = datetime.datetime.now().hour
+            inside = start <= hour < end if start <= end else hour >= start or hour < end
+            if not inside:
+                return 0
+        return self.bandwidth_limit
+
+    def record(self, key: int, d: dict) -> None:
+        """Recibe el dict de progreso de yt-dlp de un trabajo (llamado desde su hilo de descarga)."""
+        if d.get("status") != "downloading":
+            with self._lock:
+                self._speeds.pop(key, None)
+                self._bytes_seen.pop(key, None)
+            return
+
+        now = time.monotonic()
+        downloaded = d.get("downloaded_bytes") or 0
+        with self._lock:
+            delta = max(0, downloaded - self._bytes_seen.get(key, downloaded))
+            self._bytes_seen[key] = downloaded
+            if d.get("speed"):
+                self._speeds[key] = (float(d["speed"]), now)
+            self.current_rate = sum(
+                speed for speed, at in self._speeds.values() if now - at <= _STALE_SECONDS
+            )
+            self._samples.append(self.current_rate)
+            evaluate = now - self._window_start >= _WINDOW_SECONDS
+            if evaluate:
+                samples, self._samples = self._samples, []
+                self._window_start = now
+
+        if evaluate and self.adaptive:
+            self._adapt(sum(samples) / len(samples) if samples else 0.0)
+        self._throttle(delta)
+
+    def _throttle(self, nbytes: int) -> None:
+        limit = self.limit_active()
+        if not limit or not nbytes:
+            return
+        with self._lock:
+            now = time.monotonic()
+            # Recargar a la tasa límite con una ráfaga máxima de un segundo
+            self._tokens = min(limit, self._tokens + (now - self._tokens_at) * limit)
+            self._tokens_at = now
+            self._tokens -= nbytes
+            wait = -self._tokens / limit if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(min(wait, _MAX_THROTTLE_SLEEP))
+
+    def _adapt(self, rate: float) -> None:
+        """Un paso de hill climbing sobre el número de workers activos."""
+        with self._cond:
+            saturated_by_work = self._active < self.target_workers
+        limit = self.limit_active()
+        last_rate, last_step = self._last_rate, self._last_step
+        self._last_rate = rate
+
+        # Sin suficientes trabajos para llenar los slots la medición no dice nada
+        if saturated_by_work or rate <= 0:
+            self._last_step = 0
+            return
+        # El límite global ya se alcanza: más workers solo competirían entre sí
+        if limit and rate >= 0.9 * limit:
+            self._last_step = 0
+            return
+
+        if last_rate is None or last_step == 0:
+            step = 1
+        else:
+            gain = (rate - last_rate) / last_rate if last_rate else 0.0
+            if last_step > 0:
+                step = 1 if gain >= _MIN_GAIN else -1  # El último worker no aportó: volver atrás
+            else:
+                step = 1 if gain <= -_MIN_GAIN else 0  # Bajar costó throughput: recuperar y mantener
+        self._last_step = step
+        if step:
+            self._set_target(self.target_workers + step)
+
+    def status(self) -> dict:
+        return {
+            "active": self._active,
+            "target": self.target_workers,
+            "max": self.max_workers,
+            "rate": self.current_rate,
+            "limit": self.limit_active(),
+        }
@@ -5,9 +5,11 @@ class CommandService:
     """Servicio de backend para validar URLs e interpretar comandos de consola modulares (RF-009, RF-010, RF-011)."""
     
     @staticmethod
-    def parse_input(text: str) -> dict:
+    def parse_input(text: str, catalog=None) -> dict:
         """Analiza la entrada del usuario y determina si es un comando especial, un atajo o una URL.
         
+        `catalog` (VaultCatalog) resuelve los atajos de álbum sin recorrer la carpeta de descargas.
+        
         Retorna un diccionario con la estructura:
         - Para comandos: {"type": "command", "name": "...", "command": CommandObject, "args": [...]}
         - Para atajos: {"type": "shortcut", ...}
@@ -34,30 +36,46 @@ class CommandService:
             }
             
         # RF-036: Comprobar si es un acceso directo de navegación case-insensitive
-        from pathlib import Path
-        downloads_dir = Path("C:\\Users\\Gustavo\\Documents\\mp3dowloaderProject\\downloads")
-        
         if text_lower == "sinalbum":
             return {
                 "type": "shortcut",
                 "target": "sin_album"
             }
             
-        if downloads_dir.exists():
-            albums = [p.name.lower() for p in downloads_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
-            if text_lower in albums:
-                actual_name = next(p.name for p in downloads_dir.iterdir() if p.name.lower() == text_lower)
-                return {
-                    "type": "shortcut",
-                    "target": "album",
-                    "album_name": actual_name
-                }
+        actual_name = catalog.find_album(text_stripped) if catalog is not None and text_stripped else None
+        if actual_name is not None:
+            return {
+                "type": "shortcut",
+                "target": "album",
+                "album_name": actual_name
+            }
                 
         # RF-010: Todo lo demás se interpreta como URL
+        # Opciones por descarga al final de la URL (ej. "<url> --codec native")
+        url_text, options = CommandService.split_url_options(text_stripped)
+        
         # RF-011: Validar si la URL es válida o inválida
-        is_valid = is_valid_youtube_url(text_stripped)
+        is_valid = is_valid_youtube_url(url_text)
         return {
             "type": "url",
             "status": "valid" if is_valid else "invalid",
-            "url": text_stripped
+            "url": url_text,
+            "options": options
         }
+
+    @staticmethod
+    def split_url_options(text: str) -> tuple[str, dict]:
+        """Separa la URL de sus opciones de descarga (--codec mp3|native)."""
+        parts = text.split()
+        if not parts:
+            return text, {}
+        options = {}
+        i = 1
+        while i < len(parts):
+            if parts[i].lower() == "--codec" and i + 1 < len(parts):
+                options["codec"] = parts[i + 1].lower()
+                i += 2
+            else:
+                # Texto no reconocido: se conserva completo para que la validación lo rechace
+                return text, {}
+        return parts[0], options
@@ -8,6 +8,9 @@ from .edit_command import EditCommand
 from .delete_command import DeleteCommand
 from .back_command import BackCommand
 from .export_command import ExportCommand
+from .jobs_command import JobsCommand
+from .batch_command import BatchCommand
+from .search_command import SearchCommand
 
 # Mapa centralizado de comandos modulares (fácil de extender)
 COMMAND_MAP = {
@@ -21,5 +24,8 @@ COMMAND_MAP = {
     "delete": DeleteCommand(),
     "rm": DeleteCommand(),
     "back": BackCommand(),
-    "export": ExportCommand()
+    "export": ExportCommand(),
+    "jobs": JobsCommand(),
+    "batch": BatchCommand(),
+    "search": SearchCommand()
 }
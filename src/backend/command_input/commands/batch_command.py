@@ -0,0 +1,14 @@
+from .base_command import BaseCommand
+
+class BatchCommand(BaseCommand):
+    """Comando batch: Encola en lote una playlist, un canal, varias URLs o un archivo .txt."""
+    
+    def __init__(self):
+        super().__init__(
+            name="batch",
+            description="Descarga en lote. Uso: batch <url|playlist|canal> [...] [--file <lista.txt>] [--album <nombre>]"
+        )
+
+    def execute(self, *args, **kwargs) -> None:
+        # Se maneja en la UI dinámicamente
+        pass
@@ -6,7 +6,7 @@ class EditCommand(BaseCommand):
     def __init__(self):
         super().__init__(
             name="edit",
-            description="Editar un álbum o canción. Uso: edit --album-name <viejo> <nuevo> | edit --song-name <album> <num> <nuevo_nombre>"
+            description="Editar un álbum o canción. Uso: edit --album-name <viejo> <nuevo> | edit --song-name <album> <num> <nuevo_nombre> | edit --album-codec <mp3|native|default>"
         )
 
     def execute(self, *args, **kwargs) -> None:
@@ -0,0 +1,14 @@
+from .base_command import BaseCommand
+
+class JobsCommand(BaseCommand):
+    """Comando jobs: Lista y controla la cola de descargas (cancelar, pausar, reanudar)."""
+    
+    def __init__(self):
+        super().__init__(
+            name="jobs",
+            description="Cola de descargas. Uso: jobs | jobs --cancel <id> | jobs --pause <id> | jobs --resume <id>"
+        )
+
+    def execute(self, *args, **kwargs) -> None:
+        # Se maneja en la UI dinámicamente
+        pass
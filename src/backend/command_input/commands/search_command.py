@@ -0,0 +1,14 @@
+from .base_command import BaseCommand
+
+class SearchCommand(BaseCommand):
+    """Comando search: Busca canciones en todo el Vault por título, artista, álbum, archivo o ID de YouTube."""
+    
+    def __init__(self):
+        super().__init__(
+            name="search",
+            description="Busca canciones en el Vault. Uso: search <texto> | search --go <n>"
+        )
+
+    def execute(self, *args, **kwargs) -> None:
+        # Se maneja en la UI dinámicamente
+        pass
@@ -1 +1,2 @@
 from src.backend.vault.vault_service import VaultService
+from src.backend.vault.content_index_service import ContentIndexService
@@ -0,0 +1,192 @@
+import os
+import json
+import shutil
+import threading
+from pathlib import Path
+from src.backend.vault.vault_service import AUDIO_EXTENSIONS
+
+# Claves donde se guarda el origen de la canción dentro del propio archivo
+VIDEO_ID_TAG = "youtube_id"
+QUALITY_TAG = "youtube_quality"
+# Calidad asumida para MP3 etiquetados sin frame de calidad
+DEFAULT_QUALITY = "mp3-192"
+
+
+class ContentIndexService:
+    """Índice persistente ID de video (+ calidad) → archivos del Vault, para no re-descargar duplicados."""
+
+    def __init__(self, index_file_path: Path, vault_root: Path):
+        self.index_file_path = Path(index_file_path)
+        self.vault_root = Path(vault_root)
+        self.index_file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[str]] = {}
+        self._load_index()
+
+    @staticmethod
+    def _key(video_id: str, quality: str) -> str:
+        return f"{video_id}:{quality}"
+
+    def _load_index(self):
+        """Carga el índice desde JSON; si no existe o está corrupto lo reconstruye desde las etiquetas ID3."""
+        if self.index_file_path.exists():
+            try:
+                with open(self.index_file_path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+                return
+            except Exception:
+                self._entries = {}
+        self.rebuild()
+
+    def _save_index(self):
+        """Persiste el índice de forma atómica (archivo temporal + reemplazo)."""
+        try:
+            tmp_path = self.index_file_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.index_file_path)
+        except Exception:
+            pass
+
+    def rebuild(self) -> int:
+        """Reconstruye el índice leyendo los frames TXXX de todos los MP3 del Vault. Retorna las entradas."""
+        entries: dict[str, list[str]] = {}
+        if self.vault_root.exists():
+            for file in self.vault_root.rglob("*"):
+                if file.suffix.lower() not in AUDIO_EXTENSIONS or not file.is_file():
+                    continue
+                video_id, quality = read_source_tags(file)
+                if video_id:
+                    entries.setdefault(self._key(video_id, quality or DEFAULT_QUALITY), []).append(str(file))
+        with self._lock:
+            self._entries = entries
+            self._save_index()
+        return len(entries)
+
+    def lookup(self, video_id: str, quality: str, prefer_dir: Path | None = None) -> Path | None:
+        """Retorna un archivo existente para el video/calidad, priorizando el álbum indicado."""
+        if not video_id:
+            return None
+        with self._lock:
+            paths = list(self._entries.get(self._key(video_id, quality), []))
+        existing = [Path(p) for p in paths if Path(p).is_file()]
+        if len(existing) != len(paths):
+            self._prune(video_id, quality)
+        if not existing:
+            return None
+        if prefer_dir is not None:
+            for p in existing:
+                if p.parent == Path(prefer_dir):
+                    return p
+        return existing[0]
+
+    def register(self, video_id: str, quality: str, path: Path, old_path: Path | None = None) -> None:
+        """Asocia un archivo del Vault al video/calidad (y olvida la ruta anterior si se renombró)."""
+        if not video_id:
+            return
+        key = self._key(video_id, quality)
+        with self._lock:
+            paths = self._entries.setdefault(key, [])
+            if old_path is not None and str(old_path) in paths:
+                paths.remove(str(old_path))
+            if str(path) not in paths:
+                paths.append(str(path))
+            self._save_index()
+
+    def _prune(self, video_id: str, quality: str) -> None:
+        key = self._key(video_id, quality)
+        with self._lock:
+            paths = [p for p in self._entries.get(key, []) if Path(p).is_file()]
+            if paths:
+                self._entries[key] = paths
+            else:
+                self._entries.pop(key, None)
+            self._save_index()
+
+    @staticmethod
+    def materialize(source: Path, target_dir: Path, allow_hardlink: bool = True, name: str | None = None) -> Path:
+        """Coloca una copia del archivo en el álbum destino (hardlink si es posible, si no copia).
+
+        `name` permite fijar directamente el nombre final (sin extensión) en lugar de renombrar después.
+        """
+        target_dir.mkdir(parents=True, exist_ok=True)
+        stem = name or source.stem
+        target = target_dir / f"{stem}{source.suffix}"
+        if target.exists():
+            if target.resolve() == source.resolve():
+                return target
+            # Otro archivo con el mismo nombre: no pisarlo, buscar un nombre libre
+            n = 2
+            while target.exists():
+                target = target_dir / f"{stem} ({n}){source.suffix}"
+                n += 1
+        if allow_hardlink:
+            try:
+                os.link(source, target)
+                return target
+            except OSError:
+                pass
+        shutil.copy2(source, target)
+        return target
+
+
+def source_tag_values(video_id: str, quality: str) -> dict:
+    """Etiquetas de origen como pares clave/valor (para escribirlas durante la conversión con ffmpeg)."""
+    return {VIDEO_ID_TAG: video_id, QUALITY_TAG: quality}
+
+
+def write_source_tags(path: Path, video_id: str, quality: str) -> None:
+    """Guarda el ID de YouTube y la calidad en el propio archivo para poder reconstruir el índice.
+
+    MP3: frames ID3 TXXX · M4A: átomos freeform iTunes · Opus/Ogg: comentarios Vorbis.
+    """
+    try:
+        import mutagen
+        from mutagen.id3 import ID3, TXXX
+        from mutagen.mp4 import MP4Tags, MP4FreeForm
+
+        audio = mutagen.File(path)
+        if audio is None:
+            return
+        if audio.tags is None:
+            audio.add_tags()
+        tags = audio.tags
+        if isinstance(tags, ID3):
+            tags.add(TXXX(encoding=3, desc=VIDEO_ID_TAG, text=[video_id]))
+            tags.add(TXXX(encoding=3, desc=QUALITY_TAG, text=[quality]))
+        elif isinstance(tags, MP4Tags):
+            tags[f"----:com.apple.iTunes:{VIDEO_ID_TAG}"] = [MP4FreeForm(video_id.encode("utf-8"))]
+            tags[f"----:com.apple.iTunes:{QUALITY_TAG}"] = [MP4FreeForm(quality.encode("utf-8"))]
+        else:
+            tags[VIDEO_ID_TAG] = [video_id]
+            tags[QUALITY_TAG] = [quality]
+        audio.save()
+    except Exception:
+        pass
+
+
+def read_source_tags(path: Path) -> tuple[str | None, str | None]:
+    """Lee (ID de YouTube, calidad) guardados en el archivo por write_source_tags."""
+    try:
+        import mutagen
+        from mutagen.id3 import ID3
+        from mutagen.mp4 import MP4Tags
+
+        audio = mutagen.File(path)
+        if audio is None or audio.tags is None:
+            return None, None
+        tags = audio.tags
+        values = []
+        for name in (VIDEO_ID_TAG, QUALITY_TAG):
+            if isinstance(tags, ID3):
+                frame = tags.get(f"TXXX:{name}")
+                values.append(str(frame.text[0]) if frame else None)
+            elif isinstance(tags, MP4Tags):
+                atom = tags.get(f"----:com.apple.iTunes:{name}")
+                values.append(bytes(atom[0]).decode("utf-8") if atom else None)
+            else:
+                comment = tags.get(name)
+                values.append(str(comment[0]) if comment else None)
+        return values[0], values[1]
+    except Exception:
+        return None, None
@@ -0,0 +1,254 @@
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from src.backend.vault.vault_catalog import CHANGE_MOVE, CHANGE_REMOVE
+
+# Espera mínima entre avisos de "metadatos listos" (agrupa los de un escaneo completo)
+_NOTIFY_DELAY_SECONDS = 0.5
+
+# Etiquetas de texto por tipo de contenedor: (ID3, MP4, Vorbis)
+_TEXT_TAGS = {
+    "title": ("TIT2", "\xa9nam", "title"),
+    "artist": ("TPE1", "\xa9ART", "artist"),
+    "album": ("TALB", "\xa9alb", "album"),
+}
+
+
+class SongMetadata:
+    """Etiquetas y datos técnicos de una canción, válidos para el tamaño y mtime indicados."""
+
+    __slots__ = ("size", "mtime_ns", "title", "artist", "album", "duration", "bitrate", "video_id")
+
+    def __init__(self, size: int, mtime_ns: int, title=None, artist=None, album=None,
+                 duration=None, bitrate=None, video_id=None):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.title = title
+        self.artist = artist
+        self.album = album
+        self.duration = duration  # segundos
+        self.bitrate = bitrate    # bits/s
+        self.video_id = video_id
+
+    def as_tags(self) -> dict:
+        return {"title": self.title, "artist": self.artist, "album": self.album, "video_id": self.video_id}
+
+
+def read_metadata(path: Path, size: int, mtime_ns: int) -> SongMetadata:
+    """Abre el archivo una sola vez con mutagen y extrae etiquetas, duración, bitrate e ID de YouTube."""
+    meta = SongMetadata(size, mtime_ns)
+    try:
+        import mutagen
+        from mutagen.id3 import ID3
+        from mutagen.mp4 import MP4Tags
+        from src.backend.vault.content_index_service import VIDEO_ID_TAG
+
+        audio = mutagen.File(path)
+    except Exception:
+        return meta
+    if audio is None:
+        return meta
+    info = getattr(audio, "info", None)
+    if info is not None:
+        meta.duration = getattr(info, "length", None)
+        meta.bitrate = getattr(info, "bitrate", None) or None
+    tags = audio.tags
+    if tags is None:
+        return meta
+
+    def first(key):
+        try:
+            value = tags.get(key)
+        except Exception:
+            return None
+        if not value:
+            return None
+        if isinstance(tags, ID3):
+            return str(value.text[0]) if value.text else None
+        if isinstance(value, list):
+            value = value[0]
+        # Los campos libres de MP4 (MP4FreeForm) son bytes
+        return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+
+    slot = 0 if isinstance(tags, ID3) else 1 if isinstance(tags, MP4Tags) else 2
+    for field, keys in _TEXT_TAGS.items():
+        setattr(meta, field, first(keys[slot]))
+    meta.video_id = first((f"TXXX:{VIDEO_ID_TAG}", f"----:com.apple.iTunes:{VIDEO_ID_TAG}", VIDEO_ID_TAG)[slot])
+    return meta
+
+
+class MetadataCache:
+    """Caché persistente (SQLite) de etiquetas, duración y bitrate por archivo del Vault.
+
+    Cada entrada se identifica por (ruta, tamaño, mtime_ns): si el archivo
+    cambió se vuelve a leer. Un grupo de hilos rellena en segundo plano las
+    entradas que faltan al primer escaneo y las de las canciones que el
+    catálogo va registrando; la lista y la reproducción solo consultan la caché.
+    """
+
+    def __init__(self, db_path: Path, vault_root: Path, workers: int | None = None,
+                 on_loaded: Callable[[set[str]], None] | None = None):
+        self.db_path = Path(db_path)
+        self.vault_root = Path(vault_root)
+        self.on_loaded = on_loaded
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # ruta relativa al Vault ("Album/cancion.mp3") → metadatos
+        self._entries: dict[str, SongMetadata] = {}
+        # Rutas con una lectura ya encolada en el grupo de hilos
+        self._pending: set[str] = set()
+        self._pool = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1))
+        # Álbumes con metadatos nuevos aún no avisados
+        self._loaded_albums: set[str] = set()
+        self._notify_timer = None
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metadata (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    title TEXT,
+                    artist TEXT,
+                    album TEXT,
+                    duration REAL,
+                    bitrate INTEGER,
+                    video_id TEXT
+                )
+                """
+            )
+            for row in self._conn.execute(
+                "SELECT path, size, mtime_ns, title, artist, album, duration, bitrate, video_id FROM metadata"
+            ):
+                self._entries[row[0]] = SongMetadata(*row[1:])
+
+    def _key(self, path: Path) -> str | None:
+        path = Path(path)
+        if path.parent.parent != self.vault_root:
+            return None
+        return f"{path.parent.name}/{path.name}"
+
+    # ── Consultas ────────────────────────────────────────────────────────────
+
+    def peek(self, path: Path, size: int, mtime_ns: int) -> SongMetadata | None:
+        """Metadatos en caché si siguen vigentes para ese tamaño/mtime (sin tocar el disco)."""
+        key = self._key(path)
+        meta = self._entries.get(key) if key else None
+        if meta is not None and (meta.size, meta.mtime_ns) == (size, mtime_ns):
+            return meta
+        return None
+
+    def get(self, path: Path) -> SongMetadata | None:
+        """Metadatos vigentes del archivo; si faltan o cambió, se lee en el momento y se guarda."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        meta = self.peek(path, st.st_size, st.st_mtime_ns)
+        if meta is None:
+            meta = self._load(Path(path), st.st_size, st.st_mtime_ns, notify=False)
+        return meta
+
+    # ── Relleno en segundo plano ─────────────────────────────────────────────
+
+    def start(self, catalog) -> None:
+        """Sigue los cambios del catálogo y encola la lectura de todo lo que falte o esté desactualizado."""
+        catalog.add_observer(self.on_catalog_change)
+        threading.Thread(target=self._fill, args=(catalog,), daemon=True).start()
+
+    def _fill(self, catalog) -> None:
+        seen = set()
+        for record in catalog.albums():
+            for song in record.songs:
+                path = self.vault_root / record.name / song.name
+                seen.add(f"{record.name}/{song.name}")
+                if self.peek(path, song.size, song.mtime_ns) is None:
+                    self.prefetch(path, song.size, song.mtime_ns)
+        with self._lock, self._conn:
+            for key in set(self._entries) - seen:
+                del self._entries[key]
+                self._conn.execute("DELETE FROM metadata WHERE path = ?", (key,))
+
+    def prefetch(self, path: Path, size: int | None = None, mtime_ns: int | None = None) -> None:
+        """Encola la lectura de un archivo en el grupo de hilos (si no hay ya una pendiente)."""
+        key = self._key(path)
+        if key is None:
+            return
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._pool.submit(self._prefetch, Path(path), key, size, mtime_ns)
+
+    def _prefetch(self, path: Path, key: str, size: int | None, mtime_ns: int | None) -> None:
+        try:
+            if size is None or mtime_ns is None:
+                st = os.stat(path)
+                size, mtime_ns = st.st_size, st.st_mtime_ns
+            if self.peek(path, size, mtime_ns) is None:
+                self._load(path, size, mtime_ns)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _load(self, path: Path, size: int, mtime_ns: int, notify: bool = True) -> SongMetadata:
+        meta = read_metadata(path, size, mtime_ns)
+        key = self._key(path)
+        if key is None:
+            return meta
+        with self._lock, self._conn:
+            self._entries[key] = meta
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (path, size, mtime_ns, title, artist, album, duration, bitrate, video_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, size, mtime_ns, meta.title, meta.artist, meta.album, meta.duration, meta.bitrate, meta.video_id),
+            )
+            if notify and self.on_loaded is not None:
+                self._loaded_albums.add(path.parent.name)
+                if self._notify_timer is None:
+                    self._notify_timer = threading.Timer(_NOTIFY_DELAY_SECONDS, self._flush_loaded)
+                    self._notify_timer.daemon = True
+                    self._notify_timer.start()
+        return meta
+
+    def _flush_loaded(self) -> None:
+        with self._lock:
+            albums, self._loaded_albums = self._loaded_albums, set()
+            self._notify_timer = None
+        try:
+            self.on_loaded(albums)
+        except Exception:
+            pass
+
+    def on_catalog_change(self, kind: str, path: Path, old_path: Path | None = None) -> None:
+        """Observador del catálogo: invalida, traslada o encola la lectura de la canción."""
+        key = self._key(path)
+        if key is None:
+            return
+        if kind == CHANGE_REMOVE:
+            with self._lock, self._conn:
+                if self._entries.pop(key, None) is not None:
+                    self._conn.execute("DELETE FROM metadata WHERE path = ?", (key,))
+        elif kind == CHANGE_MOVE:
+            old_key = self._key(old_path) if old_path else None
+            with self._lock, self._conn:
+                meta = self._entries.pop(old_key, None) if old_key else None
+                if meta is not None:
+                    self._entries[key] = meta
+                    self._conn.execute("UPDATE OR REPLACE metadata SET path = ? WHERE path = ?", (key, old_key))
+        else:
+            self.prefetch(path)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._conn.close()
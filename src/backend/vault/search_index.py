@@ -0,0 +1,323 @@
+import os
+import queue
+import re
+import sqlite3
+import threading
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable
+
+from src.backend.vault.vault_catalog import CHANGE_ADD, CHANGE_MOVE, CHANGE_REMOVE
+
+# Puntuación por tipo de coincidencia de cada término de la búsqueda
+_SCORE_EXACT = 3
+_SCORE_PREFIX = 2
+_SCORE_FUZZY = 1
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin acentos ("Canción" → "cancion")."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(normalize(text))
+
+
+def _max_edits(term: str) -> int:
+    """Errores tolerados en la coincidencia aproximada según la longitud del término."""
+    return 0 if len(term) < 4 else 1 if len(term) < 8 else 2
+
+
+def _within_distance(a: str, b: str, limit: int) -> bool:
+    """Distancia de Levenshtein de `a` a `b` ≤ `limit` (cortando en cuanto se supera)."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class SearchIndex:
+    """Índice invertido persistente (SQLite) sobre título, artista, álbum, nombre de archivo e ID de YouTube.
+
+    Sigue al catálogo del Vault: cada alta, baja o cambio de una canción se
+    encola y un hilo en segundo plano lee sus etiquetas una sola vez (el
+    documento guarda tamaño y mtime para no re-leer un archivo sin cambios).
+    Las búsquedas combinan coincidencia exacta, por prefijo y aproximada.
+    """
+
+    def __init__(self, db_path: Path, vault_root: Path, read_tags: Callable[[Path], dict],
+                 on_log: Callable[[str, str], None] | None = None):
+        self.db_path = Path(db_path)
+        self.vault_root = Path(vault_root)
+        self.read_tags = read_tags
+        # Destino de los avisos (nivel, mensaje): p. ej. el área de logs de la UI
+        self.on_log = on_log
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # ruta relativa al Vault ("Album/cancion.mp3") → documento
+        self._docs: dict[str, dict] = {}
+        # término → rutas relativas que lo contienen
+        self._postings: dict[str, set[str]] = {}
+        # Vocabulario ordenado para las búsquedas por prefijo (se reconstruye si cambió)
+        self._terms: list[str] | None = None
+        self._queue: queue.Queue = queue.Queue()
+        self._worker = None
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS docs (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    title TEXT,
+                    artist TEXT,
+                    album_tag TEXT,
+                    video_id TEXT
+                )
+                """
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS postings (term TEXT NOT NULL, path TEXT NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS postings_path ON postings (path)")
+        self._load()
+
+    def _load(self) -> None:
+        with self._lock:
+            for path, size, mtime_ns, title, artist, album_tag, video_id in self._conn.execute(
+                "SELECT path, size, mtime_ns, title, artist, album_tag, video_id FROM docs"
+            ):
+                self._docs[path] = {
+                    "size": size, "mtime_ns": mtime_ns, "title": title,
+                    "artist": artist, "album_tag": album_tag, "video_id": video_id,
+                }
+            for term, path in self._conn.execute("SELECT term, path FROM postings"):
+                self._postings.setdefault(term, set()).add(path)
+
+    # ── Mantenimiento incremental ────────────────────────────────────────────
+
+    def start(self, catalog) -> None:
+        """Suscribe el índice al catálogo y lanza el hilo que lo sincroniza en segundo plano."""
+        if self._worker is not None:
+            return
+        catalog.add_observer(self.on_catalog_change)
+        self._worker = threading.Thread(target=self._run, args=(catalog,), daemon=True)
+        self._worker.start()
+
+    def on_catalog_change(self, kind: str, path: Path, old_path: Path | None = None) -> None:
+        self._queue.put((kind, Path(path), Path(old_path) if old_path else None))
+
+    def _run(self, catalog) -> None:
+        self._sync(catalog)
+        while True:
+            self._apply(*self._queue.get())
+
+    def _apply(self, kind: str, path: Path, old_path: Path | None = None) -> None:
+        """Aplica un cambio al índice; si falla lo registra y deja el documento desactualizado."""
+        try:
+            if kind == CHANGE_REMOVE:
+                self.remove(path)
+            elif kind == CHANGE_MOVE:
+                self.move(old_path, path)
+            else:
+                self.update(path)
+        except Exception as e:
+            if self.on_log is not None:
+                try:
+                    self.on_log("WARN", f"Índice de búsqueda: no se pudo actualizar '{path}': {e}")
+                except Exception:
+                    pass
+            # Queda desactualizado a propósito: el próximo `_sync` lo re-indexa
+            self._mark_stale(path)
+            if old_path is not None:
+                self._mark_stale(old_path)
+
+    def _sync(self, catalog) -> None:
+        """Alinea el índice con el catálogo al iniciar: indexa lo nuevo o modificado y olvida lo borrado."""
+        seen = set()
+        for record in catalog.albums():
+            for song in record.songs:
+                key = f"{record.name}/{song.name}"
+                seen.add(key)
+                doc = self._docs.get(key)
+                if doc is None or (doc["size"], doc["mtime_ns"]) != (song.size, song.mtime_ns):
+                    self._apply(CHANGE_ADD, self.vault_root / record.name / song.name)
+        for key in set(self._docs) - seen:
+            self._apply(CHANGE_REMOVE, self.vault_root / key)
+
+    def _mark_stale(self, path: Path) -> None:
+        """Invalida el tamaño guardado del documento para que `_sync` no lo dé por vigente."""
+        key = self._key(path)
+        if key is None:
+            return
+        try:
+            with self._lock, self._conn:
+                doc = self._docs.get(key)
+                if doc is not None:
+                    doc["size"] = -1
+                self._conn.execute("UPDATE docs SET size = -1 WHERE path = ?", (key,))
+        except Exception:
+            pass
+
+    def _key(self, path: Path) -> str | None:
+        path = Path(path)
+        if path.parent.parent != self.vault_root:
+            return None
+        return f"{path.parent.name}/{path.name}"
+
+    @staticmethod
+    def _terms_of(key: str, doc: dict) -> set[str]:
+        album, name = key.split("/", 1)
+        terms = set()
+        for text in (doc.get("title"), doc.get("artist"), doc.get("album_tag"), album, Path(name).stem, doc.get("video_id")):
+            terms.update(tokenize(text or ""))
+        if doc.get("video_id"):
+            # El ID completo también es un término (puede contener '-' o '_')
+            terms.add(doc["video_id"].lower())
+        return terms
+
+    def _store(self, key: str, doc: dict | None) -> None:
+        """Reemplaza (o borra con None) el documento y sus términos, en memoria y en disco."""
+        with self._lock, self._conn:
+            old = self._docs.pop(key, None)
+            if old is not None:
+                for term in self._terms_of(key, old):
+                    paths = self._postings.get(term)
+                    if paths is not None:
+                        paths.discard(key)
+                        if not paths:
+                            del self._postings[term]
+                self._conn.execute("DELETE FROM docs WHERE path = ?", (key,))
+                self._conn.execute("DELETE FROM postings WHERE path = ?", (key,))
+            if doc is not None:
+                self._docs[key] = doc
+                terms = self._terms_of(key, doc)
+                for term in terms:
+                    self._postings.setdefault(term, set()).add(key)
+                self._conn.execute(
+                    "INSERT INTO docs (path, size, mtime_ns, title, artist, album_tag, video_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, doc["size"], doc["mtime_ns"], doc.get("title"), doc.get("artist"), doc.get("album_tag"), doc.get("video_id")),
+                )
+                self._conn.executemany("INSERT INTO postings (term, path) VALUES (?, ?)", [(t, key) for t in terms])
+            self._terms = None
+
+    def update(self, path: Path) -> None:
+        """Indexa una canción nueva o modificada (no re-lee etiquetas si tamaño y mtime coinciden)."""
+        key = self._key(path)
+        if key is None:
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._store(key, None)
+            return
+        doc = self._docs.get(key)
+        if doc is not None and (doc["size"], doc["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            return
+        tags = self.read_tags(Path(path)) or {}
+        self._store(key, {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "title": tags.get("title"),
+            "artist": tags.get("artist"),
+            "album_tag": tags.get("album"),
+            "video_id": tags.get("video_id"),
+        })
+
+    def remove(self, path: Path) -> None:
+        key = self._key(path)
+        if key is not None and key in self._docs:
+            self._store(key, None)
+
+    def move(self, old_path: Path, new_path: Path) -> None:
+        """El archivo cambió de ruta sin cambiar de contenido: se re-indexa sin leer etiquetas."""
+        old_key, new_key = self._key(old_path), self._key(new_path)
+        doc = self._docs.get(old_key) if old_key else None
+        if doc is None or new_key is None:
+            self.remove(old_path)
+            self.update(new_path)
+            return
+        self._store(old_key, None)
+        self._store(new_key, dict(doc))
+
+    # ── Consultas ────────────────────────────────────────────────────────────
+
+    def _matches(self, token: str) -> dict[str, int]:
+        """Rutas que coinciden con un término de la búsqueda, con su mejor puntuación."""
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        scores: dict[str, int] = {}
+
+        def add(term: str, score: int) -> None:
+            for key in self._postings.get(term, ()):
+                if scores.get(key, 0) < score:
+                    scores[key] = score
+
+        # Exacta y por prefijo: rango contiguo del vocabulario ordenado
+        i = bisect_left(self._terms, token)
+        while i < len(self._terms) and self._terms[i].startswith(token):
+            term = self._terms[i]
+            add(term, _SCORE_EXACT if term == token else _SCORE_PREFIX)
+            i += 1
+        if scores:
+            return scores
+
+        # Aproximada (solo si no hubo otra coincidencia): términos cuyo inicio está a pocas ediciones.
+        # Se exige la misma primera letra para no recorrer con Levenshtein todo el vocabulario.
+        limit = _max_edits(token)
+        if limit:
+            i = bisect_left(self._terms, token[0])
+            while i < len(self._terms) and self._terms[i][0] == token[0]:
+                term = self._terms[i]
+                if _within_distance(token, term[:len(token) + limit], limit):
+                    add(term, _SCORE_FUZZY)
+                i += 1
+        return scores
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Canciones que contienen todos los términos de `query` (por prefijo o aproximados), mejor puntuadas primero."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            total: dict[str, int] | None = None
+            for token in tokens:
+                matches = self._matches(token)
+                if total is None:
+                    total = matches
+                else:
+                    total = {key: score + matches[key] for key, score in total.items() if key in matches}
+                if not total:
+                    return []
+            ranked = sorted(total.items(), key=lambda item: (-item[1], item[0].lower()))[:limit]
+            results = []
+            for key, score in ranked:
+                album, name = key.split("/", 1)
+                doc = self._docs[key]
+                results.append({
+                    "path": self.vault_root / key,
+                    "album": album,
+                    "name": name,
+                    "title": doc.get("title"),
+                    "artist": doc.get("artist"),
+                    "video_id": doc.get("video_id"),
+                    "score": score,
+                })
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
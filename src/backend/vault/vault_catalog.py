@@ -0,0 +1,374 @@
+import os
+import sqlite3
+import threading
+from bisect import bisect_left
+from pathlib import Path
+
+# Carpeta raíz del Vault que siempre se lista primero
+SIN_ALBUM = "Sin album"
+
+# Cambios de canciones notificados a los observadores del catálogo
+CHANGE_ADD = "add"        # Canción nueva o con tamaño/mtime distinto
+CHANGE_REMOVE = "remove"
+CHANGE_MOVE = "move"      # Mismo archivo con otra ruta (álbum renombrado)
+
+
+class SongRecord:
+    """Canción del catálogo: nombre de archivo, tamaño y mtime (ns)."""
+
+    __slots__ = ("name", "size", "mtime_ns")
+
+    def __init__(self, name: str, size: int, mtime_ns: int):
+        self.name = name
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+
+class AlbumRecord:
+    """Álbum del catálogo con sus canciones ordenadas por nombre.
+
+    `mtime_ns` es el mtime del directorio en el último escaneo (0 = pendiente de escanear).
+    """
+
+    __slots__ = ("name", "mtime_ns", "songs")
+
+    def __init__(self, name: str, mtime_ns: int = 0, songs: list[SongRecord] | None = None):
+        self.name = name
+        self.mtime_ns = mtime_ns
+        self.songs = songs or []
+
+    def song_names(self) -> list[str]:
+        return [song.name for song in self.songs]
+
+    def _index(self, name: str) -> int:
+        """Posición de `name` en la lista ordenada (o donde debería insertarse)."""
+        return bisect_left(self.songs, name, key=lambda song: song.name)
+
+
+class VaultCatalog:
+    """Catálogo incremental y persistente de álbumes y canciones del Vault (RF-020, RF-021).
+
+    Mantiene el árbol en memoria y lo guarda en SQLite. Al consultar se
+    revalida cada álbum comparando el mtime de su directorio con el guardado:
+    solo los álbumes que cambiaron en disco se vuelven a escanear (con
+    `os.scandir`). Las operaciones de la propia aplicación (crear, editar,
+    borrar, descargar) actualizan el catálogo en el momento, sin re-escanear.
+    """
+
+    def __init__(self, vault_root: Path, db_path: Path, extensions: tuple[str, ...]):
+        self.vault_root = Path(vault_root)
+        self.db_path = Path(db_path)
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Reentrante: las consultas revalidan y persisten dentro de la misma sección
+        self._lock = threading.RLock()
+        self._albums: dict[str, AlbumRecord] = {}
+        self._root_mtime_ns = 0
+        self._observers = []
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS albums (name TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL)")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS songs (
+                    album TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    PRIMARY KEY (album, name)
+                )
+                """
+            )
+        self._load()
+
+    # ── Persistencia ─────────────────────────────────────────────────────────
+
+    def _load(self) -> None:
+        """Carga el catálogo guardado en la sesión anterior (se revalida al consultarlo)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'root_mtime_ns'").fetchone()
+            self._root_mtime_ns = row[0] if row else 0
+            for name, mtime_ns in self._conn.execute("SELECT name, mtime_ns FROM albums"):
+                self._albums[name] = AlbumRecord(name, mtime_ns)
+            for album, name, size, mtime_ns in self._conn.execute(
+                "SELECT album, name, size, mtime_ns FROM songs ORDER BY album, name"
+            ):
+                record = self._albums.get(album)
+                if record is not None:
+                    record.songs.append(SongRecord(name, size, mtime_ns))
+
+    def _save_root(self) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('root_mtime_ns', ?)", (self._root_mtime_ns,)
+        )
+
+    def _save_album(self, record: AlbumRecord, songs: bool = True) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO albums (name, mtime_ns) VALUES (?, ?)", (record.name, record.mtime_ns)
+        )
+        if songs:
+            self._conn.execute("DELETE FROM songs WHERE album = ?", (record.name,))
+            self._conn.executemany(
+                "INSERT INTO songs (album, name, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                [(record.name, s.name, s.size, s.mtime_ns) for s in record.songs],
+            )
+
+    def _delete_album(self, name: str) -> None:
+        self._conn.execute("DELETE FROM albums WHERE name = ?", (name,))
+        self._conn.execute("DELETE FROM songs WHERE album = ?", (name,))
+
+    # ── Observadores ─────────────────────────────────────────────────────────
+
+    def add_observer(self, callback) -> None:
+        """Registra `callback(kind, path, old_path)` para cada canción que cambia en el catálogo.
+
+        Se invoca con el lock del catálogo tomado: debe limitarse a encolar trabajo.
+        """
+        self._observers.append(callback)
+
+    def _notify(self, kind: str, path: Path, old_path: Path | None = None) -> None:
+        for callback in self._observers:
+            try:
+                callback(kind, path, old_path)
+            except Exception:
+                pass
+
+    def _notify_album_removed(self, record: AlbumRecord) -> None:
+        for song in record.songs:
+            self._notify(CHANGE_REMOVE, self.vault_root / record.name / song.name)
+
+    # ── Revalidación ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _mtime_ns(path: Path) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _revalidate_root(self) -> None:
+        """Sincroniza la lista de álbumes si el directorio raíz cambió desde el último escaneo."""
+        mtime_ns = self._mtime_ns(self.vault_root)
+        if mtime_ns is None or mtime_ns == self._root_mtime_ns:
+            return
+        names = set()
+        with os.scandir(self.vault_root) as entries:
+            for entry in entries:
+                if not entry.name.startswith(".") and entry.is_dir():
+                    names.add(entry.name)
+        with self._conn:
+            for name in list(self._albums):
+                if name not in names:
+                    self._notify_album_removed(self._albums.pop(name))
+                    self._delete_album(name)
+            for name in names - self._albums.keys():
+                # Álbum nuevo: se escanea la primera vez que se consulte
+                self._albums[name] = AlbumRecord(name)
+                self._save_album(self._albums[name], songs=False)
+            self._root_mtime_ns = mtime_ns
+            self._save_root()
+
+    def _revalidate_album(self, record: AlbumRecord) -> AlbumRecord | None:
+        """Re-escanea el álbum solo si el mtime de su directorio cambió. None si ya no existe."""
+        album_path = self.vault_root / record.name
+        mtime_ns = self._mtime_ns(album_path)
+        if mtime_ns is None:
+            self._albums.pop(record.name, None)
+            self._notify_album_removed(record)
+            with self._conn:
+                self._delete_album(record.name)
+            return None
+        if mtime_ns != record.mtime_ns:
+            songs = []
+            with os.scandir(album_path) as entries:
+                for entry in entries:
+                    # Los temporales ocultos (.<nombre>.part.mp3) de una conversión en curso no cuentan
+                    if entry.name.startswith(".") or not entry.name.lower().endswith(self.extensions):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    songs.append(SongRecord(entry.name, st.st_size, st.st_mtime_ns))
+            songs.sort(key=lambda s: s.name)
+            # Solo se notifican las diferencias con el escaneo anterior
+            previous = {s.name: (s.size, s.mtime_ns) for s in record.songs}
+            for song in songs:
+                if previous.pop(song.name, None) != (song.size, song.mtime_ns):
+                    self._notify(CHANGE_ADD, album_path / song.name)
+            for name in previous:
+                self._notify(CHANGE_REMOVE, album_path / name)
+            record.songs = songs
+            record.mtime_ns = mtime_ns
+            with self._conn:
+                self._save_album(record)
+        return record
+
+    def _refresh_album_mtime(self, record: AlbumRecord) -> None:
+        """Tras un cambio hecho por la aplicación, el mtime actual ya está reflejado en memoria."""
+        record.mtime_ns = self._mtime_ns(self.vault_root / record.name) or 0
+
+    # ── Consultas ────────────────────────────────────────────────────────────
+
+    def albums(self) -> list[AlbumRecord]:
+        """Todos los álbumes revalidados: 'Sin album' primero y luego por nombre."""
+        with self._lock:
+            self._revalidate_root()
+            records = [r for r in map(self._revalidate_album, list(self._albums.values())) if r is not None]
+        records.sort(key=lambda r: (0 if r.name == SIN_ALBUM else 1, r.name.lower()))
+        return records
+
+    def get_album(self, name: str) -> AlbumRecord | None:
+        """Álbum revalidado por nombre exacto (None si no existe)."""
+        with self._lock:
+            self._revalidate_root()
+            record = self._albums.get(name)
+            return self._revalidate_album(record) if record is not None else None
+
+    def find_album(self, name: str) -> str | None:
+        """Nombre exacto de un álbum buscándolo sin distinguir mayúsculas (solo consulta la raíz)."""
+        wanted = name.lower()
+        with self._lock:
+            self._revalidate_root()
+            if name in self._albums:
+                return name
+            return next((album for album in self._albums if album.lower() == wanted), None)
+
+    def songs(self, album_name: str) -> list[str]:
+        """Nombres de las canciones del álbum en orden alfabético (vacío si no existe)."""
+        record = self.get_album(album_name)
+        return record.song_names() if record is not None else []
+
+    def song_path(self, album_name: str, number: int) -> Path | None:
+        """Ruta de la canción número `number` (1-indexed) del álbum, o None si no existe."""
+        songs = self.songs(album_name)
+        if 1 <= number <= len(songs):
+            return self.vault_root / album_name / songs[number - 1]
+        return None
+
+    # ── Actualizaciones en el momento ────────────────────────────────────────
+    # Retornan True si el catálogo cambió (un evento repetido del vigilante no cuenta)
+
+    def _album_of(self, path: Path) -> AlbumRecord | None:
+        """Registro del álbum que contiene `path` (creándolo si el directorio es nuevo)."""
+        path = Path(path)
+        if path.parent.parent != self.vault_root:
+            return None
+        name = path.parent.name
+        record = self._albums.get(name)
+        if record is None and path.parent.is_dir():
+            record = self._albums[name] = AlbumRecord(name)
+        return record
+
+    def add_song(self, path: Path) -> bool:
+        """Registra (o actualiza) una canción recién escrita en el Vault."""
+        path = Path(path)
+        if path.name.startswith(".") or not path.name.lower().endswith(self.extensions):
+            return False
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        with self._lock, self._conn:
+            record = self._album_of(path)
+            if record is None:
+                return False
+            if not record.mtime_ns:
+                # Álbum aún sin escanear: el primer escaneo ya incluirá la canción
+                self._save_album(record, songs=False)
+                return True
+            i = record._index(path.name)
+            song = SongRecord(path.name, st.st_size, st.st_mtime_ns)
+            if i < len(record.songs) and record.songs[i].name == path.name:
+                old = record.songs[i]
+                if (old.size, old.mtime_ns) == (song.size, song.mtime_ns):
+                    return False
+                record.songs[i] = song
+            else:
+                record.songs.insert(i, song)
+            self._refresh_album_mtime(record)
+            self._save_album(record, songs=False)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO songs (album, name, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                (record.name, song.name, song.size, song.mtime_ns),
+            )
+            self._notify(CHANGE_ADD, path)
+            return True
+
+    # Editar etiquetas cambia tamaño y mtime del archivo pero no el del directorio
+    update_song = add_song
+
+    def remove_song(self, path: Path) -> bool:
+        """Quita una canción borrada (o movida fuera) de su álbum."""
+        path = Path(path)
+        with self._lock, self._conn:
+            record = self._albums.get(path.parent.name) if path.parent.parent == self.vault_root else None
+            if record is None:
+                return False
+            i = record._index(path.name)
+            if i >= len(record.songs) or record.songs[i].name != path.name:
+                return False
+            del record.songs[i]
+            if record.mtime_ns:
+                self._refresh_album_mtime(record)
+            self._save_album(record, songs=False)
+            self._conn.execute("DELETE FROM songs WHERE album = ? AND name = ?", (record.name, path.name))
+            self._notify(CHANGE_REMOVE, path)
+            return True
+
+    def move_song(self, old_path: Path, new_path: Path) -> bool:
+        """Renombra una canción o la mueve a otro álbum."""
+        with self._lock:
+            removed = self.remove_song(old_path)
+            return self.add_song(new_path) or removed
+
+    def add_album(self, name: str) -> bool:
+        """Registra un álbum nuevo; sus canciones se listan la primera vez que se consulte."""
+        with self._lock, self._conn:
+            if name in self._albums or name.startswith("."):
+                return False
+            self._albums[name] = AlbumRecord(name)
+            self._save_album(self._albums[name], songs=False)
+            return True
+
+    def remove_album(self, name: str) -> bool:
+        """Olvida un álbum borrado con todas sus canciones."""
+        with self._lock, self._conn:
+            record = self._albums.pop(name, None)
+            if record is None:
+                return False
+            self._delete_album(name)
+            self._notify_album_removed(record)
+            return True
+
+    def rename_album(self, old_name: str, new_name: str) -> bool:
+        """Traslada el registro de un álbum renombrado sin volver a escanear sus canciones."""
+        with self._lock, self._conn:
+            record = self._albums.pop(old_name, None)
+            if record is None:
+                return self.add_album(new_name)
+            self._delete_album(old_name)
+            record.name = new_name
+            self._albums[new_name] = record
+            if record.mtime_ns:
+                self._refresh_album_mtime(record)
+            self._save_album(record)
+            for song in record.songs:
+                self._notify(CHANGE_MOVE, self.vault_root / new_name / song.name, self.vault_root / old_name / song.name)
+            return True
+
+    def invalidate(self) -> None:
+        """Fuerza a revalidar la raíz y todos los álbumes en la próxima consulta."""
+        with self._lock:
+            self._root_mtime_ns = 0
+            for record in self._albums.values():
+                record.mtime_ns = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
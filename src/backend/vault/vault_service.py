@@ -1,11 +1,67 @@
+import json
+import os
+import shutil
+from bisect import bisect_left
 from pathlib import Path
+from typing import Callable
+from src.backend.vault.metadata_cache import MetadataCache, SongMetadata
+from src.backend.vault.search_index import SearchIndex
+from src.backend.vault.vault_catalog import VaultCatalog
+from src.backend.vault.vault_watcher import (
+    EVENT_ADD, EVENT_REMOVE, EVENT_RESCAN, VaultEvent, VaultWatcher,
+)
+
+# Extensiones de audio reconocidas como canciones del Vault
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".ogg", ".opus")
+# Descripción del frame COMM usado para el comentario del álbum en MP3
+COMMENT_DESC = "Album Metadata"
+
+
+def _register_easy_comment() -> None:
+    """Expone el frame COMM como clave 'comment' de EasyID3 (M4A y Vorbis ya la soportan)."""
+    from mutagen.easyid3 import EasyID3
+    from mutagen.id3 import COMM
+
+    if "comment" in EasyID3.valid_keys:
+        return
+
+    def getter(id3, key):
+        frame = id3.get(f"COMM:{COMMENT_DESC}:eng")
+        return list(frame.text) if frame else []
+
+    def setter(id3, key, value):
+        id3.add(COMM(encoding=3, lang="eng", desc=COMMENT_DESC, text=value))
+
+    def deleter(id3, key):
+        id3.delall(f"COMM:{COMMENT_DESC}")
+
+    EasyID3.RegisterKey("comment", getter, setter, deleter)
+
 
 class VaultService:
     """Servicio de backend para administrar los álbumes y canciones del Vault (RF-020 al RF-026)."""
     
-    def __init__(self, download_dir: Path):
+    def __init__(self, download_dir: Path, on_log: Callable[[str, str], None] | None = None):
         self.download_dir = Path(download_dir)
+        # `on_log(nivel, mensaje)`: avisos de los procesos en segundo plano (índice de búsqueda).
+        # Se invoca desde hilos de fondo; la UI lo reenvía a su área de logs
+        self.on_log = on_log
+        self.album_settings_path = self.download_dir / "album_settings.json"
         self.ensure_directories()
+        # Catálogo persistente del árbol: las consultas no recorren el disco en cada refresco
+        self.catalog = VaultCatalog(self.download_dir, self.download_dir / "vault_catalog.db", AUDIO_EXTENSIONS)
+        # Cambios en disco (de la app o externos) llegan como eventos y se aplican al catálogo
+        self.watcher = VaultWatcher(self.download_dir, AUDIO_EXTENSIONS, self.apply_events)
+        self._listeners = []
+        self._metadata_listeners = []
+        # Etiquetas, duración y bitrate por (ruta, tamaño, mtime): la lista y la reproducción no abren archivos
+        self.metadata_cache = MetadataCache(
+            self.download_dir / "metadata_cache.db", self.download_dir, on_loaded=self._notify_metadata
+        )
+        # Índice de búsqueda por etiquetas: sigue al catálogo y lee las etiquetas una sola vez por archivo
+        self.search_index = SearchIndex(
+            self.download_dir / "search_index.db", self.download_dir, self.read_song_tags, on_log=self.on_log
+        )
 
     def ensure_directories(self):
         """Asegura que el directorio downloads y la carpeta 'Sin album' existan (RF-022)."""
@@ -14,29 +70,210 @@ class VaultService:
         sin_album_dir.mkdir(parents=True, exist_ok=True)
 
     def get_vault_structure(self) -> dict:
-        """Escanea la carpeta de descargas para retornar la estructura en formato de árbol (RF-020, RF-021)."""
+        """Retorna la estructura del Vault en formato de árbol desde el catálogo (RF-020, RF-021)."""
         self.ensure_directories()
         
-        albums = []
-        # Escanea subdirectorios de la carpeta de descargas
-        for item in self.download_dir.iterdir():
-            if item.is_dir() and not item.name.startswith("."):
-                songs = []
-                for file in item.iterdir():
-                    if file.is_file() and file.suffix.lower() in (".mp3", ".wav", ".m4a", ".ogg"):
-                        songs.append(file.name)
-                
-                albums.append({
-                    "name": item.name,
-                    "path": str(item),
-                    "songs": sorted(songs),
-                    "count": len(songs)
-                })
-        
-        # Ordenar: "Sin album" primero, luego alfabéticamente
-        albums.sort(key=lambda a: (0 if a["name"] == "Sin album" else 1, a["name"].lower()))
+        # "Sin album" primero, luego alfabéticamente (orden del catálogo)
+        albums = [self._album_entry(record) for record in self.catalog.albums()]
         
         return {
             "name": "VAULT_STORAGE",
             "albums": albums
         }
+
+    def get_album(self, album_name: str) -> dict | None:
+        """Entrada de un solo álbum con el mismo formato que `get_vault_structure` (None si no existe)."""
+        record = self.catalog.get_album(album_name)
+        return self._album_entry(record) if record is not None else None
+
+    def _album_entry(self, record) -> dict:
+        songs = record.song_names()
+        return {
+            "name": record.name,
+            "path": str(self.download_dir / record.name),
+            "songs": songs,
+            "count": len(songs)
+        }
+
+    def song_path_by_number(self, album_path: Path, number: int) -> Path | None:
+        """Ruta de la canción número `number` (1-indexed, orden alfabético) de un álbum del Vault."""
+        album_path = Path(album_path)
+        if album_path.parent != self.download_dir:
+            return None
+        return self.catalog.song_path(album_path.name, number)
+
+    # ── Búsqueda (RF-036) ────────────────────────────────────────────────────
+
+    def start_indexing(self) -> None:
+        """Rellena la caché de metadatos y sincroniza el índice de búsqueda en segundo plano."""
+        self.metadata_cache.start(self.catalog)
+        self.search_index.start(self.catalog)
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Busca canciones por título, artista, álbum, nombre de archivo o ID de YouTube.
+
+        Cada resultado incluye `number`: la posición de la canción en su álbum
+        (la que usan `edit --song` y `rm --song`), o None si ya no está.
+        """
+        results = []
+        for result in self.search_index.search(query, limit):
+            songs = self.catalog.songs(result["album"])
+            i = bisect_left(songs, result["name"])
+            result["number"] = i + 1 if i < len(songs) and songs[i] == result["name"] else None
+            results.append(result)
+        return results
+
+    def read_song_tags(self, song_path: Path) -> dict:
+        """Título, artista, álbum e ID de YouTube de un archivo (desde la caché de metadatos)."""
+        meta = self.metadata_cache.get(song_path)
+        return meta.as_tags() if meta is not None else {}
+
+    # ── Metadatos (caché) ────────────────────────────────────────────────────
+
+    def get_metadata(self, song_path: Path) -> SongMetadata | None:
+        """Metadatos vigentes de una canción; solo se lee el archivo si no estaba en caché o cambió."""
+        return self.metadata_cache.get(song_path)
+
+    def cached_metadata(self, album_name: str, song) -> SongMetadata | None:
+        """Metadatos en caché de un `SongRecord` del catálogo, sin acceder al disco (None si aún no están)."""
+        return self.metadata_cache.peek(self.download_dir / album_name / song.name, song.size, song.mtime_ns)
+
+    # ── Cambios incrementales (vigilante de la carpeta) ─────────────────────
+
+    def start_watching(self) -> None:
+        """Inicia el vigilante de la carpeta de descargas (inotify o sondeo)."""
+        self.watcher.start()
+
+    def add_listener(self, callback) -> None:
+        """Registra `callback(albums)`: recibe los nombres de álbum que cambiaron, o None si
+        hay que redibujar todo. Se invoca desde el hilo del vigilante."""
+        self._listeners.append(callback)
+
+    def add_metadata_listener(self, callback) -> None:
+        """Registra `callback(albums)`: álbumes con metadatos nuevos en caché (el árbol no cambia,
+        solo hay duraciones que mostrar). Se invoca desde la caché, agrupado cada medio segundo."""
+        self._metadata_listeners.append(callback)
+
+    def apply_events(self, events: list[VaultEvent]) -> set[str] | None:
+        """Aplica los eventos al catálogo y avisa a los oyentes con los álbumes afectados."""
+        changed: set[str] | None = set()
+        for event in events:
+            if event.kind == EVENT_RESCAN:
+                self.catalog.invalidate()
+                changed = None
+                continue
+            if event.is_dir:
+                name = event.path.name
+                if event.kind == EVENT_ADD:
+                    touched = self.catalog.add_album(name)
+                elif event.kind == EVENT_REMOVE:
+                    touched = self.catalog.remove_album(name)
+                else:
+                    touched = self.catalog.rename_album(event.old_path.name, name)
+                albums = {name, event.old_path.name} if event.old_path else {name}
+            else:
+                if event.kind == EVENT_ADD:
+                    touched = self.catalog.add_song(event.path)
+                elif event.kind == EVENT_REMOVE:
+                    touched = self.catalog.remove_song(event.path)
+                else:
+                    touched = self.catalog.move_song(event.old_path, event.path)
+                albums = {event.path.parent.name}
+                if event.old_path:
+                    albums.add(event.old_path.parent.name)
+            if touched and changed is not None:
+                changed |= albums
+        if changed is None or changed:
+            self._notify(changed)
+        return changed
+
+    def _notify(self, albums: set[str] | None) -> None:
+        for callback in self._listeners:
+            try:
+                callback(albums)
+            except Exception:
+                pass
+
+    def _notify_metadata(self, albums: set[str]) -> None:
+        for callback in self._metadata_listeners:
+            try:
+                callback(albums)
+            except Exception:
+                pass
+
+    @staticmethod
+    def write_tags(song_path: Path, **tags) -> bool:
+        """Escribe etiquetas (title, artist, album, comment...) en MP3, M4A u Opus/Ogg con una sola apertura y guardado."""
+        try:
+            import mutagen
+            _register_easy_comment()
+            VaultService._break_hardlink(Path(song_path))
+            audio = mutagen.File(song_path, easy=True)
+            if audio is None:
+                return False
+            if audio.tags is None:
+                audio.add_tags()
+            for key, value in tags.items():
+                if value:
+                    audio[key] = value
+            audio.save()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _break_hardlink(song_path: Path) -> None:
+        """Si el archivo comparte datos con otro (hardlink de un video reutilizado en otro álbum),
+        lo sustituye por una copia propia: la edición in situ no debe cambiar las dos canciones."""
+        if os.stat(song_path).st_nlink <= 1:
+            return
+        # Temporal oculto: el catálogo y el vigilante lo ignoran hasta que ocupa el nombre final
+        tmp_path = song_path.with_name(f".{song_path.stem}.copy{song_path.suffix}")
+        try:
+            shutil.copy2(song_path, tmp_path)
+            os.replace(tmp_path, song_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    # ── Configuración por álbum (modo de códec) ──────────────────────────────
+
+    def _load_album_settings(self) -> dict:
+        if self.album_settings_path.exists():
+            try:
+                with open(self.album_settings_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception:
+                pass
+        return {}
+
+    def get_album_codec(self, album_name: str) -> str | None:
+        """Retorna el modo de códec configurado para el álbum ("mp3" / "native") o None si no tiene."""
+        return self._load_album_settings().get(album_name, {}).get("codec")
+
+    def set_album_codec(self, album_name: str, codec: str | None) -> None:
+        """Fija (o elimina con None) el modo de códec por defecto de un álbum."""
+        data = self._load_album_settings()
+        album_settings = data.setdefault(album_name, {})
+        if codec:
+            album_settings["codec"] = codec
+        else:
+            album_settings.pop("codec", None)
+        if not album_settings:
+            data.pop(album_name, None)
+        try:
+            with open(self.album_settings_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+        except Exception:
+            pass
+
+    def rename_album_settings(self, old_name: str, new_name: str) -> None:
+        """Traslada la configuración de un álbum renombrado."""
+        data = self._load_album_settings()
+        if old_name in data:
+            data[new_name] = data.pop(old_name)
+            try:
+                with open(self.album_settings_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=4)
+            except Exception:
+                pass
@@ -0,0 +1,308 @@
+import os
+import sys
+import select
+import struct
+import threading
+from pathlib import Path
+from typing import Callable
+
+# Tipos de evento emitidos por el vigilante
+EVENT_ADD = "add"
+EVENT_REMOVE = "remove"
+EVENT_RENAME = "rename"
+# Se perdieron eventos (cola de inotify desbordada): hay que revalidar todo el Vault
+EVENT_RESCAN = "rescan"
+
+# Constantes de inotify (linux/inotify.h)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Raíz: solo interesan los directorios de álbum; álbum: canciones terminadas de escribir, borradas o movidas
+_ROOT_MASK = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_ONLYDIR
+_ALBUM_MASK = _IN_CLOSE_WRITE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE_SELF | _IN_ONLYDIR
+
+
+class VaultEvent:
+    """Cambio en el Vault: canción o álbum (`is_dir`) añadido, borrado o renombrado/movido."""
+
+    __slots__ = ("kind", "path", "old_path", "is_dir")
+
+    def __init__(self, kind: str, path: Path | None = None, old_path: Path | None = None, is_dir: bool = False):
+        self.kind = kind
+        self.path = path
+        self.old_path = old_path
+        self.is_dir = is_dir
+
+    def __repr__(self) -> str:
+        return f"VaultEvent({self.kind!r}, {self.path!r}, old_path={self.old_path!r}, is_dir={self.is_dir})"
+
+
+class VaultWatcher:
+    """Vigila la carpeta del Vault (raíz y un nivel de álbumes) y emite lotes de `VaultEvent`.
+
+    Usa inotify en Linux; en otros sistemas (o si inotify no está disponible)
+    sondea cada `poll_interval` segundos comparando el mtime de cada directorio,
+    y solo lista los álbumes que cambiaron. Los archivos ocultos (temporales
+    `.<nombre>.part.mp3` de una conversión) y los que no son de audio se ignoran;
+    renombrar un temporal a su nombre final cuenta como canción añadida.
+    """
+
+    def __init__(
+        self,
+        vault_root: Path,
+        extensions: tuple[str, ...],
+        on_events: Callable[[list[VaultEvent]], None],
+        poll_interval: float = 2.0,
+    ):
+        self.vault_root = Path(vault_root)
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.on_events = on_events
+        self.poll_interval = poll_interval
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        if sys.platform.startswith("linux"):
+            try:
+                self.backend = "inotify"
+                self._run_inotify()
+                return
+            except OSError:
+                pass
+        self.backend = "polling"
+        self._run_polling()
+
+    def _is_song(self, name: str) -> bool:
+        return not name.startswith(".") and name.lower().endswith(self.extensions)
+
+    def _emit(self, events: list[VaultEvent]) -> None:
+        if events:
+            try:
+                self.on_events(events)
+            except Exception:
+                pass
+
+    # ── inotify ──────────────────────────────────────────────────────────────
+
+    def _run_inotify(self) -> None:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        # wd → nombre del álbum ("" para la raíz)
+        watches: dict[int, str] = {}
+
+        def add_watch(name: str) -> None:
+            path = self.vault_root / name if name else self.vault_root
+            wd = libc.inotify_add_watch(fd, os.fsencode(path), _ALBUM_MASK if name else _ROOT_MASK)
+            if wd >= 0:
+                watches[wd] = name
+
+        try:
+            add_watch("")
+            if not watches:
+                raise OSError(ctypes.get_errno(), "inotify_add_watch")
+            with os.scandir(self.vault_root) as entries:
+                for entry in entries:
+                    if not entry.name.startswith(".") and entry.is_dir():
+                        add_watch(entry.name)
+
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 1.0)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._emit(self._parse_inotify(data, watches, add_watch, libc, fd))
+        finally:
+            os.close(fd)
+
+    def _parse_inotify(self, data: bytes, watches: dict, add_watch, libc, fd: int) -> list[VaultEvent]:
+        """Traduce un bloque de eventos de inotify, emparejando MOVED_FROM/MOVED_TO por cookie."""
+        events: list[VaultEvent] = []
+        moved_from: dict[int, tuple[Path, bool, int]] = {}
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                events.append(VaultEvent(EVENT_RESCAN))
+                continue
+            if mask & _IN_IGNORED:
+                watches.pop(wd, None)
+                continue
+            album = watches.get(wd)
+            if album is None or mask & _IN_DELETE_SELF:
+                continue
+
+            is_dir = bool(mask & _IN_ISDIR)
+            if album == "":
+                # Eventos de la raíz: solo directorios de álbum visibles
+                if not is_dir or name.startswith("."):
+                    continue
+                path = self.vault_root / name
+            else:
+                # Eventos de un álbum: solo canciones (un temporal oculto renombrado sí cuenta como destino)
+                if is_dir or (not self._is_song(name) and not mask & _IN_MOVED_FROM):
+                    continue
+                path = self.vault_root / album / name
+
+            if mask & _IN_MOVED_FROM:
+                moved_from[cookie] = (path, is_dir, len(events))
+                events.append(None)
+            elif mask & _IN_MOVED_TO:
+                source = moved_from.pop(cookie, None)
+                if source is None:
+                    events.append(VaultEvent(EVENT_ADD, path, is_dir=is_dir))
+                else:
+                    old_path, _, index = source
+                    if not is_dir and not self._is_song(old_path.name):
+                        # Temporal → nombre final: la canción acaba de aparecer
+                        events[index] = VaultEvent(EVENT_ADD, path)
+                    else:
+                        events[index] = VaultEvent(EVENT_RENAME, path, old_path, is_dir=is_dir)
+                if is_dir:
+                    # El wd de un álbum renombrado sigue al directorio; uno movido desde fuera es nuevo
+                    old = source[0].name if source else None
+                    for watch_wd, watch_name in watches.items():
+                        if watch_name == old:
+                            watches[watch_wd] = name
+                            break
+                    else:
+                        add_watch(name)
+            elif mask & (_IN_CREATE | _IN_CLOSE_WRITE):
+                if is_dir:
+                    add_watch(name)
+                events.append(VaultEvent(EVENT_ADD, path, is_dir=is_dir))
+            elif mask & _IN_DELETE:
+                events.append(VaultEvent(EVENT_REMOVE, path, is_dir=is_dir))
+
+        # Movidos fuera del Vault (sin MOVED_TO emparejado): equivalen a un borrado
+        for path, is_dir, index in moved_from.values():
+            if is_dir or self._is_song(path.name):
+                events[index] = VaultEvent(EVENT_REMOVE, path, is_dir=is_dir)
+            if is_dir:
+                for watch_wd, watch_name in list(watches.items()):
+                    if watch_name == path.name:
+                        libc.inotify_rm_watch(fd, watch_wd)
+                        watches.pop(watch_wd, None)
+        return [event for event in events if event is not None]
+
+    # ── Sondeo ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _mtime_ns(path: Path) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _list_albums(self) -> dict[str, int]:
+        """Álbumes de la raíz con su número de inodo (para reconocer renombrados)."""
+        albums = {}
+        with os.scandir(self.vault_root) as entries:
+            for entry in entries:
+                if not entry.name.startswith(".") and entry.is_dir():
+                    try:
+                        albums[entry.name] = entry.inode()
+                    except OSError:
+                        albums[entry.name] = 0
+        return albums
+
+    def _list_songs(self, album: str) -> dict[str, tuple[int, int]]:
+        """Canciones del álbum con (tamaño, mtime): un renombrado conserva ambos."""
+        songs = {}
+        try:
+            with os.scandir(self.vault_root / album) as entries:
+                for entry in entries:
+                    if self._is_song(entry.name):
+                        try:
+                            if entry.is_file():
+                                st = entry.stat()
+                                songs[entry.name] = (st.st_size, st.st_mtime_ns)
+                        except OSError:
+                            continue
+        except OSError:
+            pass
+        return songs
+
+    def _run_polling(self) -> None:
+        root_mtime = self._mtime_ns(self.vault_root)
+        albums = self._list_albums() if root_mtime is not None else {}
+        # Por álbum: (mtime del directorio, canciones)
+        snapshot = {name: (self._mtime_ns(self.vault_root / name), self._list_songs(name)) for name in albums}
+
+        while not self._stop.wait(self.poll_interval):
+            events: list[VaultEvent] = []
+            mtime = self._mtime_ns(self.vault_root)
+            if mtime is not None and mtime != root_mtime:
+                root_mtime = mtime
+                current = self._list_albums()
+                removed = {name: albums[name] for name in albums.keys() - current.keys()}
+                added = {name: current[name] for name in current.keys() - albums.keys()}
+                by_inode = {inode: name for name, inode in removed.items() if inode}
+                for name, inode in added.items():
+                    old = by_inode.pop(inode, None)
+                    if old is not None:
+                        events.append(VaultEvent(EVENT_RENAME, self.vault_root / name, self.vault_root / old, is_dir=True))
+                        snapshot[name] = snapshot.pop(old)
+                    else:
+                        events.append(VaultEvent(EVENT_ADD, self.vault_root / name, is_dir=True))
+                        snapshot[name] = (self._mtime_ns(self.vault_root / name), self._list_songs(name))
+                for old in by_inode.values():
+                    events.append(VaultEvent(EVENT_REMOVE, self.vault_root / old, is_dir=True))
+                    snapshot.pop(old, None)
+                for old, inode in removed.items():
+                    if not inode:
+                        events.append(VaultEvent(EVENT_REMOVE, self.vault_root / old, is_dir=True))
+                        snapshot.pop(old, None)
+                albums = current
+
+            for name, (album_mtime, songs) in list(snapshot.items()):
+                mtime = self._mtime_ns(self.vault_root / name)
+                if mtime is None or mtime == album_mtime:
+                    continue
+                current = self._list_songs(name)
+                snapshot[name] = (mtime, current)
+                album_path = self.vault_root / name
+                removed = {song: songs[song] for song in songs.keys() - current.keys()}
+                by_stat = {stat: song for song, stat in removed.items()}
+                for song in current.keys() - songs.keys():
+                    old = by_stat.pop(current[song], None)
+                    if old is not None:
+                        events.append(VaultEvent(EVENT_RENAME, album_path / song, album_path / old))
+                    else:
+                        events.append(VaultEvent(EVENT_ADD, album_path / song))
+                for old in by_stat.values():
+                    events.append(VaultEvent(EVENT_REMOVE, album_path / old))
+            self._emit(events)
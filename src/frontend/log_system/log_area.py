@@ -62,6 +62,10 @@ class LogAreaWidget(tk.Frame):
         self.output.tag_configure("message",   foreground="#EDEDED", font=("Courier New", 13))
         self.output.tag_configure("divider",   foreground="#333333")
 
+        # Contador de mensajes: permite saber si el último mensaje sigue siendo el mismo (p. ej. la barra de progreso)
+        self.message_count = 0
+        self._last_message = None
+
     def append_log(self, level: str, message: str, route: str = "C:\\Users\\Gustavo\\Documents\\mp3dowloaderProject"):
         """Añade visualmente un log formateado en la terminal al estilo pixel-perfect (RF-014, RF-015)."""
         level_upper = level.upper()
@@ -84,7 +88,12 @@ class LogAreaWidget(tk.Frame):
             self.output.insert("end", "INFO\n", "info")
             
         # 2. Mensaje de log / resultado acción en la siguiente línea
+        # La marca delimita el inicio del mensaje para poder sobrescribirlo aunque ocupe varias líneas
+        self.output.mark_set("last_message", "end-1c")
+        self.output.mark_gravity("last_message", "left")
         self.output.insert("end", f"{message}\n", "message")
+        self.message_count += 1
+        self._last_message = message
         
         # 3. Línea divisoria de separación visual más gruesa y visible (RF-015)
         self.output.insert("end", "═" * 80 + "\n\n", "divider")
@@ -99,12 +108,17 @@ class LogAreaWidget(tk.Frame):
         self.output.configure(state="normal")
         self.output.delete("1.0", "end")
         self.output.configure(state="disabled")
+        self.message_count += 1
+        self._last_message = None
 
     def overwrite_last_message(self, message: str):
-        """Sobreescribe la última línea del log (usado para barras de progreso) de forma limpia y fluida."""
+        """Sobreescribe el último mensaje del log (usado para barras de progreso) de forma limpia y fluida."""
+        if message == self._last_message:
+            return
+        self._last_message = message
         self.output.configure(state="normal")
-        # Borrar el mensaje anterior y el divisor anterior
-        self.output.delete("end-3l", "end-1c")
+        # Borrar el mensaje anterior (una o varias líneas) y el divisor anterior
+        self.output.delete("last_message", "end-1c")
         self.output.insert("end", f"{message}\n", "message")
         self.output.insert("end", "═" * 80 + "\n\n", "divider")
         self.output.configure(state="disabled")
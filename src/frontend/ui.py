@@ -15,6 +15,9 @@ GRAY     = "#808080"   # Texto de sistema / mensajes
 WHITE    = "#EDEDED"   # Rutas, nombres de archivo (énfasis)
 MUTED    = "#3D3D3D"   # Texto muy secundario
 PROGRESS = "#5A8FA8"   # Barra de progreso (azul apagado)
+
+# Intervalo de refresco de las barras de progreso (~10 fps), independiente de la velocidad de red
+PROGRESS_FRAME_MS = 100
 RED      = "#CC5555"   # Errores
 AMBER    = "#C89060"   # Advertencias (ámbar suave)
 FONT     = ("Courier New", 12)
@@ -48,11 +51,23 @@ class TerminalUI(ctk.CTk):
         # Atributos para control de estado de reproducción y logs (RF-026)
         self._current_playing_song = None
         self._playback_timer = None
+        
+        # Progreso de descargas: último evento por trabajo y mensaje del log que muestra el bloque de barras
+        self._progress_rows = {}
+        self._progress_block_id = None
+        # Resultados de la última búsqueda (para "search --go <n>")
+        self._search_results = []
 
         # Inicializar servicios en el backend
         from src.backend.vault import VaultService
         from src.backend.history import HistoryService
-        self.vault_service = VaultService(self.download_service.download_dir.parent)
+        # Los avisos de los hilos de fondo del Vault llegan al área de logs desde el hilo de Tk
+        self.vault_service = VaultService(
+            self.download_service.download_dir.parent,
+            on_log=lambda level, message: self.after(
+                0, lambda: self.log_area.append_log(level, message, route=self.current_route)
+            ),
+        )
         self.history_service = HistoryService(self.download_service.download_dir.parent / "history.json")
 
         self.title("mp3DL Terminal")
@@ -62,6 +77,20 @@ class TerminalUI(ctk.CTk):
 
         self._build_ui()
         self._focus_input()
+        # Cambios en la carpeta del Vault (externos o de la app): solo se redibujan los álbumes afectados
+        self.vault_service.add_listener(
+            lambda albums: self.after(0, lambda: self.vault_history.update_vault(albums))
+        )
+        # Metadatos nuevos en caché (relleno inicial): solo se repintan las filas visibles de esos álbumes
+        self.vault_service.add_metadata_listener(
+            lambda albums: self.after(0, lambda: self.vault_history.repaint_vault(albums))
+        )
+        self.vault_service.start_watching()
+        self.vault_service.start_indexing()
+        # Reanudar las descargas que quedaron pendientes en la sesión anterior
+        self.after(300, self._restore_pending_jobs)
+        # Bucle único que vuelca el progreso de todas las descargas a ritmo fijo
+        self.after(PROGRESS_FRAME_MS, self._progress_loop)
 
     # ── Construcción de UI ────────────────────────────────────────────────────
 
@@ -172,21 +201,12 @@ class TerminalUI(ctk.CTk):
         downloads_path = self.vault_service.download_dir
         
         # Debe ser un subdirectorio directo de downloads, o ser "downloads / Sin album"
-        if not current_path.exists() or not current_path.is_dir() or (current_path.parent != downloads_path and current_path != downloads_path / "Sin album"):
+        if current_path.parent != downloads_path and current_path != downloads_path / "Sin album":
             return None
             
-        # Escanear y ordenar canciones alfabéticamente
-        songs = []
-        for file in current_path.iterdir():
-            if file.is_file() and file.suffix.lower() in (".mp3", ".wav", ".m4a", ".ogg"):
-                songs.append(file.name)
-        songs.sort()
-        
-        if 1 <= num <= len(songs):
-            target_song = songs[num - 1]
-            return str(current_path / target_song)
-            
-        return None
+        # Canciones en orden alfabético desde el catálogo del Vault
+        song_path = self.vault_service.song_path_by_number(current_path, num)
+        return str(song_path) if song_path is not None else None
 
     # ── Output ────────────────────────────────────────────────────────────────
 
@@ -237,7 +257,7 @@ class TerminalUI(ctk.CTk):
             return
 
         # Parsear con nuestro servicio de backend modular
-        parsed = CommandService.parse_input(text)
+        parsed = CommandService.parse_input(text, self.vault_service.catalog)
 
         if parsed["type"] == "command":
             cmd_name = parsed["name"]
@@ -271,6 +291,7 @@ class TerminalUI(ctk.CTk):
                     f"                    {C}--song-name  <num> <nuevo nombre>           {C}Edita el nombre de una canción *",
                     f"                    {C}--song-album <num> <nuevo album>            {C}Mueve una canción a otro álbum *",
                     f"                    {C}--song-artist <num> <nuevo artista>         {C}Edita el artista de una canción *",
+                    f"                    {C}--album-codec <perfil|native|default>       {C}Códec por defecto del álbum actual *",
                     SEP,
                     f"  export            {C}--song  <numero>                            {C}Exporta canción(es) a carpeta externa *",
                     f"                    {C}--song-all                                  {C}Exporta todas las canciones del álbum *",
@@ -278,9 +299,23 @@ class TerminalUI(ctk.CTk):
                     f"  rm                {C}--song  <numero>                            {C}Elimina canción(es) del álbum actual *",
                     f"                    {C}--song-all                                  {C}Elimina todas las canciones del álbum *",
                     f"                    {C}--album                                      {C}Elimina el álbum actual *",
+                    SEP,
+                    f"  jobs              {C}(ninguno)                                   {C}Lista la cola de descargas",
+                    f"                    {C}--cancel <id>                               {C}Cancela una descarga en cola o en curso",
+                    f"                    {C}--pause  <id>                               {C}Pausa una descarga",
+                    f"                    {C}--resume <id>                               {C}Reanuda una descarga pausada",
+                    f"  batch             {C}<url|playlist|canal> [...]                  {C}Encola varias URLs, una playlist o canal",
+                    f"                    {C}--file <lista.txt>                          {C}Encola las URLs de un archivo de texto",
+                    f"                    {C}--codec <perfil|native>                     {C}Perfil de salida o audio original",
+                    f"                    {C}--album <nombre>                            {C}Álbum destino del lote (def. Sin album)",
+                    SEP,
+                    f"  search            {C}<texto>                                     {C}Busca por título, artista, álbum o ID",
+                    f"                    {C}--go <n>                                    {C}Abre el álbum del resultado n",
                     HEADER_SEP,
                     "",
                     "  ⓘ  Cualquier otro texto se interpretará como URL de YouTube para descargar su audio.",
+                    "  ⓘ  Añada '--codec native' tras la URL para conservar el audio original (m4a/opus) sin recodificar.",
+                    "  ⓘ  Perfiles: mp3 (192k), mp3-128, mp3-320, mp3-v0, mp3-v2, opus, m4a.",
                     "  *  Requiere estar navegado en el álbum correspondiente (con 'nav --album <nombre>').",
                     "",
                 ]
@@ -336,15 +371,9 @@ class TerminalUI(ctk.CTk):
                         else:
                             # Reconstruir el nombre del álbum que podría tener espacios
                             user_album = " ".join(args[1:])
-                            user_album_lower = user_album.lower()
                             
-                            # Buscar case-insensitively en la carpeta downloads para resolver el nombre exacto
-                            actual_name = None
-                            if self.vault_service.download_dir.exists():
-                                for p in self.vault_service.download_dir.iterdir():
-                                    if p.is_dir() and not p.name.startswith(".") and p.name.lower() == user_album_lower:
-                                        actual_name = p.name
-                                        break
+                            # Buscar case-insensitively en el catálogo del Vault para resolver el nombre exacto
+                            actual_name = self.vault_service.catalog.find_album(user_album)
                                         
                             if actual_name is not None:
                                 album_path = self.vault_service.download_dir / actual_name
@@ -538,7 +567,8 @@ class TerminalUI(ctk.CTk):
                                     except Exception:
                                         pass
                                         
-                                    self.vault_history.refresh_all()
+                                    # Solo cambia el color de las canciones exportadas de este álbum
+                                    self.vault_history.update_vault({current_path.name})
                                     self._focus_input()
                                     
             elif cmd_name == "create":
@@ -574,14 +604,13 @@ class TerminalUI(ctk.CTk):
                         else:
                             try:
                                 new_path.mkdir(parents=True, exist_ok=True)
+                                self.vault_service.catalog.add_album(album_name)
                                 self.log_area.append_log(
                                     "SUCCESS",
                                     f"Álbum '{album_name}' creado con éxito.",
                                     route=self.current_route
                                 )
-                                # Refrescar la vista del Vault
-                                self.vault_history.refresh_all()
-                                # Navegar automáticamente al nuevo álbum (auto-apertura RF-039)
+                                # Navegar automáticamente al nuevo álbum (auto-apertura RF-039); la navegación lo dibuja
                                 self._navigate_to("album", str(new_path), album_name)
                             except Exception as e:
                                 self.log_area.append_log(
@@ -725,7 +754,7 @@ class TerminalUI(ctk.CTk):
                     # Resolver la canción por su número 1-indexed dentro del álbum actual
                     song_path_str = self._get_song_path_by_number(song_num_str)
                     if not song_path_str:
-                        total = len([f for f in current_path.iterdir() if f.is_file() and f.suffix.lower() in (".mp3", ".wav", ".m4a", ".ogg")])
+                        total = len(self.vault_service.catalog.songs(current_path.name))
                         self.log_area.append_log(
                             "FAILED",
                             f"ERR: El número '{song_num_str}' no existe en '{current_path.name}' ({total} canciones).",
@@ -810,6 +839,41 @@ class TerminalUI(ctk.CTk):
                     self.command_writer.set_prompt("CONFIRMAR (y/n) > ")
                     self._focus_input()
                     
+                elif sub_opt == "--album-codec":
+                    # Modo de códec por defecto del álbum actual (mp3 recodifica, native conserva m4a/opus)
+                    from pathlib import Path
+                    current_path = Path(self.current_route)
+                    downloads_path = self.vault_service.download_dir
+                    codecs = self.download_service.audio_adapter.CODECS
+                    
+                    is_valid_album = (
+                        current_path.exists()
+                        and current_path.is_dir()
+                        and (current_path.parent == downloads_path or current_path == downloads_path / "Sin album")
+                    )
+                    
+                    if not is_valid_album:
+                        self.log_area.append_log(
+                            "FAILED",
+                            "ERR: Debe navegar primero al álbum que desea configurar.",
+                            route=self.current_route
+                        )
+                    elif len(args) < 2 or args[1].lower() not in codecs + ("default",):
+                        self.log_area.append_log(
+                            "FAILED",
+                            f"Uso: edit --album-codec <{'|'.join(codecs)}|default>",
+                            route=self.current_route
+                        )
+                    else:
+                        codec = args[1].lower()
+                        self.vault_service.set_album_codec(current_path.name, None if codec == "default" else codec)
+                        self.log_area.append_log(
+                            "SUCCESS",
+                            f"Códec del álbum '{current_path.name}' establecido a '{codec}'.",
+                            route=self.current_route
+                        )
+                    self._focus_input()
+                    
                 else:
                     self.log_area.append_log(
                         "FAILED",
@@ -852,12 +916,8 @@ class TerminalUI(ctk.CTk):
                         self._focus_input()
                         return
                         
-                    # Escanear y ordenar canciones alfabéticamente
-                    songs = []
-                    for file in current_path.iterdir():
-                        if file.is_file() and file.suffix.lower() in (".mp3", ".wav", ".m4a", ".ogg"):
-                            songs.append(file.name)
-                    songs.sort()
+                    # Canciones en orden alfabético desde el catálogo del Vault
+                    songs = self.vault_service.catalog.songs(current_path.name)
                     
                     songs_to_delete = []
                     is_valid = True
@@ -968,6 +1028,146 @@ class TerminalUI(ctk.CTk):
                         route=self.current_route
                     )
                     self._focus_input()
+            elif cmd_name == "jobs":
+                # Cola de descargas concurrentes: listar / cancelar / pausar / reanudar
+                args = parsed["args"]
+                if not args:
+                    jobs = self.download_service.list_jobs()
+                    if not jobs:
+                        self.log_area.append_log("INFO", "La cola de descargas está vacía.", route=self.current_route)
+                    else:
+                        status = self.download_service.controller.status()
+                        limit = f"{status['limit'] / 1024:.0f} KB/s" if status["limit"] else "sin límite"
+                        lines = [
+                            f"  Descargando {status['active']}/{status['target']} (máx. {status['max']})"
+                            f" · {status['rate'] / 1024:.0f} KB/s · límite: {limit}",
+                            "  ID    LOTE  ESTADO        ÁLBUM                 URL",
+                        ]
+                        for job in jobs:
+                            state = f"{job.state} (pausado)" if job.paused and not job.is_final else job.state
+                            batch = f"#{job.batch_id}" if job.batch_id else "-"
+                            lines.append(f"  #{job.id:<4} {batch:<5} {state:<13} {job.album_dir.name[:20]:<21} {job.url}")
+                        self.log_area.append_log("INFO", "\n".join(lines), route=self.current_route)
+                    self._focus_input()
+                else:
+                    opt = args[0].lower()
+                    actions = {
+                        "--cancel": (self.download_service.cancel, "cancelado"),
+                        "--pause": (self.download_service.pause, "pausado"),
+                        "--resume": (self.download_service.resume, "reanudado"),
+                    }
+                    if opt not in actions or len(args) < 2:
+                        self.log_area.append_log(
+                            "FAILED",
+                            "Uso: jobs | jobs --cancel <id> | jobs --pause <id> | jobs --resume <id>",
+                            route=self.current_route
+                        )
+                    else:
+                        action, verb = actions[opt]
+                        try:
+                            job_id = int(args[1].lstrip("#"))
+                        except ValueError:
+                            job_id = None
+                        if job_id is not None and action(job_id):
+                            self.log_area.append_log("SUCCESS", f"Trabajo #{job_id} {verb}.", route=self.current_route)
+                        else:
+                            self.log_area.append_log(
+                                "FAILED",
+                                f"ERR: El trabajo '{args[1]}' no existe o ya finalizó.",
+                                route=self.current_route
+                            )
+                    self._focus_input()
+            elif cmd_name == "batch":
+                # Ingesta en lote: playlists/canales (extracción plana), bloques de URLs o archivo .txt
+                args = parsed["args"]
+                sources = []
+                album_name = "Sin album"
+                codec = None
+                i = 0
+                while i < len(args):
+                    opt = args[i].lower()
+                    if opt == "--codec" and i + 1 < len(args):
+                        codec = args[i + 1].lower()
+                        i += 2
+                        continue
+                    if opt == "--album":
+                        album_name = " ".join(args[i + 1:]) or album_name
+                        break
+                    if opt == "--file":
+                        rest = args[i + 1:]
+                        end = next((k for k, a in enumerate(rest) if a.lower() == "--album"), len(rest))
+                        if rest[:end]:
+                            sources.append(" ".join(rest[:end]))
+                        i += 1 + end
+                        continue
+                    sources.append(args[i])
+                    i += 1
+                    
+                if not sources or (codec and codec not in self.download_service.audio_adapter.CODECS):
+                    self.log_area.append_log(
+                        "FAILED",
+                        "Uso: batch <url|playlist|canal> [...] [--file <lista.txt>] [--codec <perfil|native>] [--album <nombre>]",
+                        route=self.current_route
+                    )
+                    self._focus_input()
+                    return
+                    
+                # Resolver el álbum case-insensitively (se crea si no existe)
+                album_name = self.vault_service.catalog.find_album(album_name) or album_name
+                        
+                codec = codec or self.vault_service.get_album_codec(album_name)
+                batch = self.download_service.submit_batch(
+                    sources,
+                    album_dir=self.vault_service.download_dir / album_name,
+                    metadata={"codec": codec} if codec else None,
+                    progress_callback=self._on_job_progress,
+                    on_state_changed=self._queue_job_state,
+                    on_resolved=lambda b: self.after(0, lambda: self._on_batch_resolved(b)),
+                    on_finished=lambda b: self.after(0, lambda: self._on_batch_finished(b)),
+                )
+                self.log_area.append_log(
+                    "INFO",
+                    f"Lote #{batch.id}: resolviendo {len(sources)} fuente(s) para el álbum '{album_name}'...",
+                    route=self.current_route
+                )
+                self._focus_input()
+            elif cmd_name == "search":
+                # Búsqueda en todo el Vault con el índice invertido (prefijos y coincidencias aproximadas)
+                args = parsed["args"]
+                if args and args[0].lower() == "--go":
+                    try:
+                        n = int(args[1]) if len(args) > 1 else 0
+                    except ValueError:
+                        n = 0
+                    if not 1 <= n <= len(self._search_results):
+                        self.log_area.append_log(
+                            "FAILED",
+                            f"ERR: Resultado '{' '.join(args[1:])}' no válido ({len(self._search_results)} resultados en la última búsqueda).",
+                            route=self.current_route
+                        )
+                        self._focus_input()
+                    else:
+                        self._open_search_result(self._search_results[n - 1])
+                elif not args:
+                    self.log_area.append_log("FAILED", "Uso: search <texto> | search --go <n>", route=self.current_route)
+                    self._focus_input()
+                else:
+                    query = " ".join(args)
+                    results = [r for r in self.vault_service.search(query, limit=10) if r["number"] is not None]
+                    self._search_results = results
+                    if not results:
+                        self.log_area.append_log("FAILED", f"Sin resultados para '{query}'.", route=self.current_route)
+                        self._focus_input()
+                    else:
+                        lines = [f"  {len(results)} resultado(s) para '{query}':"]
+                        for i, r in enumerate(results, 1):
+                            label = r["title"] or r["name"]
+                            artist = f" — {r['artist']}" if r["artist"] else ""
+                            lines.append(f"  {i:>2}. [{r['album']} #{r['number']}] {label}{artist}")
+                        lines.append("  Usa 'search --go <n>' para abrir otro resultado.")
+                        self.log_area.append_log("INFO", "\n".join(lines), route=self.current_route)
+                        # Saltar directamente al álbum del mejor resultado
+                        self._open_search_result(results[0])
             else:
                 # Si el comando está registrado en el backend pero no tiene flujo de UI aún (ej. stubs)
                 if cmd_name != "unknown":
@@ -999,13 +1199,28 @@ class TerminalUI(ctk.CTk):
             if parsed["status"] == "invalid":
                 self.log_area.append_log("FAILED", f"La URL ingresada no es válida: {parsed['url']}")
                 self._focus_input()
+            elif parsed["options"].get("codec", "mp3") not in self.download_service.audio_adapter.CODECS:
+                self.log_area.append_log(
+                    "FAILED",
+                    f"Códec '{parsed['options']['codec']}' no válido. Opciones: "
+                    + " | ".join(f"--codec {c}" for c in self.download_service.audio_adapter.CODECS)
+                )
+                self._focus_input()
             else:
                 # URL Válida: entramos al flujo interactivo de metadatos (RF-033)
                 self._pending_url = parsed["url"]
-                self._collected_metadata = {}
+                # Opciones por descarga (p. ej. códec) viajan junto a los metadatos
+                self._collected_metadata = dict(parsed["options"])
                 self._interactive_state = "ASK_ALBUM"
                 
                 self.log_area.append_log("SUCCESS", f"URL de YouTube aceptada (RF-030).")
+                # Resolver los metadatos del video mientras el usuario responde las preguntas
+                self.download_service.prefetch_info(
+                    parsed["url"],
+                    on_info=lambda info: self.after(
+                        0, lambda: self._print(f"  Título de YouTube: {info.get('title', '?')}", "muted")
+                    ),
+                )
                 self.log_area.append_log("INFO", "PROPORCIONE LOS METADATOS DE LA CANCIÓN:")
                 self.log_area.append_log("INFO", "  INGRESE ÁLBUM (Presione Enter para 'Sin album'):")
                 self.command_writer.set_prompt("ALBUM > ")
@@ -1020,6 +1235,8 @@ class TerminalUI(ctk.CTk):
                 op = self._pending_delete_op
                 op_type = op["type"]
                 params = op["params"]
+                # Álbumes a redibujar en el Vault
+                touched = set()
                 
                 try:
                     if op_type == "song":
@@ -1027,6 +1244,8 @@ class TerminalUI(ctk.CTk):
                         song_path = Path(params["song_path"])
                         if song_path.exists():
                             song_path.unlink()
+                            self.vault_service.catalog.remove_song(song_path)
+                            touched.add(song_path.parent.name)
                             self._cleanup_exported_songs([params["song_path"]])
                             self.log_area.append_log(
                                 "SUCCESS",
@@ -1049,6 +1268,8 @@ class TerminalUI(ctk.CTk):
                             song_path = Path(sp)
                             if song_path.exists():
                                 song_path.unlink()
+                                self.vault_service.catalog.remove_song(song_path)
+                                touched.add(song_path.parent.name)
                                 deleted_ok.append(sp)
                                 deleted_count += 1
                                 self.log_area.append_log(
@@ -1072,6 +1293,8 @@ class TerminalUI(ctk.CTk):
                         album_name = params["album_name"]
                         if album_path.exists():
                             shutil.rmtree(album_path)
+                            self.vault_service.catalog.remove_album(album_name)
+                            touched.add(album_name)
                             self._cleanup_exported_songs([params["album_path"]])
                             self.vault_history.vault_tab.expanded_states.pop(album_name, None)
                             
@@ -1091,7 +1314,7 @@ class TerminalUI(ctk.CTk):
                                 route=self.current_route
                             )
                             
-                    self.vault_history.refresh_all()
+                    self.vault_history.update_vault(touched)
                     
                 except Exception as e:
                     self.log_area.append_log(
@@ -1118,6 +1341,8 @@ class TerminalUI(ctk.CTk):
                 op = self._pending_edit_op
                 op_type = op["type"]
                 params = op["params"]
+                # Álbumes a redibujar en el Vault
+                touched = set()
                 
                 try:
                     if op_type == "album_rename":
@@ -1128,6 +1353,9 @@ class TerminalUI(ctk.CTk):
                         new_name = params["new_name"]
                         
                         old_path.rename(new_path)
+                        self.vault_service.catalog.rename_album(old_name, new_name)
+                        touched.update((old_name, new_name))
+                        self.vault_service.rename_album_settings(old_name, new_name)
                         
                         self.vault_history.vault_tab.expanded_states.pop(old_name, None)
                         self.vault_history.vault_tab.expanded_states[new_name] = True
@@ -1149,13 +1377,9 @@ class TerminalUI(ctk.CTk):
                         
                         song_path.rename(new_song_path)
                         
-                        try:
-                            from mutagen.easyid3 import EasyID3
-                            audio = EasyID3(new_song_path)
-                            audio['title'] = new_title
-                            audio.save()
-                        except Exception:
-                            pass
+                        self.vault_service.write_tags(new_song_path, title=new_title)
+                        self.vault_service.catalog.move_song(song_path, new_song_path)
+                        touched.add(new_song_path.parent.name)
                             
                         self.log_area.append_log(
                             "SUCCESS",
@@ -1173,13 +1397,9 @@ class TerminalUI(ctk.CTk):
                         new_song_path.parent.mkdir(parents=True, exist_ok=True)
                         shutil.move(str(song_path), str(new_song_path))
                         
-                        try:
-                            from mutagen.easyid3 import EasyID3
-                            audio = EasyID3(new_song_path)
-                            audio['album'] = new_album
-                            audio.save()
-                        except Exception:
-                            pass
+                        self.vault_service.write_tags(new_song_path, album=new_album)
+                        self.vault_service.catalog.move_song(song_path, new_song_path)
+                        touched.update((song_path.parent.name, new_song_path.parent.name))
                             
                         self.vault_history.vault_tab.expanded_states[new_album] = True
                         
@@ -1194,13 +1414,8 @@ class TerminalUI(ctk.CTk):
                         song_path = Path(params["song_path"])
                         new_artist = params["new_artist"]
                         
-                        try:
-                            from mutagen.easyid3 import EasyID3
-                            audio = EasyID3(song_path)
-                            audio['artist'] = new_artist
-                            audio.save()
-                        except Exception:
-                            pass
+                        self.vault_service.write_tags(song_path, artist=new_artist)
+                        self.vault_service.catalog.update_song(song_path)
                             
                         self.log_area.append_log(
                             "SUCCESS",
@@ -1208,7 +1423,7 @@ class TerminalUI(ctk.CTk):
                             route=self.current_route
                         )
                         
-                    self.vault_history.refresh_all()
+                    self.vault_history.update_vault(touched)
                     
                 except Exception as e:
                     self.log_area.append_log(
@@ -1272,14 +1487,11 @@ class TerminalUI(ctk.CTk):
                 f" ║  Álbum:     {album:<34}  ║",
                 f" ║  Canción:   {song if song else '(Título de YouTube)':<34}  ║",
                 f" ║  Artista:   {artist:<34}  ║",
+                f" ║  Formato:   {self._collected_metadata.get('codec') or self.vault_service.get_album_codec(album) or 'por defecto':<34}  ║",
                 " ╚" + "═" * 48 + "╝"
             ]
             self.log_area.append_log("SUCCESS", "\n".join(confirm_lines))
             
-            # Iniciar descarga asíncrona asumiendo estado ocupado
-            self._lock_input()
-            self.log_area.append_log("INFO", f"Iniciando descarga: {self._pending_url}")
-            
             url = self._pending_url
             metadata = self._collected_metadata.copy()
             metadata["description"] = ""  # Dejamos vacío el campo description por compatibilidad
@@ -1287,103 +1499,138 @@ class TerminalUI(ctk.CTk):
             self._pending_url = None
             self._collected_metadata = {}
             
-            import threading
-            threading.Thread(target=self._download_task, args=(url, metadata), daemon=True).start()
+            # Encolar la descarga: el input queda libre para seguir añadiendo URLs
+            self._enqueue_download(url, metadata)
 
-    def _download_task(self, url: str, metadata: dict):
-        last_was_progress = False
+    def _enqueue_download(self, url: str, metadata: dict):
+        album_dir = self.vault_service.download_dir / metadata["album"]
+        # Códec: el de la descarga, si no el configurado para el álbum (si no, el global por defecto)
+        codec = metadata.get("codec") or self.vault_service.get_album_codec(metadata["album"])
+        if codec:
+            metadata["codec"] = codec
+        try:
+            job = self.download_service.submit(
+                url,
+                album_dir=album_dir,
+                metadata=metadata,
+                progress_callback=self._on_job_progress,
+                on_state_changed=self._queue_job_state,
+            )
+        except Exception as e:
+            self._print(f"  error  {e}", "red")
+            self._focus_input()
+            return
 
-        def on_progress(msg: str, tag: str = "gray"):
-            nonlocal last_was_progress
-            if tag == "progress":
-                if last_was_progress:
-                    self.after(0, lambda m=msg, t=tag: self._overwrite_last(m, t))
-                else:
-                    self.after(0, lambda m=msg, t=tag: self._print(m, t))
-                last_was_progress = True
-            else:
-                last_was_progress = False
-                self.after(0, lambda m=msg, t=tag: self._print(m, t))
+        pending = self.download_service.pending_count()
+        self.log_area.append_log(
+            "INFO",
+            f"Descarga #{job.id} en cola ({pending} pendiente(s)): {url}",
+            route=self.current_route
+        )
+        self._focus_input()
 
-        try:
-            album_name = metadata["album"]
-            album_dir = self.vault_service.download_dir / album_name
+    def _restore_pending_jobs(self):
+        jobs = self.download_service.restore_pending(
+            progress_callback=self._on_job_progress,
+            on_state_changed=self._queue_job_state,
+        )
+        if jobs:
+            self.log_area.append_log(
+                "INFO",
+                f"{len(jobs)} descarga(s) pendiente(s) de la sesión anterior reanudada(s).",
+                route=self.current_route
+            )
 
-            on_progress("  connecting...", "muted")
-            self.after(0, lambda: self._print("", "progress"))
-            path = self.download_service.process_download(url, album_dir=album_dir, progress_callback=on_progress)
-            self.after(0, lambda: self._print("", "muted"))
+    def _on_batch_resolved(self, batch):
+        """Informa cuántos videos del lote entraron en la cola y qué fuentes fallaron al resolverse."""
+        self.log_area.append_log(
+            "INFO" if batch.jobs else "WARN",
+            f"Lote #{batch.id}: {len(batch.jobs)} video(s) encolados en '{batch.album_dir.name}'.",
+            route=self.current_route
+        )
+        for err in batch.errors:
+            self.log_area.append_log("FAILED", f"Lote #{batch.id}: {err}", route=self.current_route)
 
-            # Renombrar y aplicar metadatos nativos usando Mutagen (RF-033)
-            import re
-            song_name = metadata["song"]
-            clean_song_name = ""
-            if song_name:
-                clean_song_name = re.sub(r'[\\/*?:"<>|]', "", song_name).strip()
-                new_path = path.with_name(f"{clean_song_name}.mp3")
-                if path != new_path:
-                    if new_path.exists():
-                        new_path.unlink()
-                    path.rename(new_path)
-                    path = new_path
+    def _on_batch_finished(self, batch):
+        """Resumen final del lote (RF-023)."""
+        summary = batch.summary()
+        lines = [
+            f"Lote #{summary['id']} finalizado:",
+            f"  Completadas: {summary['done']}  ·  Fallidas: {summary['failed']}  ·  Canceladas: {summary['cancelled']}  ·  Total: {summary['total']}",
+        ]
+        level = "SUCCESS" if summary["failed"] == 0 and summary["total"] > 0 else "WARN"
+        self.log_area.append_log(level, "\n".join(lines), route=self.current_route)
+        self.vault_history.refresh_history()
 
-            # Escribir etiquetas ID3 nativas usando Mutagen (tolerante a fallos si no está instalado)
-            try:
-                from mutagen.easyid3 import EasyID3
-                from mutagen.id3 import ID3, COMM
-                
-                try:
-                    audio = EasyID3(path)
-                except Exception:
-                    from mutagen.mp3 import MP3
-                    mp3_file = MP3(path)
-                    if mp3_file.tags is None:
-                        mp3_file.add_tags()
-                        mp3_file.save()
-                    audio = EasyID3(path)
-                    
-                audio['title'] = clean_song_name if clean_song_name else path.stem
-                audio['artist'] = metadata["artist"]
-                audio['album'] = album_name
-                audio.save()
-                
-                # Escribir metadatos del álbum (comentarios)
-                if metadata["description"]:
-                    try:
-                        id3_tags = ID3(path)
-                        id3_tags["COMM"] = COMM(
-                            encoding=3,  # UTF-8
-                            lang="eng",
-                            desc="Album Metadata",
-                            text=[metadata["description"]]
-                        )
-                        id3_tags.save()
-                    except Exception:
-                        pass
-            except ImportError:
-                # Si mutagen no está en el interprete activo, degradar graciosamente sin fallar
-                pass
+    def _on_job_progress(self, job, msg: str, tag: str = "gray"):
+        """Callback de mensajes de fase (hilo worker): reenvía el texto al hilo de la UI con el ID del trabajo."""
+        text = f"  #{job.id}{msg}" if msg.startswith("  ") else f"#{job.id} {msg}"
+        self.after(0, lambda: self._show_job_progress(text, tag))
+
+    def _show_job_progress(self, text: str, tag: str):
+        # Volcar antes el progreso pendiente para no mostrarlo después del mensaje de fase
+        self._drain_progress()
+        self._print(text, tag)
+
+    def _progress_loop(self):
+        self._drain_progress()
+        self.after(PROGRESS_FRAME_MS, self._progress_loop)
+
+    def _drain_progress(self):
+        """Toma el último progreso de cada trabajo y redibuja un único bloque de barras (RF-018)."""
+        events = self.download_service.progress_bus.drain()
+        if not events:
+            return
+        for event in events:
+            self._progress_rows[event.job_id] = event
+        text = "\n".join(f"#{job_id}{event.render()}" for job_id, event in sorted(self._progress_rows.items()))
+        # Solo se sobrescribe si el bloque sigue siendo el último mensaje del log
+        if self._progress_block_id == self.log_area.message_count:
+            self._overwrite_last(text, "progress")
+        else:
+            self._print(text, "progress")
+            self._progress_block_id = self.log_area.message_count
+
+    def _queue_job_state(self, job):
+        """Pasa cada transición al hilo de la UI con el estado capturado en el momento del cambio.
+
+        Un trabajo rápido puede recorrer todos sus estados antes de que Tk procese
+        la cola; leer `job.state` al ejecutar el callback repetiría el estado final.
+        """
+        state = job.state
+        self.after(0, lambda: self._on_job_state_changed(job, state))
 
-            self.after(0, lambda: self._print(f"  done   {path.name}", "green"))
-            self.after(0, lambda: self._print(f"  saved  {path.parent}", "gray"))
+    def _on_job_state_changed(self, job, state):
+        """Reacciona en el hilo de la UI a los estados finales de un trabajo de la cola."""
+        from src.backend.api.services.download_job import JobState
+
+        if state != JobState.DOWNLOADING:
+            # Fuera de la etapa de red el trabajo deja de tener barra de progreso
+            self._progress_rows.pop(job.id, None)
+
+        if state == JobState.DONE:
+            self._print(f"  done   #{job.id} {job.path.name}", "green")
+            self._print(f"  saved  {job.path.parent}", "gray")
 
             # Registrar éxito en historial y refrescar interfaz (RF-023, RF-027, RF-035)
-            self.history_service.add_record(path.name, "SUCCESS")
-            self.after(0, self.vault_history.refresh_all)
+            self.vault_service.catalog.add_song(job.path)
+            self.history_service.add_record(job.path.name, "SUCCESS")
+            self.vault_history.update_vault({job.path.parent.name})
+            self.vault_history.refresh_history()
 
-        except Exception as e:
-            err_msg = str(e)
-            self.after(0, lambda msg=err_msg: self._print(f"  error  {msg}", "red"))
+        elif state == JobState.FAILED:
+            err_msg = job.error or ""
+            self._print(f"  error  #{job.id} {err_msg}", "red")
 
             # Registrar fallo en historial y refrescar interfaz (RF-023, RF-027, RF-035)
             clean_err = err_msg.split(":")[0].strip().upper()
             if not clean_err or len(clean_err) > 30 or "ERR" in clean_err:
                 clean_err = "DOWNLOAD_ERROR"
             self.history_service.add_record(clean_err, "FAILED")
-            self.after(0, self.vault_history.refresh_all)
+            self.vault_history.refresh_history()
 
-        finally:
-            self.after(0, self._unlock_input)
+        elif state == JobState.CANCELLED:
+            self._print(f"  Descarga #{job.id} cancelada.", "amber")
 
     def _on_route_changed(self, new_route: str):
         """Callback gatillado al interactuar con el Vault (RF-026, RF-037)."""
@@ -1434,14 +1681,11 @@ class TerminalUI(ctk.CTk):
             self._current_playing_song = None
             return
             
-        # Intentar obtener la duración exacta del MP3 usando Mutagen para programar el log de finalización
+        # Duración exacta desde la caché de metadatos para programar el log de finalización
         duration = 180  # Valor por defecto de 3 minutos
-        try:
-            from mutagen.mp3 import MP3
-            audio = MP3(new_route)
-            duration = int(audio.info.length)
-        except Exception:
-            pass
+        meta = self.vault_service.get_metadata(p)
+        if meta is not None and meta.duration:
+            duration = int(meta.duration)
             
         # Programar log de finalización cuando termine la canción de forma natural
         def on_playback_finished():
@@ -1456,6 +1700,19 @@ class TerminalUI(ctk.CTk):
                 
         self._playback_timer = self.after(duration * 1000, on_playback_finished)
 
+    def _open_search_result(self, result: dict):
+        """Navega al álbum de un resultado de búsqueda e indica su número de canción."""
+        album_path = self.vault_service.download_dir / result["album"]
+        if result["album"] == "Sin album":
+            self._navigate_to("sin_album", str(album_path))
+        else:
+            self._navigate_to("album", str(album_path), result["album"])
+        self.log_area.append_log(
+            "SUCCESS",
+            f"Canción #{result['number']} del álbum '{result['album']}': {result['name']}",
+            route=self.current_route
+        )
+
     def _navigate_to(self, target_type: str, path: str, name: str = ""):
         """Helper para navegar a una ruta física, actualizar contexto y abrir visualmente el contenido (RF-036 al RF-039)."""
         self.current_route = path
@@ -1472,7 +1729,7 @@ class TerminalUI(ctk.CTk):
             self.vault_history.vault_tab.refresh()
         elif target_type == "album":
             self.vault_history.vault_tab.expanded_states[name] = True
-            self.vault_history.vault_tab.refresh()
+            self.vault_history.update_vault({name})
             
         # RF-038: La ruta actual debe mostrarse en los logs (usamos la nueva ruta como ruta activa)
         self.log_area.append_log("INFO", f"Navegando a: {path}", route=self.current_route)
@@ -117,6 +117,18 @@ class VaultHistoryWidget(tk.Frame):
             self.history_tab.refresh()
             
     def refresh_all(self):
-        """Refresca ambas pestañas al completarse o fallar una descarga (RF-023)."""
+        """Refresca ambas pestañas por completo (RF-023)."""
         self.vault_tab.refresh()
         self.history_tab.refresh()
+
+    def update_vault(self, album_names):
+        """Redibuja solo los álbumes que cambiaron (None = todo el árbol)."""
+        self.vault_tab.update_albums(album_names)
+
+    def repaint_vault(self, album_names):
+        """Repinta las filas visibles de esos álbumes sin re-consultar el catálogo."""
+        self.vault_tab.repaint_albums(album_names)
+
+    def refresh_history(self):
+        """Refresca el historial al completarse o fallar una descarga (RF-023)."""
+        self.history_tab.refresh()
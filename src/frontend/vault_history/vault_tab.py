@@ -1,262 +1,267 @@
 import tkinter as tk
+from bisect import bisect_left, bisect_right
 from pathlib import Path
+from src.frontend.vault_history.virtual_list import VirtualList
 
-class ScrollableFrame(tk.Frame):
-    """Contenedor scrollable premium y responsivo utilizando Canvas en Tkinter."""
-    def __init__(self, parent, bg_color):
-        super().__init__(parent, bg=bg_color)
-        
-        self.canvas = tk.Canvas(self, bg=bg_color, bd=0, highlightthickness=0)
-        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas, bg=bg_color)
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(
-                scrollregion=self.canvas.bbox("all")
-            )
-        )
-        
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.bind("<Configure>", self._on_canvas_configure)
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        
-        self.canvas.pack(side="left", fill="both", expand=True)
-        self.scrollbar.pack(side="right", fill="y")
-        
-        # Enlace inteligente del mouse wheel para evitar conflictos de scroll
-        self.canvas.bind("<Enter>", lambda e: self.canvas.bind_all("<MouseWheel>", self._on_mousewheel))
-        self.canvas.bind("<Leave>", lambda e: self.canvas.unbind_all("<MouseWheel>"))
-
-    def _on_canvas_configure(self, event):
-        self.canvas.itemconfig(self.canvas_window, width=event.width)
-
-    def _on_mousewheel(self, event):
-        if self.winfo_exists():
-            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+# Alto fijo de cada fila del árbol (la lista es virtualizada)
+ROW_HEIGHT = 24
 
 
 class VaultTab(tk.Frame):
-    """Componente visual de árbol de directorios y álbumes simplificado (RF-020 al RF-026)."""
-    
+    """Componente visual de árbol de directorios y álbumes simplificado (RF-020 al RF-026).
+
+    El árbol se modela como bloques (cabecera VAULT_STORAGE, un bloque por
+    álbum y el bloque SIN ALBUM) y solo se dibujan las filas visibles con un
+    grupo fijo de etiquetas recicladas (ver `VirtualList`).
+    """
+
     def __init__(self, parent, vault_service, on_route_changed, bg_color="#0D0D0D"):
         super().__init__(parent, bg=bg_color)
         self.vault_service = vault_service
         self.on_route_changed = on_route_changed
         self.bg_color = bg_color
-        
+
         # Estados de expansión por defecto
         self.expanded_states = {
             "vault_storage": True,
             "sin_album": True
         }
-        
-        # Crear contenedor scrollable
-        self.scroll_container = ScrollableFrame(self, bg_color=bg_color)
-        self.scroll_container.pack(fill="both", expand=True, padx=10, pady=10)
-        
+
+        # Bloques del árbol: (tipo, registro de álbum, número de filas), fila inicial de cada uno
+        # y posición del bloque de cada álbum por nombre
+        self._blocks = []
+        self._starts = []
+        self._block_index = {}
+        # Por etiqueta del grupo: (color normal, color al pasar el mouse, acción al hacer clic)
+        self._row_items = {}
+        # Canciones exportadas (se recargan solo si cambia exported_songs.json)
+        self._exported_set = set()
+        self._exported_mtime = None
+
+        # Crear lista virtualizada
+        self.tree_list = VirtualList(self, bg_color, ROW_HEIGHT, self._create_row, self._render_row)
+        self.tree_list.pack(fill="both", expand=True, padx=10, pady=10)
+
         self.refresh()
 
-    def refresh(self):
-        """Escanea el Vault y renderiza dinámicamente el árbol visual (RF-023)."""
-        # Limpiar elementos previos
-        for widget in self.scroll_container.scrollable_frame.winfo_children():
-            widget.destroy()
-            
-        # Cargar canciones exportadas para mostrarlas en gris
+    def _load_exported(self) -> set:
+        """Canciones exportadas para mostrarlas en gris (RF-044)."""
         import json
-        exported_set = set()
         exported_json_path = self.vault_service.download_dir.parent / "exported_songs.json"
-        if exported_json_path.exists():
+        try:
+            mtime = exported_json_path.stat().st_mtime_ns
+        except OSError:
+            self._exported_set, self._exported_mtime = set(), None
+            return self._exported_set
+        if mtime != self._exported_mtime:
             try:
                 with open(exported_json_path, "r", encoding="utf-8") as f:
-                    exported_list = json.load(f)
-                    exported_set = set(exported_list)
+                    self._exported_set = set(json.load(f))
+                self._exported_mtime = mtime
             except Exception:
                 pass
+        return self._exported_set
+
+    def refresh(self):
+        """Recalcula los bloques del árbol desde el catálogo y redibuja las filas visibles (RF-023)."""
+        self._load_exported()
 
-        # Obtener estructura del backend
-        data = self.vault_service.get_vault_structure()
-        
-        # Clasificar álbumes
-        sin_album_item = None
-        other_albums = []
-        for album in data["albums"]:
-            if album["name"] == "Sin album":
-                sin_album_item = album
-            else:
-                other_albums.append(album)
-                
         # Asegurar estados iniciales
         if "vault_storage" not in self.expanded_states:
             self.expanded_states["vault_storage"] = True
         if "raiz" not in self.expanded_states:
             self.expanded_states["raiz"] = True
 
+        sin_album = None
+        blocks = [("storage", None, 1)]
+        for record in self.vault_service.catalog.albums():
+            if record.name == "Sin album":
+                sin_album = record
+                continue
+            if not self.expanded_states["vault_storage"]:
+                continue
+            if record.name not in self.expanded_states:
+                self.expanded_states[record.name] = False
+            blocks.append(("album", record, self._block_rows("album", record)))
+        blocks.append(("sin_album", sin_album, self._block_rows("sin_album", sin_album)))
+        self._blocks = blocks
+        self._reindex()
+
+    def _block_rows(self, kind: str, record) -> int:
+        """Filas de un bloque: cabecera + canciones (o la fila "vacío") si está expandido."""
+        songs = len(record.songs) if record else 0
+        if kind == "sin_album":
+            return 1 + (max(1, songs) if self.expanded_states["sin_album"] else 0)
+        return 1 + (max(1, songs) if self.expanded_states.get(record.name) else 0)
+
+    def _reindex(self) -> None:
+        """Recalcula la fila inicial de cada bloque (sin consultar el catálogo) y redibuja."""
+        starts = []
+        index = {}
+        total = 0
+        for i, (kind, record, rows) in enumerate(self._blocks):
+            starts.append(total)
+            total += rows
+            if kind == "album":
+                index[record.name] = i
+            elif kind == "sin_album":
+                index["Sin album"] = i
+        self._starts, self._block_index = starts, index
+        self.tree_list.set_count(total)
+
+    def _block_visible(self, i: int) -> bool:
+        visible = self.tree_list.visible_range()
+        start = self._starts[i]
+        return start < visible.stop and start + self._blocks[i][2] > visible.start
+
+    def update_albums(self, album_names):
+        """Aplica cambios de álbumes concretos (None = todo el árbol).
+
+        Solo se revalidan en el catálogo los álbumes indicados y se ajustan sus
+        bloques; si ninguno cambió de tamaño solo se redibuja la ventana visible,
+        y solo si alguno de ellos está en pantalla.
+        """
+        if not self.winfo_exists():
+            return
+        if album_names is None:
+            self.refresh()
+            return
+        self._load_exported()
+        resized = False
+        visible = False
+        for name in album_names:
+            record = self.vault_service.catalog.get_album(name)
+            i = self._block_index.get(name)
+            if i is None:
+                # Álbum nuevo: se inserta en orden (solo se muestra con VAULT_STORAGE expandido)
+                if record is None or not self.expanded_states["vault_storage"]:
+                    continue
+                self.expanded_states.setdefault(name, False)
+                keys = [r.name.lower() for kind, r, _ in self._blocks if kind == "album"]
+                self._blocks.insert(1 + bisect_left(keys, name.lower()), ("album", record, self._block_rows("album", record)))
+                self._reindex()
+                resized = False
+                continue
+            kind, _, rows = self._blocks[i]
+            if record is None and kind == "album":
+                # Álbum borrado o renombrado (el nombre nuevo llega en el mismo lote)
+                del self._blocks[i]
+                self._reindex()
+                resized = False
+                continue
+            new_rows = self._block_rows(kind, record)
+            visible = visible or self._block_visible(i)
+            self._blocks[i] = (kind, record, new_rows)
+            resized = resized or new_rows != rows
+        if resized:
+            self._reindex()
+        elif visible:
+            self.tree_list.redraw()
+
+    def repaint_albums(self, album_names):
+        """Redibuja la ventana visible si alguno de los álbumes está en pantalla.
+
+        Para cambios que no alteran el árbol (p. ej. duraciones recién cacheadas):
+        no toca el catálogo ni recalcula bloques.
+        """
+        if not self.winfo_exists():
+            return
+        for name in album_names:
+            i = self._block_index.get(name)
+            if i is not None and self._block_visible(i):
+                self.tree_list.redraw()
+                return
+
+    # ── Filas recicladas ─────────────────────────────────────────────────────
+
+    def _create_row(self, parent) -> tk.Label:
+        lbl = tk.Label(parent, bg=self.bg_color, anchor="w", bd=0, padx=0, pady=0)
+        lbl.bind("<Enter>", lambda e, l=lbl: self._on_row_hover(l, True))
+        lbl.bind("<Leave>", lambda e, l=lbl: self._on_row_hover(l, False))
+        lbl.bind("<Button-1>", lambda e, l=lbl: self._on_row_click(l))
+        return lbl
+
+    def _on_row_hover(self, lbl: tk.Label, inside: bool):
+        normal_fg, hover_fg, _ = self._row_items.get(lbl, (None, None, None))
+        color = hover_fg if inside else normal_fg
+        if color:
+            lbl.configure(fg=color)
+
+    def _on_row_click(self, lbl: tk.Label):
+        action = self._row_items.get(lbl, (None, None, None))[2]
+        if action is not None:
+            action()
+
+    def _set_row(self, lbl, text, fg, font, hover_fg=None, action=None):
+        lbl.configure(text=text, fg=fg, font=font, cursor="hand2" if action else "")
+        self._row_items[lbl] = (fg, hover_fg, action)
+
+    def _render_row(self, lbl: tk.Label, index: int):
+        """Rellena una etiqueta del grupo con la fila `index` del árbol."""
+        block = bisect_right(self._starts, index) - 1
+        kind, record, _ = self._blocks[block]
+        offset = index - self._starts[block]
+
         # ─── NODO 1: VAULT_STORAGE (Contenedor de Álbumes) ───
-        is_storage_expanded = self.expanded_states["vault_storage"]
-        storage_arrow = "▼" if is_storage_expanded else "▶"
-        
-        storage_frame = tk.Frame(self.scroll_container.scrollable_frame, bg=self.bg_color)
-        storage_frame.pack(fill="x", anchor="w", pady=(0, 4))
-        
-        lbl_storage = tk.Label(
-            storage_frame,
-            text=f"{storage_arrow} VAULT_STORAGE",
-            fg="#5A8FA8",
-            bg=self.bg_color,
-            font=("Courier New", 12, "bold"),
-            anchor="w",
-            cursor="hand2"
-        )
-        lbl_storage.pack(fill="x", side="left", expand=True)
-        lbl_storage.bind("<Enter>", lambda e, lbl=lbl_storage: lbl.configure(fg="#00E5A3"))
-        lbl_storage.bind("<Leave>", lambda e, lbl=lbl_storage: lbl.configure(fg="#5A8FA8"))
-        lbl_storage.bind("<Button-1>", lambda e: self._toggle_storage("vault_storage"))
-        
-        # Renderizar álbumes si VAULT_STORAGE está expandido
-        if is_storage_expanded:
-            for album in other_albums:
-                name = album["name"]
-                count = album["count"]
-                path = album["path"]
-                
-                if name not in self.expanded_states:
-                    self.expanded_states[name] = False
-                    
-                is_expanded = self.expanded_states[name]
-                arrow = "▼" if is_expanded else "▶"
-                album_text = f"  {arrow} {name.upper()} / {count} canciones"
-                
-                album_frame = tk.Frame(self.scroll_container.scrollable_frame, bg=self.bg_color)
-                album_frame.pack(fill="x", anchor="w", pady=1)
-                
-                lbl_album = tk.Label(
-                    album_frame,
-                    text=album_text,
-                    fg="#808080" if not is_expanded else "#00E5A3",
-                    bg=self.bg_color,
-                    font=("Courier New", 11, "bold"),
-                    anchor="w",
-                    cursor="hand2"
-                )
-                lbl_album.pack(fill="x", side="left", expand=True)
-                
-                lbl_album.bind("<Enter>", lambda e, lbl=lbl_album: lbl.configure(fg="#00E5A3"))
-                lbl_album.bind(
-                    "<Leave>", 
-                    lambda e, lbl=lbl_album, n=name: lbl.configure(
-                        fg="#00E5A3" if self.expanded_states[n] else "#808080"
-                    )
-                )
-                lbl_album.bind(
-                    "<Button-1>",
-                    lambda e, n=name, p=path: self._toggle_album(n, p)
-                )
-                
-                # Listar canciones de álbum
-                if is_expanded:
-                    if not album["songs"]:
-                        lbl_empty = tk.Label(
-                            self.scroll_container.scrollable_frame,
-                            text="      (álbum vacío)",
-                            fg="#505050",
-                            bg=self.bg_color,
-                            font=("Courier New", 10, "italic"),
-                            anchor="w"
-                        )
-                        lbl_empty.pack(fill="x", anchor="w", pady=1)
-                    else:
-                        for idx, song in enumerate(album["songs"], 1):
-                            song_frame = tk.Frame(self.scroll_container.scrollable_frame, bg=self.bg_color)
-                            song_frame.pack(fill="x", anchor="w", pady=1)
-                            
-                            song_path = str(Path(path) / song)
-                            
-                            is_exported = str(Path(song_path).resolve()) in exported_set
-                            song_fg = "#666666" if is_exported else "#EDEDED"
-
-                            lbl_song = tk.Label(
-                                song_frame,
-                                text=f"      📄 {idx}. {song}",
-                                fg=song_fg,
-                                bg=self.bg_color,
-                                font=("Courier New", 11),
-                                anchor="w",
-                                cursor="hand2"
-                            )
-                            lbl_song.pack(fill="x", side="left", expand=True)
-                            
-                            lbl_song.bind("<Enter>", lambda e, lbl=lbl_song: lbl.configure(fg="#6BA3CC"))
-                            lbl_song.bind("<Leave>", lambda e, lbl=lbl_song, fg=song_fg: lbl.configure(fg=fg))
-                            lbl_song.bind(
-                                "<Button-1>",
-                                lambda e, sp=song_path: self.on_route_changed(sp)
-                            )
+        if kind == "storage":
+            arrow = "▼" if self.expanded_states["vault_storage"] else "▶"
+            self._set_row(
+                lbl, f"{arrow} VAULT_STORAGE", "#5A8FA8", ("Courier New", 12, "bold"),
+                "#00E5A3", lambda: self._toggle_storage("vault_storage")
+            )
+            return
 
         # ─── NODO 2: SIN ALBUM (Canciones sin álbum en el mismo nivel) ───
-        is_sin_album_expanded = self.expanded_states["sin_album"]
-        sin_album_arrow = "▼" if is_sin_album_expanded else "▶"
-        
-        raiz_songs = sin_album_item["songs"] if sin_album_item else []
-        raiz_path = str(self.vault_service.download_dir)
-        
-        raiz_frame = tk.Frame(self.scroll_container.scrollable_frame, bg=self.bg_color)
-        raiz_frame.pack(fill="x", anchor="w", pady=(8, 4))
-        
-        lbl_raiz = tk.Label(
-            raiz_frame,
-            text=f"{sin_album_arrow} SIN ALBUM",
-            fg="#5A8FA8",
-            bg=self.bg_color,
-            font=("Courier New", 12, "bold"),
-            anchor="w",
-            cursor="hand2"
-        )
-        lbl_raiz.pack(fill="x", side="left", expand=True)
-        lbl_raiz.bind("<Enter>", lambda e, lbl=lbl_raiz: lbl.configure(fg="#00E5A3"))
-        lbl_raiz.bind("<Leave>", lambda e, lbl=lbl_raiz: lbl.configure(fg="#5A8FA8"))
-        lbl_raiz.bind("<Button-1>", lambda e: self._toggle_sin_album("sin_album", raiz_path))
-        
-        # Renderizar canciones de la raíz
-        if is_sin_album_expanded:
-            if not raiz_songs:
-                lbl_empty = tk.Label(
-                    self.scroll_container.scrollable_frame,
-                    text="  (directorio vacío)",
-                    fg="#505050",
-                    bg=self.bg_color,
-                    font=("Courier New", 10, "italic"),
-                    anchor="w"
+        if kind == "sin_album":
+            raiz_path = str(self.vault_service.download_dir)
+            if offset == 0:
+                arrow = "▼" if self.expanded_states["sin_album"] else "▶"
+                self._set_row(
+                    lbl, f"{arrow} SIN ALBUM", "#5A8FA8", ("Courier New", 12, "bold"),
+                    "#00E5A3", lambda: self._toggle_sin_album("sin_album", raiz_path)
                 )
-                lbl_empty.pack(fill="x", anchor="w", pady=1)
-            else:
-                for idx, song in enumerate(raiz_songs, 1):
-                    song_frame = tk.Frame(self.scroll_container.scrollable_frame, bg=self.bg_color)
-                    song_frame.pack(fill="x", anchor="w", pady=1)
-                    
-                    song_path = str(self.vault_service.download_dir / "Sin album" / song)
-                    
-                    is_exported = str(Path(song_path).resolve()) in exported_set
-                    song_fg = "#666666" if is_exported else "#EDEDED"
-
-                    lbl_song = tk.Label(
-                        song_frame,
-                        text=f"  📄 {idx}. {song}",
-                        fg=song_fg,
-                        bg=self.bg_color,
-                        font=("Courier New", 11),
-                        anchor="w",
-                        cursor="hand2"
-                    )
-                    lbl_song.pack(fill="x", side="left", expand=True)
-                    
-                    lbl_song.bind("<Enter>", lambda e, lbl=lbl_song: lbl.configure(fg="#6BA3CC"))
-                    lbl_song.bind("<Leave>", lambda e, lbl=lbl_song, fg=song_fg: lbl.configure(fg=fg))
-                    lbl_song.bind(
-                        "<Button-1>",
-                        lambda e, sp=song_path: self.on_route_changed(sp)
-                    )
+                return
+            songs = record.songs if record else []
+            if not songs:
+                self._set_row(lbl, "  (directorio vacío)", "#505050", ("Courier New", 10, "italic"))
+                return
+            self._render_song(lbl, songs, offset, self.vault_service.download_dir / "Sin album", "  ")
+            return
+
+        # Álbum: cabecera y canciones
+        name = record.name
+        album_path = self.vault_service.download_dir / name
+        is_expanded = self.expanded_states.get(name, False)
+        if offset == 0:
+            arrow = "▼" if is_expanded else "▶"
+            self._set_row(
+                lbl, f"  {arrow} {name.upper()} / {len(record.songs)} canciones",
+                "#00E5A3" if is_expanded else "#808080", ("Courier New", 11, "bold"),
+                "#00E5A3", lambda n=name, p=str(album_path): self._toggle_album(n, p)
+            )
+            return
+        if not record.songs:
+            self._set_row(lbl, "      (álbum vacío)", "#505050", ("Courier New", 10, "italic"))
+            return
+        self._render_song(lbl, record.songs, offset, album_path, "      ")
+
+    def _render_song(self, lbl, songs, number: int, album_path: Path, indent: str):
+        # El catálogo puede cambiar desde el hilo del vigilante entre el recálculo y el dibujo
+        if number > len(songs):
+            self._set_row(lbl, "", self.bg_color, ("Courier New", 11))
+            return
+        record = songs[number - 1]
+        song = record.name
+        song_path = album_path / song
+        is_exported = str(song_path.resolve()) in self._exported_set
+        song_fg = "#666666" if is_exported else "#EDEDED"
+        # Duración desde la caché de metadatos (sin abrir el archivo; se omite si aún no está)
+        meta = self.vault_service.cached_metadata(album_path.name, record)
+        length = f"  [{int(meta.duration) // 60}:{int(meta.duration) % 60:02d}]" if meta and meta.duration else ""
+        self._set_row(
+            lbl, f"{indent}📄 {number}. {song}{length}", song_fg, ("Courier New", 11),
+            "#6BA3CC", lambda sp=str(song_path): self.on_route_changed(sp)
+        )
 
     def _toggle_storage(self, name: str):
         """Alterna el estado de expansión de VAULT_STORAGE."""
@@ -0,0 +1,105 @@
+import tkinter as tk
+
+
+class VirtualList(tk.Frame):
+    """Lista con scroll virtualizado: un grupo fijo de filas que se reciclan contra la ventana visible.
+
+    Solo existen los widgets de las filas que caben en pantalla (más una de
+    margen); al desplazarse o refrescar se reposicionan y se vuelven a rellenar
+    con `render_row(row, index)`. El coste no depende del número de elementos.
+
+    - `row_height`: alto fijo de cada fila en píxeles.
+    - `create_row(parent)`: construye un widget de fila (se llama solo al crecer el grupo).
+    - `render_row(row, index)`: rellena la fila con el elemento `index`.
+    """
+
+    def __init__(self, parent, bg_color, row_height: int, create_row, render_row):
+        super().__init__(parent, bg=bg_color)
+        self.row_height = row_height
+        self.create_row = create_row
+        self.render_row = render_row
+        self._count = 0
+        # Desplazamiento vertical en píxeles desde el primer elemento
+        self._offset = 0
+        self._rows = []
+
+        self.viewport = tk.Frame(self, bg=bg_color, bd=0, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        # Solo un cambio de tamaño real re-dimensiona el grupo de filas
+        self.viewport.bind("<Configure>", lambda e: self._layout())
+
+        # Mouse wheel global: solo desplaza si el puntero está sobre esta lista (incluidas sus filas,
+        # que generan <Leave> en el viewport al entrar en ellas)
+        self.viewport.bind("<Enter>", lambda e: self.viewport.bind_all("<MouseWheel>", self._on_mousewheel))
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def set_count(self, count: int) -> None:
+        """Fija el número de elementos y redibuja solo las filas visibles."""
+        self._count = count
+        self._layout()
+
+    def redraw(self) -> None:
+        self._layout()
+
+    def visible_range(self) -> range:
+        """Índices de los elementos que están ahora en pantalla."""
+        first = self._offset // self.row_height
+        return range(first, min(self._count, first + self._view_height() // self.row_height + 2))
+
+    def _view_height(self) -> int:
+        return max(self.viewport.winfo_height(), 1)
+
+    def _max_offset(self) -> int:
+        return max(0, self._count * self.row_height - self._view_height())
+
+    def _scroll_to(self, offset: int) -> None:
+        offset = min(max(0, int(offset)), self._max_offset())
+        if offset != self._offset:
+            self._offset = offset
+            self._layout()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(value) * self._count * self.row_height)
+        elif action == "scroll":
+            step = self._view_height() if unit == "pages" else self.row_height
+            self._scroll_to(self._offset + int(value) * step)
+
+    def _on_mousewheel(self, event):
+        if not self.winfo_exists():
+            return
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        if widget is not None and str(widget).startswith(str(self.viewport)):
+            self._scroll_to(self._offset - int(event.delta / 120) * self.row_height)
+
+    def _layout(self) -> None:
+        """Ajusta el grupo de filas a la altura visible y las asigna a los elementos en pantalla."""
+        if not self.winfo_exists():
+            return
+        height = self._view_height()
+        self._offset = min(self._offset, self._max_offset())
+
+        needed = height // self.row_height + 2
+        while len(self._rows) < needed:
+            self._rows.append(self.create_row(self.viewport))
+
+        first = self._offset // self.row_height
+        for slot, row in enumerate(self._rows):
+            index = first + slot
+            if slot < needed and index < self._count:
+                self.render_row(row, index)
+                row.place(x=0, y=index * self.row_height - self._offset, relwidth=1, height=self.row_height)
+            else:
+                row.place_forget()
+
+        total = self._count * self.row_height
+        if total <= height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._offset / total, (self._offset + height) / total)
@@ -1,4 +1,5 @@
 import sys
+import threading
 from pathlib import Path
 
 # Añadir el directorio raíz al path para que funcione como paquete
@@ -6,14 +7,26 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.backend.api.core.config import settings
 from src.backend.api.infrastructure.audio_adapter import YtDlpAdapter
+from src.backend.api.infrastructure.job_journal import JobJournal
 from src.backend.api.services.download_service import DownloadService
+from src.backend.vault.content_index_service import ContentIndexService
 from src.frontend.ui import TerminalUI
 
 
 def main():
     audio_adapter = YtDlpAdapter()
+    # Pre-inicializar las instancias de yt-dlp mientras se construye la interfaz
+    threading.Thread(target=audio_adapter.warm_up, daemon=True).start()
+    content_index = ContentIndexService(settings.download_dir / "content_index.json", settings.download_dir)
+    # Diario de la cola junto a history.json: los trabajos pendientes se reanudan al iniciar
+    journal = JobJournal(settings.download_dir / "download_queue.db")
     # Por defecto se descarga a la carpeta raíz "Sin album" del Vault (RF-022)
-    download_service = DownloadService(audio_adapter, settings.download_dir / "Sin album")
+    download_service = DownloadService(
+        audio_adapter,
+        settings.download_dir / "Sin album",
+        content_index=content_index,
+        journal=journal,
+    )
     
     app = TerminalUI(download_service)
     app.mainloop()
@@ -1,29 +1,38 @@
 #!/usr/bin/env python3
 """
 YouTube to MP3 Downloader Server
-Descarga videos de YouTube y los convierte a formato MP3
+Descarga videos de YouTube y los convierte a formato MP3 (u otro perfil: --profile mp3-320, opus, m4a...)
 """
 
 import os
 import sys
 import re
+import time
 from pathlib import Path
 import yt_dlp
 from colorama import init, Fore, Style
 
+# Permitir importar módulos compartidos del backend (solo biblioteca estándar)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.backend.api.infrastructure.output_profiles import DEFAULT_PROFILE, PROFILES, get_profile
+
 # Inicializar colorama para Windows
 init(autoreset=True)
 
 class YouTubeMP3Downloader:
-    def __init__(self, download_path='downloads'):
+    def __init__(self, download_path='downloads', profile=DEFAULT_PROFILE):
         """
         Inicializa el descargador de YouTube a MP3
         
         Args:
-            download_path: Ruta donde se guardarán los archivos MP3
+            download_path: Ruta donde se guardarán los archivos de audio
+            profile: Perfil de salida (mp3-128, mp3-192, mp3-320, mp3-v0, mp3-v2, opus, m4a)
         """
+        self.profile = get_profile(profile) or get_profile(DEFAULT_PROFILE)
         self.download_path = Path(download_path).resolve()
         self.download_path.mkdir(exist_ok=True)
+        # Título, ruta final, metadatos y tiempos de la última descarga exitosa
+        self.last_result = None
         
     def validate_youtube_url(self, url):
         """
@@ -52,20 +61,16 @@ class YouTubeMP3Downloader:
             url: URL del video de YouTube
             
         Returns:
-            bool: True si la descarga fue exitosa
+            bool: True si la descarga fue exitosa (detalles en self.last_result)
         """
         if not self.validate_youtube_url(url):
             print(f"{Fore.RED}❌ Error: La URL no es válida de YouTube")
             return False
         
-        # Configuración de yt-dlp para descargar como MP3
+        # Configuración de yt-dlp para descargar y convertir al perfil elegido
         ydl_opts = {
             'format': 'bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
+            'postprocessors': [self.profile.ytdlp_postprocessor()],
             'outtmpl': str(self.download_path / '%(title)s.%(ext)s'),
             'quiet': False,
             'no_warnings': False,
@@ -89,23 +94,48 @@ class YouTubeMP3Downloader:
             'no_color': False,
         }
         
+        # Medición de tiempos: el primer hook de progreso marca el fin de la extracción
+        timing = {'start': time.perf_counter(), 'first_byte': None}
+        
+        def timing_hook(d):
+            if timing['first_byte'] is None and d.get('status') in ('downloading', 'finished'):
+                timing['first_byte'] = time.perf_counter()
+                print(f"{Fore.CYAN}⏳ Descargando y convirtiendo a {self.profile.description}...\n")
+        
+        ydl_opts['progress_hooks'] = [timing_hook]
+        
         try:
             print(f"\n{Fore.CYAN}📥 Iniciando descarga...")
             print(f"{Fore.YELLOW}📂 Guardando en: {self.download_path}\n")
             
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Obtener información del video
-                info = ydl.extract_info(url, download=False)
-                video_title = info.get('title', 'Unknown')
-                
-                print(f"{Fore.GREEN}🎵 Título: {video_title}")
-                print(f"{Fore.CYAN}⏳ Descargando y convirtiendo a MP3...\n")
-                
-                # Descargar y convertir
-                ydl.download([url])
+                # Una sola pasada: extracción, descarga y conversión juntas
+                info = ydl.extract_info(url, download=True)
                 
+            video_title = info.get('title', 'Unknown')
+            requested = info.get('requested_downloads') or []
+            file_path = requested[0].get('filepath') if requested else None
+            
+            end = time.perf_counter()
+            first_byte = timing['first_byte'] or end
+            self.last_result = {
+                'id': info.get('id'),
+                'title': video_title,
+                'duration': info.get('duration'),
+                'uploader': info.get('uploader'),
+                'file_path': file_path,
+                'timing': {
+                    'extract_ms': round((first_byte - timing['start']) * 1000),
+                    'download_convert_ms': round((end - first_byte) * 1000),
+                    'total_ms': round((end - timing['start']) * 1000),
+                },
+            }
+            
+            print(f"{Fore.GREEN}🎵 Título: {video_title}")
             print(f"\n{Fore.GREEN}✅ ¡Descarga completada exitosamente!")
-            print(f"{Fore.GREEN}📁 Archivo guardado en: {self.download_path}")
+            print(f"{Fore.GREEN}📁 Archivo guardado en: {file_path or self.download_path}")
+            print(f"{Fore.CYAN}⏱️  Extracción: {self.last_result['timing']['extract_ms']} ms  ·  "
+                  f"Total: {self.last_result['timing']['total_ms']} ms")
             return True
             
         except yt_dlp.utils.DownloadError as e:
@@ -124,7 +154,8 @@ class YouTubeMP3Downloader:
         print("  🎵 YOUTUBE TO MP3 DOWNLOADER 🎵")
         print("=" * 60)
         print(f"{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}Directorio de descargas: {self.download_path}\n")
+        print(f"{Fore.CYAN}Directorio de descargas: {self.download_path}")
+        print(f"{Fore.CYAN}Formato de salida: {self.profile.description} ({self.profile.name})\n")
         
         while True:
             try:
@@ -157,7 +188,15 @@ def main():
     script_dir = Path(__file__).parent
     downloads_dir = script_dir / 'downloads'
     
-    downloader = YouTubeMP3Downloader(download_path=downloads_dir)
+    # Perfil de salida: --profile <nombre> o la variable de entorno DEFAULT_PROFILE
+    profile = os.getenv('DEFAULT_PROFILE', DEFAULT_PROFILE)
+    if '--profile' in sys.argv[1:-1]:
+        profile = sys.argv[sys.argv.index('--profile') + 1]
+    if get_profile(profile) is None:
+        print(f"{Fore.RED}❌ Perfil '{profile}' no válido. Opciones: {', '.join(PROFILES)}")
+        sys.exit(1)
+    
+    downloader = YouTubeMP3Downloader(download_path=downloads_dir, profile=profile)
     downloader.run()
 
 